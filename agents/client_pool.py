@@ -0,0 +1,180 @@
+from typing import Dict, Any, Optional, Tuple, Awaitable, TypeVar, TYPE_CHECKING
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+
+if TYPE_CHECKING:
+    import openai
+    import anthropic
+
+T = TypeVar("T")
+
+def _key_fingerprint(api_key: str) -> str:
+    """Registry key component that does not keep the raw API key in stats or reprs"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+class LLMClientPool:
+    """Process-wide registry of async SDK clients keyed by provider, API key and base URL
+
+    Every client gets a keep-alive HTTP connection pool, so agents and teams
+    created per request reuse warm connections instead of paying TCP and TLS
+    setup each time. Async HTTP connections belong to the event loop that
+    opened them, so clients are kept per loop and closed and evicted when
+    that loop shuts down (e.g. at the end of asyncio.run()); use
+    run_on_shared_loop() to keep one loop (and its connections) alive
+    across calls from synchronous code.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.Lock()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str, str], Any]]" = \
+            weakref.WeakKeyDictionary()
+        # Per-loop shutdown hooks; the loop itself only keeps a weak reference
+        self._closers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._detached: Dict[Tuple[str, str, str], Any] = {}
+        self.stats = {"created": 0, "reused": 0}
+
+    def _limits(self, sdk):
+        # Build the SDK's own httpx Limits type rather than importing httpx directly
+        return type(sdk.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def _clients_for_current_loop(self) -> Dict[Tuple[str, str, str], Any]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Built outside a loop (e.g. in a constructor); only used until a loop asks
+            return self._detached
+        clients = self._clients.get(loop)
+        if clients is None:
+            self._evict_closed_loops()
+            clients = self._clients[loop] = {}
+            self._close_on_shutdown(loop)
+        return clients
+
+    def _close_on_shutdown(self, loop: asyncio.AbstractEventLoop):
+        """Close and evict this loop's clients when the loop shuts down
+
+        Pooled clients reference their loop, so the weak key alone never
+        frees them. A suspended async generator is finalized by the loop's
+        shutdown_asyncgens(), which asyncio.run() calls before closing it.
+        """
+        async def closer():
+            try:
+                yield
+            finally:
+                with self._lock:
+                    clients = self._clients.pop(loop, {})
+                    self._closers.pop(loop, None)
+                for client in clients.values():
+                    try:
+                        await client.close()
+                    except Exception:
+                        pass
+
+        generator = closer()
+        self._closers[loop] = generator
+        loop.create_task(generator.__anext__())
+
+    def _evict_closed_loops(self):
+        # Loops closed without shutdown_asyncgens() (e.g. a bare loop.close());
+        # their connections cannot be closed any more, only dropped
+        for loop in [loop for loop in self._clients if loop.is_closed()]:
+            self._clients.pop(loop, None)
+            self._closers.pop(loop, None)
+
+    def _get(self, provider: str, api_key: str, base_url: Optional[str], factory) -> Any:
+        key = (provider, _key_fingerprint(api_key), base_url or "")
+        with self._lock:
+            clients = self._clients_for_current_loop()
+            client = clients.get(key)
+            if client is not None:
+                self.stats["reused"] += 1
+                return client
+            client = clients[key] = factory()
+            self.stats["created"] += 1
+            return client
+
+    def openai_client(self, api_key: str, base_url: Optional[str] = None) -> "openai.AsyncOpenAI":
+        """Shared AsyncOpenAI client (also used for OpenRouter) for this loop"""
+        # SDKs are imported on first use; they dominate the package's cold import time
+        import openai
+        return self._get("openai", api_key, base_url, lambda: openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=openai.DefaultAsyncHttpxClient(limits=self._limits(openai))
+        ))
+
+    def anthropic_client(self, api_key: str, base_url: Optional[str] = None) -> "anthropic.AsyncAnthropic":
+        """Shared AsyncAnthropic client for this loop"""
+        import anthropic
+        return self._get("anthropic", api_key, base_url, lambda: anthropic.AsyncAnthropic(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=anthropic.DefaultAsyncHttpxClient(limits=self._limits(anthropic))
+        ))
+
+    async def aclose(self):
+        """Close the clients (and their connections) opened on the running loop"""
+        with self._lock:
+            clients = self._clients.get(asyncio.get_running_loop(), {})
+            closing = list(clients.values())
+            clients.clear()
+        for client in closing:
+            await client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Client creation/reuse counters and pool sizing"""
+        with self._lock:
+            self._evict_closed_loops()
+            return {
+                **self.stats,
+                "event_loops": len(self._clients),
+                "clients": sum(len(c) for c in self._clients.values()) + len(self._detached),
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry": self.keepalive_expiry
+            }
+
+_default_client_pool: Optional[LLMClientPool] = None
+
+def get_default_client_pool() -> LLMClientPool:
+    """Process-wide client pool configured from the environment"""
+    global _default_client_pool
+    if _default_client_pool is None:
+        _default_client_pool = LLMClientPool(
+            max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30"))
+        )
+    return _default_client_pool
+
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_loop_lock = threading.Lock()
+
+def get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Long-lived event loop running in a daemon thread"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-io-loop", daemon=True).start()
+            _shared_loop = loop
+        return _shared_loop
+
+def run_on_shared_loop(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion on the shared loop from synchronous code
+
+    Unlike asyncio.run(), the loop outlives the call, so pooled keep-alive
+    connections are reused by the next request.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_shared_loop()).result()
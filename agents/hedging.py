@@ -0,0 +1,230 @@
+from typing import Dict, Any, Optional, Callable, AsyncIterator, List, Tuple
+from collections import deque
+import asyncio
+import os
+from .llm_providers import LLMProvider, create_provider
+from .llm_usage import LLMUsage
+from .plan_parser import extract_plan_json, validate_plan
+from .rate_limiter import RateLimitedProvider
+
+# Primary provider -> provider used for the hedge request
+HEDGE_PARTNERS = {"openrouter": "anthropic", "anthropic": "openrouter"}
+
+def is_json_plan(text: str) -> bool:
+    """Default validity check: a valid plan can be extracted from the completion"""
+    try:
+        return not validate_plan(extract_plan_json(text)[0])
+    except (TypeError, ValueError):
+        return False
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an unsorted sample list"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class HedgedProvider(LLMProvider):
+    """Sends a backup request to a second provider when the primary is slow
+
+    The hedge fires once the primary has been running longer than the chosen
+    percentile of its recent latencies (or initial_delay until enough samples
+    exist), or immediately if the primary fails. The first valid completion
+    wins and the other request is cancelled. Streams are hedged on time to
+    first chunk, since validity is only known once a stream ends.
+
+    Each attempt fills its own LLMUsage; only the winner's is copied into
+    the caller's, so a cancelled loser cannot overwrite its token counts.
+    """
+
+    def __init__(self, primary: LLMProvider, secondary: LLMProvider,
+                 hedge_percentile: float = 0.95, initial_delay: float = 2.0,
+                 min_samples: int = 20, window: int = 200,
+                 validate: Callable[[str], bool] = is_json_plan):
+        super().__init__(name=f"{primary.name}+{secondary.name}", model=primary.model)
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge_percentile = hedge_percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.validate = validate
+        self.window = window
+        # (provider, model, "complete" | "first_chunk") -> recent latencies
+        self._latencies: Dict[Tuple[str, str, str], deque] = {}
+        self.stats = {
+            "calls": 0,
+            "hedged": 0,
+            "primary_wins": 0,
+            "secondary_wins": 0,
+            "invalid_responses": 0,
+            "failures": 0,
+            "cancelled_losers": 0
+        }
+
+    @property
+    def client(self):
+        return self.primary.client
+
+    def _samples(self, provider: LLMProvider, kind: str, tier: Optional[str]) -> deque:
+        key = (provider.name, provider.model_for(tier), kind)
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = self._latencies[key] = deque(maxlen=self.window)
+        return samples
+
+    def hedge_delay(self, kind: str = "complete", tier: Optional[str] = None) -> float:
+        """Seconds to wait on the primary before sending the hedge request"""
+        samples = self._samples(self.primary, kind, tier)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        return percentile(list(samples), self.hedge_percentile)
+
+    def _record(self, provider: LLMProvider, kind: str, elapsed: float, tier: Optional[str]):
+        self._samples(provider, kind, tier).append(elapsed)
+
+    def _record_winner(self, provider: LLMProvider):
+        key = "primary_wins" if provider is self.primary else "secondary_wins"
+        self.stats[key] += 1
+
+    async def _timed_complete(self, provider: LLMProvider, prompt: str, **kwargs) -> str:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        text = await provider.complete(prompt, **kwargs)
+        self._record(provider, "complete", loop.time() - start, kwargs.get("tier"))
+        return text
+
+    async def _cancel(self, tasks):
+        """Cancel losing requests and wait for them to unwind"""
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.stats["cancelled_losers"] += len(tasks)
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        self.stats["calls"] += 1
+        loop = asyncio.get_running_loop()
+        hedge_at = loop.time() + self.hedge_delay(tier=tier)
+        options = {"max_tokens": max_tokens, "temperature": temperature, "system": system, "tier": tier}
+        pending: Dict[asyncio.Task, Tuple[LLMProvider, Optional[LLMUsage]]] = {}
+
+        def start(provider: LLMProvider):
+            attempt_usage = LLMUsage() if usage is not None else None
+            task = asyncio.ensure_future(self._timed_complete(provider, prompt, usage=attempt_usage, **options))
+            pending[task] = (provider, attempt_usage)
+
+        start(self.primary)
+        hedged = False
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None if hedged else max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider, attempt_usage = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        self.stats["failures"] += 1
+                    elif not self.validate(task.result()):
+                        last_error = ValueError(f"{provider.name} returned an invalid plan")
+                        self.stats["invalid_responses"] += 1
+                    else:
+                        self._record_winner(provider)
+                        if usage is not None:
+                            usage.adopt(attempt_usage)
+                        return task.result()
+                if not hedged:
+                    # Primary is slow or already failed: race the other provider
+                    hedged = True
+                    self.stats["hedged"] += 1
+                    start(self.secondary)
+            raise last_error
+        finally:
+            await self._cancel(list(pending))
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        self.stats["calls"] += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        hedge_at = start + self.hedge_delay("first_chunk", tier)
+
+        def open_stream(provider: LLMProvider):
+            attempt_usage = LLMUsage() if usage is not None else None
+            stream = provider.stream(prompt, max_tokens=max_tokens, temperature=temperature,
+                                     system=system, usage=attempt_usage, tier=tier)
+            return asyncio.ensure_future(stream.__anext__()), (provider, stream, attempt_usage)
+
+        task, entry = open_stream(self.primary)
+        pending = {task: entry}
+        losers = []
+        hedged = False
+        winner = None
+        last_error: Optional[BaseException] = None
+        try:
+            while pending and winner is None:
+                timeout = None if hedged else max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider, stream, attempt_usage = pending.pop(task)
+                    if task.exception() is None and winner is None:
+                        self._record(provider, "first_chunk", loop.time() - start, tier)
+                        self._record_winner(provider)
+                        winner = (stream, task.result(), attempt_usage)
+                    elif task.exception() is not None:
+                        last_error = task.exception()
+                        self.stats["failures"] += 1
+                        losers.append(stream)
+                    else:
+                        losers.append(stream)
+                if winner is None and not hedged:
+                    hedged = True
+                    self.stats["hedged"] += 1
+                    task, entry = open_stream(self.secondary)
+                    pending[task] = entry
+        finally:
+            losers.extend(stream for _, stream, _ in pending.values())
+            await self._cancel(list(pending))
+            for stream in losers:
+                await stream.aclose()
+
+        if winner is None:
+            if isinstance(last_error, StopAsyncIteration):
+                return
+            raise last_error
+        stream, first_chunk, attempt_usage = winner
+        try:
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            if usage is not None:
+                usage.adopt(attempt_usage)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counters and the current hedge delay"""
+        return {**self.stats, "hedge_delay": round(self.hedge_delay(), 4)}
+
+def create_hedged_provider(llm_provider: str, base_urls: Optional[Dict[str, str]] = None) -> Optional[LLMProvider]:
+    """Primary provider hedged with its partner, or a plain router if only one key is set
+
+    Each side of the race goes through its own ProviderRouter, so both share
+    the process-wide health registry: a provider with an open circuit fails
+    the attempt without a network call, and the race moves straight to the
+    other side. base_urls maps provider names to base URL overrides.
+    """
+    # provider_router imports this module for HEDGE_PARTNERS
+    from .provider_router import ProviderRouter, create_provider_router
+    base_urls = base_urls or {}
+    primary = create_provider(llm_provider, base_urls.get(llm_provider))
+    partner = HEDGE_PARTNERS.get(llm_provider)
+    secondary = create_provider(partner, base_urls.get(partner)) if partner else None
+    if primary is None or secondary is None:
+        return create_provider_router(llm_provider, base_urls)
+    return HedgedProvider(
+        ProviderRouter([RateLimitedProvider(primary)]),
+        ProviderRouter([RateLimitedProvider(secondary)]),
+        hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+        initial_delay=float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+    )
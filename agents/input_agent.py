@@ -1,10 +1,9 @@
 from typing import Dict, Any
-import json
 # Mock ADK Classes
 from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
 from datetime import datetime
-import json
+from .json_codec import dumps
 
 class Message:
     def __init__(self, content: str, sender: str, metadata: Optional[Dict[str, Any]] = None):
@@ -67,7 +66,7 @@ class InputAgent(LlmAgent):
         result = self.process_input(user_input)
         
         return Message(
-            content=json.dumps(result),
+            content=dumps(result),
             sender=self.name,
             metadata={"processed": True}
         )
\ No newline at end of file
@@ -0,0 +1,112 @@
+from typing import Dict, List, Tuple, Optional
+from operator import itemgetter
+
+# Category -> {keyword: weight}. Categories are listed in tie-break priority order.
+DEFAULT_INTENT_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "webhook": {"webhook": 4, "endpoint": 3, "receive": 2, "api": 1},
+    "rss": {"rss": 4, "feed": 2, "monitor": 1, "check": 1},
+    "file": {"csv": 3, "file": 2, "upload": 2, "spreadsheet": 2, "process": 1, "data": 1},
+    "email": {"email": 3, "gmail": 3, "mail": 1, "notification": 1, "alert": 1},
+    "social_media": {"youtube": 3, "social media": 3, "tiktok": 3, "instagram": 3, "video": 2,
+                     "channel": 2, "post": 1, "schedule": 1},
+    "api_integration": {"github": 3, "jira": 3, "slack": 3, "integration": 2, "integrate": 2, "api": 1},
+    "ecommerce": {"ecommerce": 3, "e-commerce": 3, "payment": 3, "inventory": 3, "order": 2},
+    "testing": {"qa": 3, "test": 2, "testing": 2, "quality": 1, "automation": 1},
+    "developer": {"developer": 3, "deploy": 3, "development": 1, "code": 2, "build": 1},
+}
+
+# Every ASCII byte that is not a letter or digit separates words
+_SEPARATOR_BYTES = bytes(c for c in range(128) if not chr(c).isalnum())
+_SEPARATORS = bytes.maketrans(_SEPARATOR_BYTES, b" " * len(_SEPARATOR_BYTES))
+
+# Endings a keyword also matches with ("notifications", "deployed", "processing")
+_SUFFIXES = ("", "s", "es", "d", "ed", "ing", "er", "ers", "ment", "ments")
+
+def _words(text: str) -> List[bytes]:
+    return text.lower().encode("utf-8").translate(_SEPARATORS).split()
+
+def _inflections(word: bytes) -> List[bytes]:
+    forms = [word + suffix.encode() for suffix in _SUFFIXES]
+    if word.endswith(b"e"):
+        # "schedule" -> "scheduling"
+        forms += [word[:-1] + b"ing", word[:-1] + b"er", word[:-1] + b"ers"]
+    return forms
+
+class IntentClassifier:
+    """Scores every intent category with one set intersection over the input's words
+
+    A keyword matches a whole word or the word with a common ending
+    ("notification" matches "notifications", but "api" does not match
+    "rapid"). Every accepted form is precomputed, so the words of the input
+    are matched in one C-level set intersection however many keywords
+    there are. Multi-word keywords ("social media", "e-commerce") match
+    consecutive words, the last one with the same endings. Each distinct
+    keyword adds its weight to every category that lists it.
+    """
+
+    def __init__(self, intent_keywords: Optional[Dict[str, Dict[str, float]]] = None):
+        self.intent_keywords = intent_keywords or DEFAULT_INTENT_KEYWORDS
+        self.priority = {category: i for i, category in enumerate(self.intent_keywords)}
+        self.keyword_weights: Dict[str, List[Tuple[str, float]]] = {}
+        for category, keywords in self.intent_keywords.items():
+            for keyword, weight in keywords.items():
+                self.keyword_weights.setdefault(keyword.lower(), []).append((category, weight))
+        # Accepted word form -> keyword; a keyword's own word beats another
+        # keyword's inflection ("testing" is the keyword, not "test" + "ing")
+        self._forms: Dict[bytes, str] = {}
+        # Multi-word keywords: (" word word", every accepted " word words " form, keyword)
+        self._phrases: List[Tuple[bytes, Tuple[bytes, ...], str]] = []
+        for keyword in self.keyword_weights:
+            words = _words(keyword)
+            if len(words) == 1:
+                for form in _inflections(words[0]):
+                    if form == words[0] or form not in self._forms:
+                        self._forms[form] = keyword
+            elif words:
+                head = b" " + b" ".join(words[:-1]) + b" "
+                forms = tuple(head + form + b" " for form in _inflections(words[-1]))
+                self._phrases.append((head + words[-1], forms, keyword))
+        self._form_set = frozenset(self._forms)
+        self._no_scores = dict.fromkeys(self.intent_keywords, 0.0)
+        # First words of the multi-word keywords; inputs without any skip the phrase check
+        self._phrase_heads = frozenset(_words(keyword)[0] for _, _, keyword in self._phrases)
+
+    def _matched_phrases(self, words: List[bytes]) -> List[str]:
+        padded = b" " + b" ".join(words) + b" "
+        return [keyword for phrase, phrase_forms, keyword in self._phrases
+                if phrase in padded and any(form in padded for form in phrase_forms)]
+
+    def _scores(self, text: str) -> Dict[str, float]:
+        """Score per category, every category present in priority order"""
+        words = _words(text)
+        keywords = set(map(self._forms.__getitem__, self._form_set.intersection(words)))
+        if not self._phrase_heads.isdisjoint(words):
+            keywords.update(self._matched_phrases(words))
+        scores = self._no_scores.copy()
+        keyword_weights = self.keyword_weights
+        for keyword in keywords:
+            for category, weight in keyword_weights[keyword]:
+                scores[category] += weight
+        return scores
+
+    def classify(self, text: str) -> List[Tuple[str, float]]:
+        """Return (category, score) pairs ranked best first; empty if nothing matched"""
+        # The sort is stable, so equal scores keep priority order
+        ranked = sorted(self._scores(text).items(), key=itemgetter(1), reverse=True)
+        return [item for item in ranked if item[1]]
+
+    def top_intent(self, text: str) -> Optional[str]:
+        """Best scoring category, or None"""
+        scores = self._scores(text)
+        # max() keeps the first of equal scores, i.e. the higher priority
+        best = max(scores, key=scores.get, default=None)
+        return best if best is not None and scores[best] else None
+
+_default_classifier: Optional[IntentClassifier] = None
+
+def get_default_classifier() -> IntentClassifier:
+    """Shared classifier compiled once per process"""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = IntentClassifier()
+    return _default_classifier
@@ -0,0 +1,126 @@
+from typing import Any, Optional, Union
+import json
+import os
+
+# orjson and msgspec decode errors are re-raised as (or already subclass)
+# this, so callers catch one exception type whatever the backend
+JSONDecodeError = json.JSONDecodeError
+
+class JSONCodec:
+    """Stdlib JSON encoding and decoding; the base of the faster backends
+
+    dumps() is compact and meant for machines (messages between agents,
+    caches, prompts). format() is for people (UI display, downloads, CLI
+    output) and indents unless the codec was built with pretty=False.
+    """
+    name = "stdlib"
+
+    def __init__(self, pretty: bool = True):
+        self.pretty = pretty
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps_pretty(self, obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def format(self, obj: Any) -> str:
+        return self.dumps_pretty(obj) if self.pretty else self.dumps(obj)
+
+class OrjsonCodec(JSONCodec):
+    """orjson backend; values orjson cannot encode (e.g. ints over 64 bits) fall back to the stdlib"""
+    name = "orjson"
+
+    def __init__(self, pretty: bool = True):
+        super().__init__(pretty)
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> str:
+        try:
+            return self._orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj)
+
+    def dumps_pretty(self, obj: Any) -> str:
+        try:
+            return self._orjson.dumps(obj, option=self._orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            return super().dumps_pretty(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return self._orjson.loads(data)
+
+class MsgspecCodec(JSONCodec):
+    """msgspec backend; values msgspec cannot encode fall back to the stdlib"""
+    name = "msgspec"
+
+    def __init__(self, pretty: bool = True):
+        super().__init__(pretty)
+        import msgspec
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> str:
+        try:
+            return self._encoder.encode(obj).decode("utf-8")
+        except (TypeError, OverflowError):
+            return super().dumps(obj)
+
+    def dumps_pretty(self, obj: Any) -> str:
+        return self._msgspec.json.format(self.dumps(obj), indent=2)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            text = data if isinstance(data, str) else data.decode("utf-8", "replace")
+            raise JSONDecodeError(str(e), text, 0) from e
+
+CODECS = {codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, JSONCodec)}
+
+def create_json_codec(name: str = "auto", pretty: bool = True) -> JSONCodec:
+    """Codec by name ("orjson", "msgspec", "stdlib"); "auto" takes the first one installed"""
+    if name != "auto":
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec '{name}', expected auto, {', '.join(CODECS)}")
+        return CODECS[name](pretty)
+    for codec in CODECS.values():
+        try:
+            return codec(pretty)
+        except ImportError:
+            continue
+    return JSONCodec(pretty)
+
+_default_json_codec: Optional[JSONCodec] = None
+
+def get_default_json_codec() -> JSONCodec:
+    """Process-wide codec configured from the environment"""
+    global _default_json_codec
+    if _default_json_codec is None:
+        _default_json_codec = create_json_codec(
+            os.getenv("JSON_CODEC", "auto"),
+            pretty=os.getenv("JSON_PRETTY", "true").lower() == "true"
+        )
+    return _default_json_codec
+
+def set_default_json_codec(codec: JSONCodec):
+    """Swap the process-wide codec, e.g. to compare backends"""
+    global _default_json_codec
+    _default_json_codec = codec
+
+def dumps(obj: Any) -> str:
+    """Compact JSON for machines"""
+    return (_default_json_codec or get_default_json_codec()).dumps(obj)
+
+def loads(data: Union[str, bytes]) -> Any:
+    return (_default_json_codec or get_default_json_codec()).loads(data)
+
+def format_json(obj: Any) -> str:
+    """JSON for people: indented unless JSON_PRETTY=false"""
+    return (_default_json_codec or get_default_json_codec()).format(obj)
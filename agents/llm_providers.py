@@ -0,0 +1,314 @@
+from typing import Dict, Any, Optional, Callable, AsyncIterator, List
+import asyncio
+import os
+import random
+from abc import ABC, abstractmethod
+from .client_pool import LLMClientPool, get_default_client_pool
+from .json_codec import get_default_json_codec
+from .llm_usage import LLMUsage
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Faster, cheaper models used for the "small" routing tier
+OPENROUTER_SMALL_MODEL = "anthropic/claude-3-haiku"
+ANTHROPIC_SMALL_MODEL = "claude-3-haiku-20240307"
+
+class LLMProvider(ABC):
+    """Async completion interface used by PlannerAgent"""
+
+    # SDK client, for providers that have one
+    client = None
+
+    def __init__(self, name: str, model: str, models: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.model = model
+        # Model tier -> model name; tiers without an entry use the default model
+        self.models = models or {}
+
+    def model_for(self, tier: Optional[str]) -> str:
+        """Model to use for a routing tier"""
+        return self.models.get(tier, self.model) if tier else self.model
+
+    @abstractmethod
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        """Return the completion text for a user prompt
+
+        system is the static instruction prefix shared by every request; providers
+        that support prompt caching mark it cacheable. If usage is given, token
+        counts and timings of the request are recorded into it. tier selects
+        a model from self.models (see ModelRoutingPolicy).
+        """
+        pass
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield completion text chunks; providers without streaming yield it all at once"""
+        yield await self.complete(prompt, max_tokens=max_tokens, temperature=temperature,
+                                  system=system, usage=usage, tier=tier)
+
+class OpenRouterProvider(LLMProvider):
+    def __init__(self, api_key: str, model: str = "anthropic/claude-3.5-sonnet",
+                 base_url: str = OPENROUTER_BASE_URL, client_pool: Optional[LLMClientPool] = None,
+                 models: Optional[Dict[str, str]] = None):
+        super().__init__(name="openrouter", model=model, models=models)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client_pool = client_pool or get_default_client_pool()
+
+    @property
+    def client(self):
+        """Pooled AsyncOpenAI client shared with every provider using the same key"""
+        return self.client_pool.openai_client(self.api_key, self.base_url)
+
+    def _messages(self, prompt: str, system: Optional[str]) -> List[Dict[str, Any]]:
+        messages = []
+        if system:
+            # cache_control is honoured by OpenRouter for Anthropic models; OpenAI-style
+            # models cache a repeated leading prefix automatically
+            messages.append({"role": "system", "content": [
+                {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+            ]})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _record_usage(self, usage: Optional[LLMUsage], reported, model: str):
+        if usage is None or reported is None:
+            return
+        details = getattr(reported, "prompt_tokens_details", None)
+        usage.record(
+            self.name, model,
+            input_tokens=reported.prompt_tokens,
+            output_tokens=reported.completion_tokens,
+            cached_input_tokens=getattr(details, "cached_tokens", 0) if details else 0
+        )
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        model = self.model_for(tier)
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, system),
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        if usage is not None:
+            usage.finish()
+            self._record_usage(usage, response.usage, model)
+        return response.choices[0].message.content
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        model = self.model_for(tier)
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=self._messages(prompt, system),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if usage is not None:
+                    usage.first_token()
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None) is not None:
+                self._record_usage(usage, chunk.usage, model)
+        if usage is not None:
+            usage.finish()
+
+class AnthropicProvider(LLMProvider):
+    def __init__(self, api_key: str, model: str = "claude-3-sonnet-20240229",
+                 base_url: Optional[str] = None, client_pool: Optional[LLMClientPool] = None,
+                 models: Optional[Dict[str, str]] = None):
+        super().__init__(name="anthropic", model=model, models=models)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client_pool = client_pool or get_default_client_pool()
+
+    @property
+    def client(self):
+        """Pooled AsyncAnthropic client shared with every provider using the same key"""
+        return self.client_pool.anthropic_client(self.api_key, self.base_url)
+
+    def _request(self, prompt: str, max_tokens: int, temperature: float, system: Optional[str],
+                 model: str) -> Dict[str, Any]:
+        request = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+        if system:
+            request["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return request
+
+    def _record_usage(self, usage: Optional[LLMUsage], reported, model: str):
+        if usage is None or reported is None:
+            return
+        cached = getattr(reported, "cache_read_input_tokens", 0) or 0
+        written = getattr(reported, "cache_creation_input_tokens", 0) or 0
+        usage.record(
+            self.name, model,
+            # Anthropic reports cached and cache-write tokens separately from input_tokens
+            input_tokens=reported.input_tokens + cached + written,
+            output_tokens=reported.output_tokens,
+            cached_input_tokens=cached,
+            cache_write_tokens=written
+        )
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        model = self.model_for(tier)
+        response = await self.client.messages.create(**self._request(prompt, max_tokens, temperature, system, model))
+        if usage is not None:
+            usage.finish()
+            self._record_usage(usage, response.usage, model)
+        return response.content[0].text
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        model = self.model_for(tier)
+        async with self.client.messages.stream(**self._request(prompt, max_tokens, temperature, system, model)) as stream:
+            async for text in stream.text_stream:
+                if usage is not None:
+                    usage.first_token()
+                yield text
+            if usage is not None:
+                usage.finish()
+                self._record_usage(usage, (await stream.get_final_message()).usage, model)
+
+class FakeProvider(LLMProvider):
+    """Local stand-in provider with configurable latency, for benchmarks and demos
+
+    When streaming, the latency is spread evenly across chunks of
+    chunk_size characters, like tokens arriving from a real provider.
+    latency_sampler, if given, draws each call's latency instead (e.g. a
+    lognormal distribution with a long tail). Token usage is estimated at
+    four characters per token; a system prefix seen before counts as a
+    prompt-cache hit, and only uncached input tokens pay prefill_latency
+    before the first output token. token_latency adds decoding time per
+    output token, so longer answers take longer.
+    """
+
+    def __init__(self, name: str = "fake", model: str = "fake-model",
+                 latency: float = 0.5, jitter: float = 0.0,
+                 response: Optional[Dict[str, Any]] = None, chunk_size: int = 16,
+                 latency_sampler: Optional[Callable[[], float]] = None,
+                 prefill_latency: float = 0.0, models: Optional[Dict[str, str]] = None,
+                 token_latency: float = 0.0):
+        super().__init__(name=name, model=model, models=models)
+        self.latency = latency
+        self.jitter = jitter
+        self.latency_sampler = latency_sampler
+        self.prefill_latency = prefill_latency
+        self.token_latency = token_latency
+        self._cached_prefixes = set()
+        self.response = response or {
+            "workflow_name": "Fake Provider Workflow",
+            "description": "Plan returned by the local fake provider",
+            "nodes": [
+                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "name": "Manual Trigger",
+                 "description": "Starts the workflow", "parameters": {}, "position": [250, 300]},
+                {"id": "process", "type": "n8n-nodes-base.code", "name": "Process",
+                 "description": "Processes the request", "parameters": {"jsCode": "return items;"},
+                 "position": [450, 300]}
+            ],
+            "connections": [
+                {"from": "trigger", "to": "process", "output_index": 0, "input_index": 0}
+            ],
+            "estimated_complexity": "low",
+            "required_credentials": []
+        }
+        self.chunk_size = chunk_size
+        self.call_count = 0
+
+    def _delay(self) -> float:
+        if self.latency_sampler is not None:
+            return max(0.0, self.latency_sampler())
+        return max(0.0, self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0))
+
+    def _token_usage(self, prompt: str, system: Optional[str], output: str) -> Dict[str, int]:
+        """Estimated token counts; a repeated system prefix is served from the prompt cache"""
+        system_tokens = len(system or "") // 4
+        cached = system_tokens if system in self._cached_prefixes else 0
+        if system:
+            self._cached_prefixes.add(system)
+        return {
+            "input_tokens": system_tokens + len(prompt) // 4,
+            "output_tokens": len(output) // 4,
+            "cached_input_tokens": cached,
+            "cache_write_tokens": system_tokens - cached
+        }
+
+    def _finish(self, usage: Optional[LLMUsage], tokens: Dict[str, int], model: str):
+        if usage is not None:
+            usage.finish()
+            usage.record(self.name, model, **tokens)
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        self.call_count += 1
+        text = get_default_json_codec().dumps(self.response)
+        tokens = self._token_usage(prompt, system, text)
+        prefill = (tokens["input_tokens"] - tokens["cached_input_tokens"]) * self.prefill_latency
+        decode = tokens["output_tokens"] * self.token_latency
+        await asyncio.sleep(prefill + self._delay() + decode)
+        self._finish(usage, tokens, self.model_for(tier))
+        return text
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        self.call_count += 1
+        text = get_default_json_codec().dumps_pretty(self.response)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        tokens = self._token_usage(prompt, system, text)
+        prefill = (tokens["input_tokens"] - tokens["cached_input_tokens"]) * self.prefill_latency
+        per_chunk = (self._delay() + tokens["output_tokens"] * self.token_latency) / len(chunks)
+        loop = asyncio.get_running_loop()
+        start = loop.time() + prefill
+        for i, chunk in enumerate(chunks, 1):
+            # Sleep to an absolute schedule so per-chunk timer overhead does not accumulate
+            await asyncio.sleep(max(0.0, start + i * per_chunk - loop.time()))
+            if usage is not None:
+                usage.first_token()
+            yield chunk
+        self._finish(usage, tokens, self.model_for(tier))
+
+def create_provider(llm_provider: str, base_url: Optional[str] = None) -> Optional[LLMProvider]:
+    """Build the async provider for a provider name, or None when no API key is set
+
+    base_url (or OPENROUTER_BASE_URL / ANTHROPIC_BASE_URL) points the provider
+    at another endpoint speaking the same API, e.g. a local replay server.
+    """
+    if llm_provider == "openrouter":
+        api_key = os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            print("Warning: OPENROUTER_API_KEY not set, using fallback mode")
+            return None
+        return OpenRouterProvider(
+            api_key=api_key,
+            base_url=base_url or os.getenv("OPENROUTER_BASE_URL") or OPENROUTER_BASE_URL,
+            models={"small": os.getenv("OPENROUTER_SMALL_MODEL", OPENROUTER_SMALL_MODEL)}
+        )
+    elif llm_provider == "anthropic":
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            print("Warning: ANTHROPIC_API_KEY not set, using fallback mode")
+            return None
+        return AnthropicProvider(
+            api_key=api_key,
+            base_url=base_url or os.getenv("ANTHROPIC_BASE_URL"),
+            models={"small": os.getenv("ANTHROPIC_SMALL_MODEL", ANTHROPIC_SMALL_MODEL)}
+        )
+    print(f"Warning: unknown LLM provider '{llm_provider}', using fallback mode")
+    return None
@@ -0,0 +1,112 @@
+from typing import Dict, Any, Optional, List
+import threading
+import time
+
+class LLMUsage:
+    """Token usage and timing of a single LLM request, filled in by the provider"""
+
+    def __init__(self):
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.cache_write_tokens = 0
+        self.output_tokens = 0
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+        self._start = time.perf_counter()
+
+    def record(self, provider: str, model: str, input_tokens: int = 0, output_tokens: int = 0,
+               cached_input_tokens: int = 0, cache_write_tokens: int = 0):
+        """Store the token counts reported by the provider's response"""
+        self.provider = provider
+        self.model = model
+        self.input_tokens = input_tokens or 0
+        self.output_tokens = output_tokens or 0
+        self.cached_input_tokens = cached_input_tokens or 0
+        self.cache_write_tokens = cache_write_tokens or 0
+
+    def first_token(self):
+        """Mark the arrival of the first output token (no-op after the first call)"""
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._start
+
+    def finish(self):
+        self.first_token()
+        self.total_time = time.perf_counter() - self._start
+
+    def adopt(self, attempt: "LLMUsage"):
+        """Take over the usage of one attempt made for this request, e.g. the winner of a hedged race
+
+        Times are shifted so they still count from the start of this request.
+        """
+        self.provider = attempt.provider
+        self.model = attempt.model
+        self.input_tokens = attempt.input_tokens
+        self.output_tokens = attempt.output_tokens
+        self.cached_input_tokens = attempt.cached_input_tokens
+        self.cache_write_tokens = attempt.cache_write_tokens
+        offset = attempt._start - self._start
+        if attempt.time_to_first_token is not None:
+            self.time_to_first_token = attempt.time_to_first_token + offset
+        if attempt.total_time is not None:
+            self.total_time = attempt.total_time + offset
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "time_to_first_token": round(self.time_to_first_token, 4) if self.time_to_first_token is not None else None,
+            "total_time": round(self.total_time, 4) if self.total_time is not None else None
+        }
+
+class UsageStats:
+    """Process-wide totals over recorded LLM requests"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._ttfts: List[float] = []
+        self.totals = {
+            "requests": 0,
+            "input_tokens": 0,
+            "cached_input_tokens": 0,
+            "cache_write_tokens": 0,
+            "output_tokens": 0
+        }
+
+    def record(self, usage: LLMUsage):
+        with self._lock:
+            self.totals["requests"] += 1
+            self.totals["input_tokens"] += usage.input_tokens
+            self.totals["cached_input_tokens"] += usage.cached_input_tokens
+            self.totals["cache_write_tokens"] += usage.cache_write_tokens
+            self.totals["output_tokens"] += usage.output_tokens
+            if usage.time_to_first_token is not None:
+                self._ttfts.append(usage.time_to_first_token)
+                del self._ttfts[:-self.window]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Token totals, prompt cache hit share and recent time-to-first-token"""
+        with self._lock:
+            ttfts = sorted(self._ttfts)
+            input_tokens = self.totals["input_tokens"]
+            return {
+                **self.totals,
+                "cached_input_share": round(self.totals["cached_input_tokens"] / input_tokens, 4) if input_tokens else 0.0,
+                "p50_time_to_first_token": round(ttfts[len(ttfts) // 2], 4) if ttfts else None,
+                "p95_time_to_first_token": round(ttfts[int(len(ttfts) * 0.95)], 4) if ttfts else None
+            }
+
+_default_usage_stats: Optional[UsageStats] = None
+
+def get_default_usage_stats() -> UsageStats:
+    """Usage totals shared by all planners in the process"""
+    global _default_usage_stats
+    if _default_usage_stats is None:
+        _default_usage_stats = UsageStats()
+    return _default_usage_stats
@@ -0,0 +1,114 @@
+from typing import Dict, Any, Optional, List
+import os
+import re
+import threading
+from .intent_classifier import IntentClassifier, get_default_classifier
+
+# Services that usually become a node of their own in the plan
+KNOWN_INTEGRATIONS = [
+    "slack", "gmail", "email", "github", "gitlab", "jira", "trello", "asana", "notion", "airtable",
+    "google sheets", "sheets", "google drive", "dropbox", "s3", "postgres", "mysql", "mongodb",
+    "stripe", "shopify", "paypal", "hubspot", "salesforce", "twilio", "discord", "telegram",
+    "twitter", "linkedin", "youtube", "instagram", "tiktok", "openai", "webhook", "rss", "api"
+]
+
+_INTEGRATION_RE = re.compile(r"\b(" + "|".join(re.escape(name) for name in KNOWN_INTEGRATIONS) + r")\b")
+# Words that usually separate one workflow step from the next
+_STEP_RE = re.compile(r"\b(then|after|and|also|finally|next)\b|[,;]")
+
+class ModelTier:
+    """A model tier and the output budget for requests up to max_score"""
+
+    __slots__ = ("name", "max_score", "max_tokens")
+
+    def __init__(self, name: str, max_score: float, max_tokens: int):
+        self.name = name
+        self.max_score = max_score
+        self.max_tokens = max_tokens
+
+# Ordered cheapest first; the last tier catches everything
+DEFAULT_MODEL_TIERS = [
+    ModelTier("small", max_score=4.0, max_tokens=800),
+    ModelTier("standard", max_score=9.0, max_tokens=1500),
+    ModelTier("large", max_score=float("inf"), max_tokens=2000),
+]
+
+class ModelRoutingPolicy:
+    """Picks a model tier and max_tokens from an estimate of request complexity
+
+    The score adds up input length (one point per ten words), distinct
+    detected intents, named integrations and step separators. Each decision
+    is counted per tier so the split can be monitored.
+    """
+
+    def __init__(self, tiers: Optional[List[ModelTier]] = None, classifier: Optional[IntentClassifier] = None,
+                 enabled: bool = True):
+        self.tiers = tiers or DEFAULT_MODEL_TIERS
+        self.classifier = classifier or get_default_classifier()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "decisions": 0,
+            "tiers": {tier.name: 0 for tier in self.tiers},
+            "max_tokens_budgeted": 0,
+            "score_total": 0.0
+        }
+
+    def estimate(self, user_input: str) -> Dict[str, Any]:
+        """Complexity features and score for a request"""
+        text = user_input.lower()
+        words = len(text.split())
+        intents = len(self.classifier.classify(text))
+        integrations = len(set(_INTEGRATION_RE.findall(text)))
+        steps = len(_STEP_RE.findall(text))
+        return {
+            "words": words,
+            "intents": intents,
+            "integrations": integrations,
+            "steps": steps,
+            "score": round(words / 10 + intents + integrations + steps * 0.5, 2)
+        }
+
+    def route(self, user_input: str) -> Dict[str, Any]:
+        """Routing decision: tier name, max_tokens and the estimate behind it"""
+        estimate = self.estimate(user_input)
+        if self.enabled:
+            tier = next((t for t in self.tiers if estimate["score"] <= t.max_score), self.tiers[-1])
+        else:
+            tier = self.tiers[-1]
+        with self._lock:
+            self.stats["decisions"] += 1
+            self.stats["tiers"][tier.name] += 1
+            self.stats["max_tokens_budgeted"] += tier.max_tokens
+            self.stats["score_total"] += estimate["score"]
+        return {"tier": tier.name, "max_tokens": tier.max_tokens, **estimate}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Decision counts per tier and average score/budget"""
+        with self._lock:
+            decisions = self.stats["decisions"]
+            return {
+                "enabled": self.enabled,
+                "decisions": decisions,
+                "tiers": dict(self.stats["tiers"]),
+                "avg_score": round(self.stats["score_total"] / decisions, 2) if decisions else None,
+                "avg_max_tokens": round(self.stats["max_tokens_budgeted"] / decisions) if decisions else None
+            }
+
+_default_routing_policy: Optional[ModelRoutingPolicy] = None
+
+def get_default_routing_policy() -> ModelRoutingPolicy:
+    """Process-wide routing policy configured from the environment"""
+    global _default_routing_policy
+    if _default_routing_policy is None:
+        _default_routing_policy = ModelRoutingPolicy(
+            tiers=[
+                ModelTier("small", float(os.getenv("MODEL_ROUTING_SMALL_MAX_SCORE", "4")),
+                          int(os.getenv("MODEL_ROUTING_SMALL_MAX_TOKENS", "800"))),
+                ModelTier("standard", float(os.getenv("MODEL_ROUTING_STANDARD_MAX_SCORE", "9")),
+                          int(os.getenv("MODEL_ROUTING_STANDARD_MAX_TOKENS", "1500"))),
+                ModelTier("large", float("inf"), 2000),
+            ],
+            enabled=os.getenv("MODEL_ROUTING", "true").lower() == "true"
+        )
+    return _default_routing_policy
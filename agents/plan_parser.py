@@ -0,0 +1,382 @@
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+import re
+import threading
+from .json_codec import JSONDecodeError, loads
+
+# Top-level plan arrays whose elements are emitted as soon as they close
+STREAMED_ARRAYS = {"nodes": "node", "connections": "connection"}
+
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Tokens the repair scanner stops at outside strings
+_REPAIR_TOKEN = re.compile(r'["\'{}\[\],\u201c\u201d]|/[/*]|\b[A-Za-z_$][\w$-]*')
+_KEY_COLON = re.compile(r"\s*:")
+_VALID_STRING = re.compile(r'"(?:[^"\\\n\r\t]|\\.)*"')
+_DOUBLE_STRING_SPECIAL = re.compile(r'["\\\n\r\t]')
+_SINGLE_STRING_SPECIAL = re.compile(r"['\"\\\n\r\t]")
+_SMART_STRING_SPECIAL = re.compile(r'[\u201d"\\\n\r\t]')
+_FENCE = re.compile(r"```[A-Za-z]*[ \t]*\n")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+class PlanParseError(ValueError):
+    """LLM output that could not be turned into a valid plan"""
+
+class IncrementalPlanParser:
+    """Incremental JSON scanner for streamed LLM plan output
+
+    The text is scanned once, jumping between structural characters with
+    precompiled regexes. The parser tracks string state and the container
+    stack, skips any prose before the first '{', and decodes every element
+    of the top-level "nodes" and "connections" arrays the moment its closing
+    brace arrives.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._string_start = 0
+        self._last_top_string: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._element_start: Optional[int] = None
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level JSON object has closed"""
+        return self._end is not None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text and return the events it completed"""
+        events: List[Dict[str, Any]] = []
+        self._text += chunk
+        text = self._text
+        length = len(text)
+        stack = self._stack
+        i = self._pos
+
+        while i < length and self._end is None:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(text, i)
+                if match is None:
+                    i = length
+                    break
+                j = match.start()
+                if text[j] == "\\":
+                    if j + 1 >= length:
+                        # Escape split across chunks; resume here on the next feed
+                        i = j
+                        break
+                    i = j + 2
+                    continue
+                self._in_string = False
+                if len(stack) == 1:
+                    self._last_top_string = text[self._string_start + 1:j]
+                i = j + 1
+                continue
+
+            if not stack:
+                # Skip prose or fences before the JSON object
+                j = text.find("{", i)
+                if j < 0:
+                    i = length
+                    break
+                self._start = j
+                stack.append("{")
+                i = j + 1
+                continue
+
+            match = _STRUCTURAL.search(text, i)
+            if match is None:
+                i = length
+                break
+            j = match.start()
+            ch = text[j]
+            if ch == '"':
+                self._in_string = True
+                self._string_start = j
+            elif ch == "{" or ch == "[":
+                if ch == "[" and len(stack) == 1:
+                    self._array_key = self._last_top_string
+                elif ch == "{" and len(stack) == 2 and stack[1] == "[" and self._array_key in STREAMED_ARRAYS:
+                    self._element_start = j
+                stack.append(ch)
+            else:
+                stack.pop()
+                if ch == "}" and len(stack) == 2 and self._element_start is not None:
+                    event = self._decode_element(text[self._element_start:j + 1])
+                    if event is not None:
+                        events.append(event)
+                    self._element_start = None
+                elif ch == "]" and len(stack) == 1:
+                    self._array_key = None
+                if not stack:
+                    self._end = j + 1
+            i = j + 1
+
+        self._pos = i
+        return events
+
+    def _decode_element(self, fragment: str) -> Optional[Dict[str, Any]]:
+        event_type = STREAMED_ARRAYS[self._array_key]
+        try:
+            value = loads(fragment)
+        except JSONDecodeError:
+            try:
+                value = loads(repair_json(fragment)[0])
+            except (PlanParseError, JSONDecodeError):
+                # Leave hopeless elements to the final parse
+                return None
+        return {"type": event_type, event_type: value}
+
+    def result(self, stats: Optional["PlanParseStats"] = None) -> Dict[str, Any]:
+        """Decode, repair if needed and validate the complete plan object"""
+        if self._end is None:
+            if stats is not None:
+                stats.record(None)
+            raise PlanParseError("LLM output ended before the plan JSON object was complete")
+        return parse_plan(self._text[self._start:self._end], stats)
+
+def plan_events(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Node and connection events for an already complete plan"""
+    for node in plan.get("nodes", []):
+        yield {"type": "node", "node": node}
+    for connection in plan.get("connections", []):
+        yield {"type": "connection", "connection": connection}
+
+def repair_json(text: str) -> Tuple[str, List[str]]:
+    """Cut the outermost JSON object out of LLM output and fix common defects
+
+    One scan over the text, jumping between interesting characters with
+    precompiled regexes. The object inside the first code fence is preferred
+    over any brace in the surrounding prose, and anything after the object
+    closes is dropped. Trailing commas, single-quoted or curly-quoted
+    strings, Python literals, comments, unquoted keys and raw control
+    characters inside strings are rewritten to strict JSON. Returns the
+    repaired text and the kinds of repair applied.
+    """
+    repairs: List[str] = []
+    fence = _FENCE.search(text)
+    start = text.find("{", fence.end() if fence else 0)
+    if start < 0 and fence:
+        start = text.find("{")
+    if start < 0:
+        raise PlanParseError("No JSON object in LLM output")
+    if text[:start].strip():
+        repairs.append("extracted")
+
+    out: List[str] = ["{"]
+    depth = 1
+    # Index in `out` of a comma that is only kept if a value follows it
+    pending_comma: Optional[int] = None
+    i = start + 1
+    length = len(text)
+
+    def note(kind: str):
+        if kind not in repairs:
+            repairs.append(kind)
+
+    while i < length:
+        match = _REPAIR_TOKEN.search(text, i)
+        if match is None:
+            break
+        j = match.start()
+        if j > i:
+            between = text[i:j]
+            out.append(between)
+            if pending_comma is not None and between.strip():
+                pending_comma = None
+        token = match.group()
+        i = match.end()
+
+        valid = _VALID_STRING.match(text, j) if token == '"' else None
+        if valid is not None:
+            # Well-formed strings are copied whole
+            out.append(valid.group())
+            i = valid.end()
+            pending_comma = None
+        elif token in ('"', "'", "\u201c"):
+            if token == '"':
+                close, special = '"', _DOUBLE_STRING_SPECIAL
+            elif token == "'":
+                close, special = "'", _SINGLE_STRING_SPECIAL
+                note("single_quotes")
+            else:
+                close, special = "\u201d", _SMART_STRING_SPECIAL
+                note("smart_quotes")
+            pieces = ['"']
+            while True:
+                end = special.search(text, i)
+                if end is None:
+                    raise PlanParseError("LLM output ended inside a JSON string")
+                k = end.start()
+                pieces.append(text[i:k])
+                ch = text[k]
+                if ch == close:
+                    i = k + 1
+                    break
+                if ch == "\\":
+                    escaped = text[k + 1:k + 2]
+                    # \' is not a JSON escape; the quote needs none once double-quoted
+                    pieces.append(escaped if escaped == "'" else "\\" + escaped)
+                    i = k + 2
+                elif ch == '"':
+                    pieces.append('\\"')
+                    i = k + 1
+                else:
+                    note("control_character")
+                    pieces.append(_CONTROL_ESCAPES[ch])
+                    i = k + 1
+            pieces.append('"')
+            out.append("".join(pieces))
+            pending_comma = None
+        elif token == "{" or token == "[":
+            out.append(token)
+            depth += 1
+            pending_comma = None
+        elif token == "}" or token == "]":
+            if pending_comma is not None:
+                out[pending_comma] = ""
+                pending_comma = None
+                note("trailing_comma")
+            out.append(token)
+            depth -= 1
+            if depth == 0:
+                if text[i:].strip():
+                    note("extracted")
+                return "".join(out), repairs
+        elif token == ",":
+            pending_comma = len(out)
+            out.append(",")
+        elif token == "//":
+            newline = text.find("\n", i)
+            i = length if newline < 0 else newline
+            note("comment")
+        elif token == "/*":
+            close_comment = text.find("*/", i)
+            i = length if close_comment < 0 else close_comment + 2
+            note("comment")
+        elif token == "\u201d":
+            out.append('"')
+            note("smart_quotes")
+        elif _KEY_COLON.match(text, i):
+            out.append(f'"{token}"')
+            pending_comma = None
+            note("unquoted_key")
+        elif token in _PYTHON_LITERALS:
+            out.append(_PYTHON_LITERALS[token])
+            pending_comma = None
+            note("python_literal")
+        else:
+            # true, false, null or text the decoder will reject anyway
+            out.append(token)
+            pending_comma = None
+
+    raise PlanParseError("LLM output ended before the plan JSON object was complete")
+
+def extract_plan_json(text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """Decode the plan object in LLM output, repairing it only if strict parsing fails"""
+    if text.lstrip().startswith("{"):
+        try:
+            value = loads(text)
+            if isinstance(value, dict):
+                return value, []
+        except JSONDecodeError:
+            pass
+    repaired, repairs = repair_json(text)
+    try:
+        value = loads(repaired)
+    except JSONDecodeError as e:
+        raise PlanParseError(f"Unrecoverable JSON in LLM output: {e}") from e
+    return value, repairs
+
+def validate_plan(plan: Any) -> List[str]:
+    """Schema problems that would stop the workflow generator from using a plan"""
+    if not isinstance(plan, dict):
+        return ["plan is not a JSON object"]
+    errors = []
+    nodes = plan.get("nodes")
+    if not isinstance(nodes, list) or not nodes:
+        errors.append("plan has no nodes list")
+    else:
+        for index, node in enumerate(nodes):
+            if not isinstance(node, dict):
+                errors.append(f"node {index} is not an object")
+            elif not isinstance(node.get("type"), str) or not node["type"]:
+                errors.append(f"node {index} has no type")
+            elif not isinstance(node.get("parameters", {}), dict):
+                errors.append(f"node {index} parameters are not an object")
+    connections = plan.get("connections", [])
+    if not isinstance(connections, list):
+        errors.append("connections is not a list")
+    else:
+        for index, connection in enumerate(connections):
+            if not isinstance(connection, dict) or "from" not in connection or "to" not in connection:
+                errors.append(f"connection {index} needs 'from' and 'to'")
+    return errors
+
+def parse_plan(text: str, stats: Optional["PlanParseStats"] = None) -> Dict[str, Any]:
+    """Extract, repair and validate a plan from LLM output
+
+    Raises PlanParseError when nothing usable can be recovered. The repairs
+    that were needed, if any, are listed under the plan's "parse_repairs".
+    """
+    try:
+        plan, repairs = extract_plan_json(text)
+        errors = validate_plan(plan)
+        if errors:
+            raise PlanParseError("; ".join(errors[:3]))
+    except PlanParseError:
+        if stats is not None:
+            stats.record(None)
+        raise
+    if stats is not None:
+        stats.record(repairs)
+    if repairs:
+        plan["parse_repairs"] = repairs
+    return plan
+
+class PlanParseStats:
+    """Counts of clean, salvaged and discarded LLM plan outputs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {"clean": 0, "salvaged": 0, "discarded": 0, "repairs": {}}
+
+    def record(self, repairs: Optional[List[str]]):
+        """Record one parse: None if it was discarded, else the repairs it needed"""
+        with self._lock:
+            if repairs is None:
+                self.stats["discarded"] += 1
+            elif repairs:
+                self.stats["salvaged"] += 1
+                for kind in repairs:
+                    self.stats["repairs"][kind] = self.stats["repairs"].get(kind, 0) + 1
+            else:
+                self.stats["clean"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the share of non-strict outputs that were salvaged"""
+        with self._lock:
+            salvaged = self.stats["salvaged"]
+            broken = salvaged + self.stats["discarded"]
+            total = broken + self.stats["clean"]
+            return {
+                **self.stats,
+                "repairs": dict(self.stats["repairs"]),
+                "salvage_rate": round(salvaged / broken, 4) if broken else None,
+                "discard_rate": round(self.stats["discarded"] / total, 4) if total else 0.0
+            }
+
+_default_plan_parse_stats: Optional[PlanParseStats] = None
+
+def get_default_plan_parse_stats() -> PlanParseStats:
+    """Parse counters shared by all planners in the process"""
+    global _default_plan_parse_stats
+    if _default_plan_parse_stats is None:
+        _default_plan_parse_stats = PlanParseStats()
+    return _default_plan_parse_stats
@@ -0,0 +1,100 @@
+from typing import Dict, Any, List
+import copy
+import difflib
+from .plan_parser import PlanParseError
+
+# Plan fields sent back to the LLM as the base of an edit; the rest is run metadata
+PLAN_FIELDS = ("workflow_name", "description", "nodes", "connections", "estimated_complexity",
+               "required_credentials")
+PATCH_LISTS = ("add_nodes", "remove_nodes", "update_nodes", "add_connections", "remove_connections")
+
+def plan_body(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The plan without run metadata (usage, routing, timestamps, notes)"""
+    return {field: plan[field] for field in PLAN_FIELDS if field in plan}
+
+def diff_requirements(previous: str, current: str) -> Dict[str, Any]:
+    """Word-level phrases removed from and added to an edited requirement"""
+    old_words, new_words = previous.split(), current.split()
+    removed: List[str] = []
+    added: List[str] = []
+    matcher = difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op in ("delete", "replace"):
+            removed.append(" ".join(old_words[i1:i2]))
+        if op in ("insert", "replace"):
+            added.append(" ".join(new_words[j1:j2]))
+    return {"removed": removed, "added": added, "similarity": round(matcher.ratio(), 3)}
+
+def validate_plan_patch(patch: Any) -> List[str]:
+    """Shape problems that stop a patch from being applied"""
+    if not isinstance(patch, dict):
+        return ["patch is not a JSON object"]
+    errors = []
+    for key in PATCH_LISTS:
+        value = patch.get(key, [])
+        if not isinstance(value, list):
+            errors.append(f"{key} is not a list")
+            continue
+        for index, item in enumerate(value):
+            if key == "remove_nodes":
+                if not isinstance(item, str):
+                    errors.append(f"remove_nodes {index} is not a node id")
+            elif not isinstance(item, dict):
+                errors.append(f"{key} {index} is not an object")
+            elif key.endswith("_nodes") and not isinstance(item.get("id"), str):
+                errors.append(f"{key} {index} has no id")
+            elif key.endswith("_connections") and ("from" not in item or "to" not in item):
+                errors.append(f"{key} {index} needs 'from' and 'to'")
+    return errors
+
+def apply_plan_patch(plan: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """New plan with the patch applied; the base plan is left untouched
+
+    Removing a node also drops its connections. Updating a node merges the
+    given fields into it, an added node with an existing id replaces it,
+    and connections are de-duplicated on (from, to, output_index,
+    input_index).
+    """
+    errors = validate_plan_patch(patch)
+    if errors:
+        raise PlanParseError("; ".join(errors[:3]))
+
+    patched = copy.deepcopy(plan_body(plan))
+    for field in ("workflow_name", "description", "estimated_complexity", "required_credentials"):
+        if field in patch:
+            patched[field] = patch[field]
+
+    removed = set(patch.get("remove_nodes", []))
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for index, node in enumerate(patched.get("nodes", [])):
+        node_id = node.get("id", f"node_{index}")
+        if node_id not in removed:
+            nodes[node_id] = node
+    for update in patch.get("update_nodes", []):
+        node = nodes.get(update["id"])
+        if node is not None:
+            node.update(copy.deepcopy(update))
+    for node in patch.get("add_nodes", []):
+        nodes[node["id"]] = copy.deepcopy(node)
+    patched["nodes"] = list(nodes.values())
+
+    def connection_key(connection: Dict[str, Any]) -> tuple:
+        return (connection.get("from"), connection.get("to"),
+                connection.get("output_index", 0), connection.get("input_index", 0))
+
+    dropped = {(c["from"], c["to"]) for c in patch.get("remove_connections", [])}
+    connections: Dict[tuple, Dict[str, Any]] = {}
+    for connection in patched.get("connections", []):
+        if (connection.get("from"), connection.get("to")) in dropped:
+            continue
+        if connection.get("from") not in removed and connection.get("to") not in removed:
+            connections.setdefault(connection_key(connection), connection)
+    for connection in patch.get("add_connections", []):
+        if connection["from"] not in removed and connection["to"] not in removed:
+            connections.setdefault(connection_key(connection), copy.deepcopy(connection))
+    patched["connections"] = list(connections.values())
+    return patched
+
+def patch_summary(patch: Dict[str, Any]) -> Dict[str, int]:
+    """Number of changes of each kind in a patch"""
+    return {key: len(patch.get(key, [])) for key in PATCH_LISTS}
@@ -1,11 +1,12 @@
-from typing import Dict, Any, List
-import json
+from typing import Dict, Any, List, AsyncIterator, Iterable, Iterator, Tuple
+import copy
 import asyncio
+import os
+import time
 # Mock ADK Classes
 from typing import Dict, Any, List, Optional
 from abc import ABC, abstractmethod
 from datetime import datetime
-import json
 
 class Message:
     def __init__(self, content: str, sender: str, metadata: Optional[Dict[str, Any]] = None):
@@ -25,128 +26,205 @@ class LlmAgent(ABC):
     @abstractmethod
     async def run(self, message: Message) -> Message:
         pass
-import openai
-import anthropic
-import os
+from .llm_providers import LLMProvider
+from .json_codec import dumps, loads
+from .hedging import create_hedged_provider
+from .provider_router import create_provider_router
+from .single_flight import SingleFlight, get_default_single_flight
+from .plan_parser import IncrementalPlanParser, PlanParseError, PlanParseStats, plan_events, parse_plan, \
+    extract_plan_json, validate_plan, get_default_plan_parse_stats
+from .intent_classifier import get_default_classifier
+from .plan_templates import PlanTemplate, FALLBACK_PLAN_TEMPLATES
+from .llm_usage import LLMUsage, UsageStats, get_default_usage_stats
+from .model_routing import ModelRoutingPolicy, get_default_routing_policy
+from .plan_patch import apply_plan_patch, diff_requirements, patch_summary, plan_body
+from memory.plan_cache import PlanCache, get_default_plan_cache, make_plan_key, normalize_input
+from memory.plan_index import PlanIndex, get_default_plan_index
+
+# Bump whenever the planning prompt changes so cached plans are not reused
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Static instructions and schema sent as the system prefix of every planning
+# request, so providers can serve it from their prompt cache
+PLANNING_SYSTEM_PROMPT = """You are an expert n8n workflow architect. Given a user requirement, create a detailed plan for an n8n workflow.
+
+The plan should cover the workflow purpose, the required nodes and their types, node connections and flow, data transformations, error handling and expected outputs.
+
+Respond with a JSON object with this structure:
+{"workflow_name": "descriptive name", "description": "workflow purpose", "nodes": [{"id": "node_id", "type": "n8n-node-type", "name": "Node Name", "description": "what this node does", "parameters": {}}], "connections": [{"from": "source_node_id", "to": "target_node_id", "output_index": 0, "input_index": 0}], "estimated_complexity": "low|medium|high", "required_credentials": []}"""
+
+# System prefix for incremental re-planning: the LLM returns only the changes to the plan
+PLAN_PATCH_SYSTEM_PROMPT = """You are an expert n8n workflow architect. The user has edited the requirement of an existing n8n workflow plan. Update the plan for the new requirement by returning only what changes.
+
+Respond with a JSON object with this structure, leaving out keys that do not change:
+{"workflow_name": "new name", "description": "new purpose", "add_nodes": [{"id": "node_id", "type": "n8n-node-type", "name": "Node Name", "description": "what this node does", "parameters": {}}], "remove_nodes": ["node_id"], "update_nodes": [{"id": "node_id", "field": "new value"}], "add_connections": [{"from": "source_node_id", "to": "target_node_id", "output_index": 0, "input_index": 0}], "remove_connections": [{"from": "source_node_id", "to": "target_node_id"}]}
+
+Keep the ids of existing nodes. Respond with {} if the plan already fits the new requirement."""
+
+# Output budget for a plan patch; edits are much smaller than whole plans
+PLAN_PATCH_MAX_TOKENS = 800
+
+FALLBACK_MODE_NOTE = "Generated using fallback mode (no API key)"
+SPECULATIVE_FALLBACK_NOTE = "Generated using fallback mode (LLM plan missed the deadline)"
 
 class PlannerAgent(LlmAgent):
-    def __init__(self, name: str = "planner_agent", llm_provider: str = "openrouter"):
+    def __init__(self, name: str = "planner_agent", llm_provider: str = "openrouter",
+                 provider: Optional[LLMProvider] = None, plan_cache: Optional[PlanCache] = None,
+                 use_cache: bool = True, plan_index: Optional[PlanIndex] = None,
+                 use_similarity: bool = True, single_flight: Optional[SingleFlight] = None,
+                 coalesce: bool = True, hedge: Optional[bool] = None,
+                 usage_stats: Optional[UsageStats] = None,
+                 routing_policy: Optional[ModelRoutingPolicy] = None,
+                 parse_stats: Optional[PlanParseStats] = None,
+                 base_urls: Optional[Dict[str, str]] = None):
         super().__init__(name=name)
         self.description = "Plans n8n workflow structure based on user requirements"
         self.llm_provider = llm_provider
+        self.provider = provider
+        # Provider name -> base URL override, e.g. a local replay server
+        self.base_urls = base_urls
+        self.plan_cache = (plan_cache or get_default_plan_cache()) if use_cache else None
+        self.plan_index = (plan_index or get_default_plan_index()) if use_similarity else None
+        self.single_flight = (single_flight or get_default_single_flight()) if coalesce else None
+        if hedge is None:
+            hedge = os.getenv("LLM_HEDGING", "false").lower() == "true"
+        self.hedge = hedge
+        self.usage_stats = usage_stats or get_default_usage_stats()
+        self.routing_policy = routing_policy or get_default_routing_policy()
+        self.parse_stats = parse_stats or get_default_plan_parse_stats()
         self._setup_llm()
     
     def _setup_llm(self):
-        """Setup LLM client based on provider"""
+        """Setup async LLM provider based on provider name"""
         try:
-            if self.llm_provider == "openrouter":
-                api_key = os.getenv("OPENROUTER_API_KEY")
-                if not api_key:
-                    print("Warning: OPENROUTER_API_KEY not set, using fallback mode")
-                    self.client = None
-                    return
-                    
-                self.client = openai.OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=api_key
-                )
-                self.model = "anthropic/claude-3.5-sonnet"
-            elif self.llm_provider == "anthropic":
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-                if not api_key:
-                    print("Warning: ANTHROPIC_API_KEY not set, using fallback mode")
-                    self.client = None
-                    return
-                    
-                self.client = anthropic.Anthropic(
-                    api_key=api_key
-                )
-                self.model = "claude-3-sonnet-20240229"
+            if self.provider is None:
+                if self.hedge:
+                    self.provider = create_hedged_provider(self.llm_provider, self.base_urls)
+                else:
+                    self.provider = create_provider_router(self.llm_provider, self.base_urls)
         except Exception as e:
             print(f"LLM setup failed: {e}")
-            self.client = None
+            self.provider = None
+        
+        self.model = self.provider.model if self.provider else None
+    
+    @property
+    def client(self):
+        """SDK client of the provider; built (and its SDK imported) on first access"""
+        return self.provider.client if self.provider else None
+    
+    def _plan_key(self, user_input: str) -> str:
+        """Cache and coalescing key for a planning request"""
+        provider_name = self.provider.name if self.provider else "fallback"
+        return make_plan_key(user_input, provider_name, self.model, PROMPT_TEMPLATE_VERSION)
     
     async def plan_workflow(self, user_input: str) -> Dict[str, Any]:
         """Create a detailed plan for the n8n workflow"""
+        if self.single_flight is None or not self.provider:
+            return await self._plan_workflow(user_input)
+        
+        # Identical concurrent requests share one in-flight planning call
+        plan = await self.single_flight.do(
+            self._plan_key(user_input),
+            lambda: self._plan_workflow(user_input)
+        )
+        return copy.deepcopy(plan)
+    
+    async def plan_workflows(self, inputs: Iterable[str], concurrency: int = 8
+                             ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Plan many requests, yielding (index, plan) pairs in completion order
+        
+        Inputs that normalize to the same text are planned once, and plans
+        already in the cache or index are yielded before any LLM call. The
+        rest are planned by at most `concurrency` workers; their LLM requests
+        queue on the provider's shared rate limiter.
+        """
+        positions: Dict[str, List[int]] = {}
+        unique: List[str] = []
+        for index, user_input in enumerate(inputs):
+            key = normalize_input(user_input)
+            if key not in positions:
+                positions[key] = []
+                unique.append(user_input)
+            positions[key].append(index)
+        
+        def fan_out(user_input: str, plan: Dict[str, Any]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+            indices = positions[normalize_input(user_input)]
+            for index in indices[:-1]:
+                yield index, copy.deepcopy(plan)
+            yield indices[-1], plan
+        
+        misses: List[str] = []
+        for user_input in unique:
+            plan = self._find_existing_plan(user_input)
+            if plan is None:
+                misses.append(user_input)
+                continue
+            for result in fan_out(user_input, plan):
+                yield result
+        if not misses:
+            return
+        
+        todo: asyncio.Queue = asyncio.Queue()
+        for user_input in misses:
+            todo.put_nowait(user_input)
+        done: asyncio.Queue = asyncio.Queue()
+        
+        async def worker():
+            while not todo.empty():
+                user_input = todo.get_nowait()
+                await done.put((user_input, await self.plan_workflow(user_input)))
+        
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(misses)))]
         try:
-            # If no LLM client available, use fallback immediately
-            if not self.client:
-                print("No LLM client available, using fallback plan")
-                plan = self._create_fallback_plan(user_input)
-                plan["status"] = "success"
-                plan["timestamp"] = self._get_timestamp()
-                plan["note"] = "Generated using fallback mode (no API key)"
-                return plan
+            for _ in range(len(misses)):
+                user_input, plan = await done.get()
+                for result in fan_out(user_input, plan):
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _plan_workflow(self, user_input: str) -> Dict[str, Any]:
+        """Plan a single request: cache, similar-plan reuse, then the LLM"""
+        try:
+            existing_plan = self._find_existing_plan(user_input)
+            if existing_plan is not None:
+                return existing_plan
             
-            planning_prompt = f"""
-            You are an expert n8n workflow architect. Given the user requirement below, create a detailed plan for an n8n workflow.
-
-            User Requirement: {user_input}
-
-            Please provide a structured plan that includes:
-            1. Workflow overview and purpose
-            2. Required nodes and their types
-            3. Node connections and flow
-            4. Data transformations needed
-            5. Error handling considerations
-            6. Expected outputs
-
-            Format your response as a JSON object with the following structure:
-            {{
-                "workflow_name": "descriptive name",
-                "description": "workflow purpose",
-                "nodes": [
-                    {{
-                        "id": "node_id",
-                        "type": "n8n-node-type",
-                        "name": "Node Name",
-                        "description": "what this node does",
-                        "parameters": {{}},
-                        "position": [x, y]
-                    }}
-                ],
-                "connections": [
-                    {{
-                        "from": "source_node_id",
-                        "to": "target_node_id",
-                        "output_index": 0,
-                        "input_index": 0
-                    }}
-                ],
-                "estimated_complexity": "low|medium|high",
-                "required_credentials": []
-            }}
-            """
+            planning_prompt = self._build_planning_prompt(user_input)
+            routing = self.routing_policy.route(user_input)
+            usage = LLMUsage()
             
             try:
-                if self.llm_provider == "openrouter":
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[{"role": "user", "content": planning_prompt}],
-                        temperature=0.3,
-                        max_tokens=2000
-                    )
-                    plan_text = response.choices[0].message.content
-                else:
-                    response = self.client.messages.create(
-                        model=self.model,
-                        max_tokens=2000,
-                        temperature=0.3,
-                        messages=[{"role": "user", "content": planning_prompt}]
-                    )
-                    plan_text = response.content[0].text
+                plan_text = await self.provider.complete(
+                    planning_prompt,
+                    max_tokens=routing["max_tokens"],
+                    temperature=0.3,
+                    system=PLANNING_SYSTEM_PROMPT,
+                    usage=usage,
+                    tier=routing["tier"]
+                )
+                self.usage_stats.record(usage)
                 
-                # Parse JSON response
+                # Parse JSON response, salvaging fenced or slightly malformed output
                 try:
-                    plan = json.loads(plan_text)
-                except json.JSONDecodeError:
-                    print("Failed to parse LLM response as JSON, using fallback")
+                    plan = parse_plan(plan_text, self.parse_stats)
+                    self._remember_plan(user_input, plan)
+                    plan["llm_usage"] = usage.to_dict()
+                    plan["routing"] = routing
+                    plan["plan_source"] = "llm"
+                except PlanParseError as parse_error:
+                    print(f"Failed to parse LLM response as a plan ({parse_error}), using fallback")
                     plan = self._create_fallback_plan(user_input)
+                    plan["plan_source"] = "fallback"
                 
             except Exception as api_error:
                 print(f"LLM API call failed: {api_error}")
                 plan = self._create_fallback_plan(user_input)
                 plan["note"] = f"LLM API failed: {str(api_error)}"
+                plan["plan_source"] = "fallback"
             
             plan["status"] = "success"
             plan["timestamp"] = self._get_timestamp()
@@ -162,905 +240,255 @@ class PlannerAgent(LlmAgent):
                 "fallback_plan": self._create_fallback_plan(user_input)
             }
     
-    def _create_fallback_plan(self, user_input: str) -> Dict[str, Any]:
-        """Create intelligent fallback plan based on input keywords"""
-        input_lower = user_input.lower()
+    async def plan_workflow_stream(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream planning events as the LLM output arrives
         
-        # More sophisticated keyword detection
-        if any(word in input_lower for word in ["webhook", "api", "receive", "endpoint"]):
-            return self._create_webhook_plan(user_input)
-        elif any(word in input_lower for word in ["rss", "feed", "monitor", "check"]):
-            return self._create_rss_plan(user_input)
-        elif any(word in input_lower for word in ["csv", "file", "upload", "process", "data"]):
-            return self._create_file_plan(user_input)
-        elif any(word in input_lower for word in ["email", "mail", "notification", "alert"]):
-            return self._create_email_plan(user_input)
-        elif any(word in input_lower for word in ["youtube", "video", "channel", "social media", "posts", "schedule"]):
-            return self._create_social_media_plan(user_input)
-        elif any(word in input_lower for word in ["github", "jira", "slack", "integration", "api"]):
-            return self._create_api_integration_plan(user_input)
-        elif any(word in input_lower for word in ["order", "ecommerce", "e-commerce", "payment", "inventory"]):
-            return self._create_ecommerce_plan(user_input)
-        elif any(word in input_lower for word in ["test", "testing", "qa", "quality", "automation"]):
-            return self._create_testing_plan(user_input)
-        elif any(word in input_lower for word in ["developer", "development", "code", "deploy", "build"]):
-            return self._create_developer_plan(user_input)
-        else:
-            return self._create_intelligent_generic_plan(user_input)
+        Yields {"type": "node"} and {"type": "connection"} events as soon as each
+        object in the plan closes, a {"type": "reset"} event if the streamed
+        output has to be discarded for the fallback plan, and finally a
+        {"type": "plan"} event carrying the complete plan.
+        """
+        try:
+            plan = self._find_existing_plan(user_input)
+            if plan is not None:
+                for event in plan_events(plan):
+                    yield event
+                yield {"type": "plan", "plan": plan}
+                return
+            
+            start = time.perf_counter()
+            first_node_at = None
+            streamed_events = 0
+            parser = IncrementalPlanParser()
+            routing = self.routing_policy.route(user_input)
+            usage = LLMUsage()
+            try:
+                async for chunk in self.provider.stream(
+                    self._build_planning_prompt(user_input),
+                    max_tokens=routing["max_tokens"],
+                    temperature=0.3,
+                    system=PLANNING_SYSTEM_PROMPT,
+                    usage=usage,
+                    tier=routing["tier"]
+                ):
+                    for event in parser.feed(chunk):
+                        if first_node_at is None and event["type"] == "node":
+                            first_node_at = time.perf_counter() - start
+                        streamed_events += 1
+                        yield event
+                
+                self.usage_stats.record(usage)
+                plan = parser.result(self.parse_stats)
+                self._remember_plan(user_input, plan)
+                plan["llm_usage"] = usage.to_dict()
+                plan["routing"] = routing
+                plan["plan_source"] = "llm"
+                
+            except Exception as stream_error:
+                print(f"Streaming LLM plan failed: {stream_error}")
+                if streamed_events:
+                    yield {"type": "reset", "reason": str(stream_error)}
+                plan = self._create_fallback_plan(user_input)
+                plan["note"] = f"LLM stream failed: {str(stream_error)}"
+                plan["plan_source"] = "fallback"
+                for event in plan_events(plan):
+                    yield event
+            
+            plan["status"] = "success"
+            plan["timestamp"] = self._get_timestamp()
+            plan["streaming"] = {
+                "time_to_first_node": round(first_node_at, 4) if first_node_at is not None else None,
+                "total_time": round(time.perf_counter() - start, 4)
+            }
+            yield {"type": "plan", "plan": plan}
+            
+        except Exception as e:
+            print(f"Planning failed with error: {e}")
+            yield {
+                "type": "plan",
+                "plan": {
+                    "status": "error",
+                    "error": str(e),
+                    "timestamp": self._get_timestamp(),
+                    "fallback_plan": self._create_fallback_plan(user_input)
+                }
+            }
+    
+    async def replan_workflow(self, user_input: str, previous_input: str,
+                              previous_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-plan an edited requirement as a patch against the previous plan
+        
+        The LLM gets the previous plan and the word-level change to the
+        requirement, and returns only added, removed or updated nodes and
+        connections. A cached or similar past plan is served as by
+        plan_workflow(), and a full plan_workflow() is the fallback when the
+        patch cannot be parsed or yields an invalid plan.
+        """
+        existing_plan = self._find_existing_plan(user_input)
+        if existing_plan is not None:
+            return existing_plan
+        
+        changes = diff_requirements(previous_input, user_input)
+        routing = self.routing_policy.route(user_input)
+        usage = LLMUsage()
+        try:
+            patch_text = await self.provider.complete(
+                self._build_patch_prompt(user_input, previous_input, previous_plan, changes),
+                max_tokens=min(PLAN_PATCH_MAX_TOKENS, routing["max_tokens"]),
+                temperature=0.3,
+                system=PLAN_PATCH_SYSTEM_PROMPT,
+                usage=usage,
+                tier=routing["tier"]
+            )
+            self.usage_stats.record(usage)
+            try:
+                patch, repairs = extract_plan_json(patch_text)
+                plan = apply_plan_patch(previous_plan, patch)
+                errors = validate_plan(plan)
+                if errors:
+                    raise PlanParseError("; ".join(errors[:3]))
+            except PlanParseError:
+                self.parse_stats.record(None)
+                raise
+            self.parse_stats.record(repairs)
+        except Exception as replan_error:
+            print(f"Incremental re-planning failed ({replan_error}), planning from scratch")
+            return await self.plan_workflow(user_input)
+        
+        self._remember_plan(user_input, plan)
+        plan["llm_usage"] = usage.to_dict()
+        plan["routing"] = routing
+        plan["replan"] = {"base_requirement": previous_input, "changes": changes, "patch": patch_summary(patch)}
+        plan["plan_source"] = "llm"
+        plan["status"] = "success"
+        plan["timestamp"] = self._get_timestamp()
+        return plan
+    
+    def _build_patch_prompt(self, user_input: str, previous_input: str, previous_plan: Dict[str, Any],
+                            changes: Dict[str, Any]) -> str:
+        """User suffix of a re-planning request; the static part is PLAN_PATCH_SYSTEM_PROMPT"""
+        return (
+            f"Current plan: {dumps(plan_body(previous_plan))}\n"
+            f"Previous requirement: {previous_input}\n"
+            f"Updated requirement: {user_input}\n"
+            f"Removed words: {dumps(changes['removed'])}\n"
+            f"Added words: {dumps(changes['added'])}"
+        )
+    
+    def _find_existing_plan(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """Plan without calling the LLM: fallback mode, plan cache, or a similar past plan"""
+        # If no LLM client available, use fallback immediately
+        if not self.provider:
+            print("No LLM client available, using fallback plan")
+            plan = self._create_fallback_plan(user_input)
+            plan["status"] = "success"
+            plan["timestamp"] = self._get_timestamp()
+            plan["note"] = FALLBACK_MODE_NOTE
+            plan["plan_source"] = "fallback"
+            return plan
+        
+        # Serve repeated requests from the plan cache without calling the LLM
+        if self.plan_cache is not None:
+            cached_plan = self.plan_cache.retrieve(self._plan_key(user_input))
+            if cached_plan is not None:
+                cached_plan["status"] = "success"
+                cached_plan["timestamp"] = self._get_timestamp()
+                cached_plan["cached"] = True
+                cached_plan["plan_source"] = "cache"
+                return cached_plan
+        
+        # Reuse the plan of a previously planned, rephrased version of this request
+        if self.plan_index is not None:
+            match = self.plan_index.lookup(user_input)
+            if match is not None:
+                plan = match["plan"]
+                plan["status"] = "success"
+                plan["timestamp"] = self._get_timestamp()
+                plan["reused_from"] = {
+                    "prompt": match["matched_prompt"],
+                    "similarity": match["similarity"]
+                }
+                plan["plan_source"] = "similar"
+                return plan
+        
+        return None
+    
+    def speculative_plan(self, user_input: str) -> Dict[str, Any]:
+        """Keyword fallback plan that stands in when the LLM misses a deadline"""
+        plan = self._create_fallback_plan(user_input)
+        plan["status"] = "success"
+        plan["timestamp"] = self._get_timestamp()
+        plan["note"] = SPECULATIVE_FALLBACK_NOTE
+        plan["plan_source"] = "speculative"
+        return plan
+    
+    def _remember_plan(self, user_input: str, plan: Dict[str, Any]):
+        """Store a freshly parsed LLM plan for exact and near-duplicate reuse"""
+        if self.plan_cache is not None:
+            self.plan_cache.store(self._plan_key(user_input), plan)
+        if self.plan_index is not None:
+            self.plan_index.store(user_input, plan)
+    
+    def _build_planning_prompt(self, user_input: str) -> str:
+        """Dynamic user suffix of the planning prompt; the static part is PLANNING_SYSTEM_PROMPT"""
+        return f"User Requirement: {user_input}"
+    
+    def _fallback_template(self, user_input: str) -> PlanTemplate:
+        """Pick the fallback plan template for the best scoring input intent"""
+        intent = get_default_classifier().top_intent(user_input)
+        if intent in FALLBACK_PLAN_TEMPLATES:
+            return FALLBACK_PLAN_TEMPLATES[intent]
+        return self._generic_template(user_input)
+    
+    def _generic_template(self, user_input: str) -> PlanTemplate:
+        """Pick the generic plan template based on request complexity"""
+        if len(user_input.split()) > 20:  # Complex request
+            return FALLBACK_PLAN_TEMPLATES["generic_complex"]
+        return FALLBACK_PLAN_TEMPLATES["generic_simple"]
+    
+    def _create_fallback_plan(self, user_input: str) -> Dict[str, Any]:
+        """Create intelligent fallback plan for the best scoring input intent"""
+        return self._fallback_template(user_input).instantiate(user_input)
     
     def _create_webhook_plan(self, user_input: str) -> Dict[str, Any]:
         """Create webhook-specific plan"""
-        return {
-            "workflow_name": f"Webhook Workflow: {user_input[:30]}...",
-            "description": f"Webhook-based workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "webhook_trigger",
-                    "type": "n8n-nodes-base.webhook",
-                    "name": "Webhook Trigger",
-                    "description": "Receives webhook data",
-                    "parameters": {
-                        "httpMethod": "POST",
-                        "path": "webhook-data",
-                        "responseMode": "onReceived"
-                    },
-                    "position": [250, 300]
-                },
-                {
-                    "id": "process_data",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Process Data",
-                    "description": "Processes incoming webhook data",
-                    "parameters": {
-                        "jsCode": "// Process webhook data\nconst data = items[0].json;\nreturn [{json: {processed: true, data: data}}];"
-                    },
-                    "position": [450, 300]
-                },
-                {
-                    "id": "response",
-                    "type": "n8n-nodes-base.respondToWebhook",
-                    "name": "Respond",
-                    "description": "Send response back",
-                    "parameters": {
-                        "respondWith": "json",
-                        "responseBody": '{"status": "success"}'
-                    },
-                    "position": [650, 300]
-                }
-            ],
-            "connections": [
-                {"from": "webhook_trigger", "to": "process_data", "output_index": 0, "input_index": 0},
-                {"from": "process_data", "to": "response", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "medium",
-            "required_credentials": []
-        }
+        return FALLBACK_PLAN_TEMPLATES["webhook"].instantiate(user_input)
     
     def _create_rss_plan(self, user_input: str) -> Dict[str, Any]:
         """Create RSS monitoring plan"""
-        return {
-            "workflow_name": f"RSS Monitor: {user_input[:30]}...",
-            "description": f"RSS monitoring workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "rss_trigger",
-                    "type": "n8n-nodes-base.rssFeedRead",
-                    "name": "RSS Feed Reader",
-                    "description": "Monitors RSS feed for new items",
-                    "parameters": {
-                        "url": "https://example.com/feed.xml"
-                    },
-                    "position": [250, 300]
-                },
-                {
-                    "id": "filter_new",
-                    "type": "n8n-nodes-base.filter",
-                    "name": "Filter New Items",
-                    "description": "Filters for new items only",
-                    "parameters": {},
-                    "position": [450, 300]
-                },
-                {
-                    "id": "save_data",
-                    "type": "n8n-nodes-base.googleSheets",
-                    "name": "Save to Sheets",
-                    "description": "Saves new RSS items to Google Sheets",
-                    "parameters": {
-                        "operation": "append"
-                    },
-                    "position": [650, 300]
-                }
-            ],
-            "connections": [
-                {"from": "rss_trigger", "to": "filter_new", "output_index": 0, "input_index": 0},
-                {"from": "filter_new", "to": "save_data", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "medium",
-            "required_credentials": ["googleSheetsApi"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["rss"].instantiate(user_input)
     
     def _create_file_plan(self, user_input: str) -> Dict[str, Any]:
         """Create file processing plan"""
-        return {
-            "workflow_name": f"File Processor: {user_input[:30]}...",
-            "description": f"File processing workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "manual_trigger",
-                    "type": "n8n-nodes-base.manualTrigger",
-                    "name": "Manual Trigger",
-                    "description": "Start file processing",
-                    "parameters": {},
-                    "position": [250, 300]
-                },
-                {
-                    "id": "read_file",
-                    "type": "n8n-nodes-base.readBinaryFile",
-                    "name": "Read File",
-                    "description": "Read uploaded file",
-                    "parameters": {},
-                    "position": [450, 300]
-                },
-                {
-                    "id": "process_csv",
-                    "type": "n8n-nodes-base.spreadsheetFile",
-                    "name": "Process CSV",
-                    "description": "Parse and process CSV data",
-                    "parameters": {
-                        "operation": "read"
-                    },
-                    "position": [650, 300]
-                }
-            ],
-            "connections": [
-                {"from": "manual_trigger", "to": "read_file", "output_index": 0, "input_index": 0},
-                {"from": "read_file", "to": "process_csv", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "medium",
-            "required_credentials": []
-        }
+        return FALLBACK_PLAN_TEMPLATES["file"].instantiate(user_input)
     
     def _create_email_plan(self, user_input: str) -> Dict[str, Any]:
         """Create email workflow plan"""
-        return {
-            "workflow_name": f"Email Workflow: {user_input[:30]}...",
-            "description": f"Email-based workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "trigger",
-                    "type": "n8n-nodes-base.manualTrigger",
-                    "name": "Manual Trigger",
-                    "description": "Start email workflow",
-                    "parameters": {},
-                    "position": [250, 300]
-                },
-                {
-                    "id": "prepare_email",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Prepare Email",
-                    "description": "Prepare email content",
-                    "parameters": {
-                        "jsCode": "// Prepare email content\nreturn [{json: {to: 'user@example.com', subject: 'Notification', body: 'Your workflow has been triggered'}}];"
-                    },
-                    "position": [450, 300]
-                },
-                {
-                    "id": "send_email",
-                    "type": "n8n-nodes-base.emailSend",
-                    "name": "Send Email",
-                    "description": "Send email notification",
-                    "parameters": {},
-                    "position": [650, 300]
-                }
-            ],
-            "connections": [
-                {"from": "trigger", "to": "prepare_email", "output_index": 0, "input_index": 0},
-                {"from": "prepare_email", "to": "send_email", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "low",
-            "required_credentials": ["smtp"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["email"].instantiate(user_input)
     
     def _create_social_media_plan(self, user_input: str) -> Dict[str, Any]:
         """Create comprehensive social media automation plan"""
-        return {
-            "workflow_name": f"YouTube/Social Media Automation System",
-            "description": f"Complete social media automation workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "schedule_trigger",
-                    "type": "n8n-nodes-base.cron",
-                    "name": "Content Schedule",
-                    "description": "Triggers content creation and posting schedule",
-                    "parameters": {
-                        "rule": {
-                            "interval": [{"field": "hour", "value": 9}, {"field": "minute", "value": 0}]
-                        }
-                    },
-                    "position": [200, 200]
-                },
-                {
-                    "id": "content_database",
-                    "type": "n8n-nodes-base.googleSheets",
-                    "name": "Content Database",
-                    "description": "Fetches content ideas and scripts from database",
-                    "parameters": {
-                        "operation": "read",
-                        "sheetId": "content_library",
-                        "range": "A:J"
-                    },
-                    "position": [400, 200]
-                },
-                {
-                    "id": "ai_content_generator",
-                    "type": "n8n-nodes-base.openAi",
-                    "name": "AI Content Generator",
-                    "description": "Generates video scripts and descriptions using AI",
-                    "parameters": {
-                        "operation": "complete",
-                        "model": "gpt-4",
-                        "prompt": "Create engaging YouTube content based on: {{$json.topic}}"
-                    },
-                    "position": [600, 150]
-                },
-                {
-                    "id": "thumbnail_generator",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "Thumbnail Generator",
-                    "description": "Creates custom thumbnails using AI image generation",
-                    "parameters": {
-                        "method": "POST",
-                        "url": "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
-                        "headers": {
-                            "Authorization": "Bearer {{$credentials.stabilityAi.apiKey}}"
-                        }
-                    },
-                    "position": [600, 250]
-                },
-                {
-                    "id": "video_processor",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Video Processing",
-                    "description": "Processes video metadata and optimization",
-                    "parameters": {
-                        "jsCode": "// Process video for different platforms\nconst platforms = ['youtube', 'tiktok', 'instagram', 'linkedin'];\nconst content = $json;\nconst results = [];\n\nplatforms.forEach(platform => {\n  const optimized = {\n    platform,\n    title: content.title.substring(0, platform === 'youtube' ? 100 : 60),\n    description: content.description,\n    tags: content.tags.slice(0, platform === 'youtube' ? 15 : 5),\n    thumbnail: content.thumbnail,\n    schedule_time: content.optimal_times[platform]\n  };\n  results.push({json: optimized});\n});\n\nreturn results;"
-                    },
-                    "position": [800, 200]
-                },
-                {
-                    "id": "youtube_upload",
-                    "type": "n8n-nodes-base.youTube",
-                    "name": "YouTube Upload",
-                    "description": "Uploads video to YouTube with metadata",
-                    "parameters": {
-                        "operation": "upload",
-                        "title": "={{$json.title}}",
-                        "description": "={{$json.description}}",
-                        "tags": "={{$json.tags}}",
-                        "categoryId": "22",
-                        "privacy": "public"
-                    },
-                    "position": [1000, 100]
-                },
-                {
-                    "id": "tiktok_upload",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "TikTok Upload",
-                    "description": "Uploads content to TikTok",
-                    "parameters": {
-                        "method": "POST",
-                        "url": "https://open-api.tiktok.com/share/video/upload/",
-                        "headers": {
-                            "Authorization": "Bearer {{$credentials.tiktok.accessToken}}"
-                        }
-                    },
-                    "position": [1000, 200]
-                },
-                {
-                    "id": "instagram_upload",
-                    "type": "n8n-nodes-base.instagram",
-                    "name": "Instagram Upload",
-                    "description": "Posts to Instagram with hashtags",
-                    "parameters": {
-                        "operation": "post",
-                        "type": "media",
-                        "caption": "={{$json.description}} {{$json.tags.join(' ')}}"
-                    },
-                    "position": [1000, 300]
-                },
-                {
-                    "id": "linkedin_post",
-                    "type": "n8n-nodes-base.linkedIn",
-                    "name": "LinkedIn Post",
-                    "description": "Creates professional LinkedIn post",
-                    "parameters": {
-                        "operation": "create",
-                        "text": "={{$json.description}}",
-                        "visibility": "public"
-                    },
-                    "position": [1000, 400]
-                },
-                {
-                    "id": "analytics_tracker",
-                    "type": "n8n-nodes-base.googleAnalytics",
-                    "name": "Analytics Tracker",
-                    "description": "Tracks performance across all platforms",
-                    "parameters": {
-                        "operation": "report",
-                        "reportType": "social_media_performance"
-                    },
-                    "position": [1200, 200]
-                },
-                {
-                    "id": "performance_analyzer",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Performance Analyzer",
-                    "description": "Analyzes content performance and suggests improvements",
-                    "parameters": {
-                        "jsCode": "// Analyze performance metrics\nconst metrics = $json;\nconst analysis = {\n  engagement_rate: (metrics.likes + metrics.comments + metrics.shares) / metrics.views,\n  best_performing_time: metrics.peak_engagement_hour,\n  content_score: metrics.retention_rate * 100,\n  recommendations: []\n};\n\nif (analysis.engagement_rate < 0.03) {\n  analysis.recommendations.push('Improve thumbnail design');\n  analysis.recommendations.push('Optimize title for SEO');\n}\n\nif (metrics.retention_rate < 0.5) {\n  analysis.recommendations.push('Create more engaging openings');\n  analysis.recommendations.push('Improve content pacing');\n}\n\nreturn [{json: analysis}];"
-                    },
-                    "position": [1400, 150]
-                },
-                {
-                    "id": "trend_analyzer",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "Trend Analyzer",
-                    "description": "Analyzes current trends and viral content",
-                    "parameters": {
-                        "method": "GET",
-                        "url": "https://api.trending-topics.com/v1/trends",
-                        "headers": {
-                            "Authorization": "Bearer {{$credentials.trendingApi.key}}"
-                        }
-                    },
-                    "position": [200, 400]
-                },
-                {
-                    "id": "competitor_analysis",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Competitor Analysis",
-                    "description": "Analyzes competitor content and strategies",
-                    "parameters": {
-                        "jsCode": "// Analyze competitor performance\nconst competitors = ['competitor1', 'competitor2', 'competitor3'];\nconst analysis = [];\n\ncompetitors.forEach(comp => {\n  const data = {\n    name: comp,\n    avg_views: Math.floor(Math.random() * 100000) + 10000,\n    engagement_rate: (Math.random() * 0.1) + 0.02,\n    posting_frequency: Math.floor(Math.random() * 7) + 1,\n    top_content_types: ['tutorials', 'reviews', 'entertainment']\n  };\n  analysis.push(data);\n});\n\nreturn [{json: {competitor_analysis: analysis}}];"
-                    },
-                    "position": [400, 400]
-                },
-                {
-                    "id": "seo_optimizer",
-                    "type": "n8n-nodes-base.code",
-                    "name": "SEO Optimizer",
-                    "description": "Optimizes content for search and discovery",
-                    "parameters": {
-                        "jsCode": "// SEO optimization\nconst content = $json;\nconst keywords = content.trending_keywords || [];\nconst optimized = {\n  title: content.title,\n  description: content.description,\n  tags: [...content.tags, ...keywords.slice(0, 5)],\n  seo_score: 0\n};\n\n// Calculate SEO score\nif (optimized.title.length >= 60 && optimized.title.length <= 100) optimized.seo_score += 20;\nif (optimized.description.length >= 125) optimized.seo_score += 20;\nif (optimized.tags.length >= 10) optimized.seo_score += 20;\nif (keywords.some(k => optimized.title.toLowerCase().includes(k.toLowerCase()))) optimized.seo_score += 20;\nif (optimized.description.includes('subscribe')) optimized.seo_score += 20;\n\nreturn [{json: optimized}];"
-                    },
-                    "position": [600, 400]
-                },
-                {
-                    "id": "audience_targeting",
-                    "type": "n8n-nodes-base.googleAds",
-                    "name": "Audience Targeting",
-                    "description": "Creates targeted ad campaigns for content promotion",
-                    "parameters": {
-                        "operation": "createCampaign",
-                        "campaignType": "video",
-                        "targetAudience": "={{$json.demographics}}"
-                    },
-                    "position": [800, 400]
-                },
-                {
-                    "id": "email_notification",
-                    "type": "n8n-nodes-base.emailSend",
-                    "name": "Team Notification",
-                    "description": "Sends performance reports to team",
-                    "parameters": {
-                        "subject": "Daily Social Media Report - {{$now}}",
-                        "text": "Content Performance Summary:\n\nVideos Published: {{$json.videos_published}}\nTotal Views: {{$json.total_views}}\nEngagement Rate: {{$json.avg_engagement}}%\n\nTop Performing Content:\n{{$json.top_content}}\n\nRecommendations:\n{{$json.recommendations.join('\n')}}"
-                    },
-                    "position": [1400, 300]
-                },
-                {
-                    "id": "backup_storage",
-                    "type": "n8n-nodes-base.googleDrive",
-                    "name": "Content Backup",
-                    "description": "Backs up all content and metadata to cloud storage",
-                    "parameters": {
-                        "operation": "upload",
-                        "folderId": "backup_folder",
-                        "fileName": "content_{{$now}}.json"
-                    },
-                    "position": [1200, 400]
-                }
-            ],
-            "connections": [
-                {"from": "schedule_trigger", "to": "content_database", "output_index": 0, "input_index": 0},
-                {"from": "schedule_trigger", "to": "trend_analyzer", "output_index": 0, "input_index": 0},
-                {"from": "content_database", "to": "ai_content_generator", "output_index": 0, "input_index": 0},
-                {"from": "content_database", "to": "thumbnail_generator", "output_index": 0, "input_index": 0},
-                {"from": "ai_content_generator", "to": "video_processor", "output_index": 0, "input_index": 0},
-                {"from": "thumbnail_generator", "to": "video_processor", "output_index": 0, "input_index": 0},
-                {"from": "video_processor", "to": "youtube_upload", "output_index": 0, "input_index": 0},
-                {"from": "video_processor", "to": "tiktok_upload", "output_index": 0, "input_index": 0},
-                {"from": "video_processor", "to": "instagram_upload", "output_index": 0, "input_index": 0},
-                {"from": "video_processor", "to": "linkedin_post", "output_index": 0, "input_index": 0},
-                {"from": "youtube_upload", "to": "analytics_tracker", "output_index": 0, "input_index": 0},
-                {"from": "tiktok_upload", "to": "analytics_tracker", "output_index": 0, "input_index": 0},
-                {"from": "instagram_upload", "to": "analytics_tracker", "output_index": 0, "input_index": 0},
-                {"from": "linkedin_post", "to": "analytics_tracker", "output_index": 0, "input_index": 0},
-                {"from": "analytics_tracker", "to": "performance_analyzer", "output_index": 0, "input_index": 0},
-                {"from": "trend_analyzer", "to": "competitor_analysis", "output_index": 0, "input_index": 0},
-                {"from": "competitor_analysis", "to": "seo_optimizer", "output_index": 0, "input_index": 0},
-                {"from": "seo_optimizer", "to": "audience_targeting", "output_index": 0, "input_index": 0},
-                {"from": "performance_analyzer", "to": "email_notification", "output_index": 0, "input_index": 0},
-                {"from": "audience_targeting", "to": "backup_storage", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "enterprise",
-            "required_credentials": ["youTubeApi", "tiktokApi", "instagramApi", "linkedInApi", "googleSheetsApi", "openAiApi", "stabilityAi", "googleAnalytics", "googleAds", "smtpEmail", "googleDriveApi"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["social_media"].instantiate(user_input)
     
     def _create_api_integration_plan(self, user_input: str) -> Dict[str, Any]:
         """Create API integration hub plan"""
-        return {
-            "workflow_name": f"API Integration Hub: {user_input[:30]}...",
-            "description": f"API integration workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "webhook_trigger",
-                    "type": "n8n-nodes-base.webhook",
-                    "name": "API Trigger",
-                    "description": "Receives integration requests",
-                    "parameters": {
-                        "httpMethod": "POST",
-                        "path": "integration-hub"
-                    },
-                    "position": [250, 300]
-                },
-                {
-                    "id": "github_sync",
-                    "type": "n8n-nodes-base.github",
-                    "name": "GitHub Sync",
-                    "description": "Syncs with GitHub repositories",
-                    "parameters": {
-                        "operation": "getRepository"
-                    },
-                    "position": [450, 200]
-                },
-                {
-                    "id": "jira_update",
-                    "type": "n8n-nodes-base.jira",
-                    "name": "Update Jira",
-                    "description": "Updates Jira tickets",
-                    "parameters": {
-                        "operation": "update"
-                    },
-                    "position": [450, 300]
-                },
-                {
-                    "id": "slack_notify",
-                    "type": "n8n-nodes-base.slack",
-                    "name": "Slack Notification",
-                    "description": "Sends status updates to Slack",
-                    "parameters": {
-                        "operation": "postMessage",
-                        "channel": "#integrations"
-                    },
-                    "position": [450, 400]
-                },
-                {
-                    "id": "consolidate",
-                    "type": "n8n-nodes-base.merge",
-                    "name": "Consolidate Data",
-                    "description": "Merges data from all sources",
-                    "parameters": {},
-                    "position": [650, 300]
-                },
-                {
-                    "id": "error_handler",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Error Handler",
-                    "description": "Handles integration errors",
-                    "parameters": {
-                        "jsCode": "// Handle errors and retry logic\nif ($json.error) {\n  return [{json: {status: 'retry', message: $json.error}}];\n}\nreturn [{json: {status: 'success'}}];"
-                    },
-                    "position": [850, 300]
-                }
-            ],
-            "connections": [
-                {"from": "webhook_trigger", "to": "github_sync", "output_index": 0, "input_index": 0},
-                {"from": "webhook_trigger", "to": "jira_update", "output_index": 0, "input_index": 0},
-                {"from": "webhook_trigger", "to": "slack_notify", "output_index": 0, "input_index": 0},
-                {"from": "github_sync", "to": "consolidate", "output_index": 0, "input_index": 0},
-                {"from": "jira_update", "to": "consolidate", "output_index": 0, "input_index": 1},
-                {"from": "slack_notify", "to": "consolidate", "output_index": 0, "input_index": 2},
-                {"from": "consolidate", "to": "error_handler", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "high",
-            "required_credentials": ["githubApi", "jiraApi", "slackApi"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["api_integration"].instantiate(user_input)
     
     def _create_ecommerce_plan(self, user_input: str) -> Dict[str, Any]:
         """Create e-commerce automation plan"""
-        return {
-            "workflow_name": f"E-commerce Automation: {user_input[:30]}...",
-            "description": f"E-commerce workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "order_webhook",
-                    "type": "n8n-nodes-base.webhook",
-                    "name": "New Order Trigger",
-                    "description": "Triggered when new order is placed",
-                    "parameters": {
-                        "httpMethod": "POST",
-                        "path": "new-order"
-                    },
-                    "position": [250, 300]
-                },
-                {
-                    "id": "validate_inventory",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Validate Inventory",
-                    "description": "Checks product availability",
-                    "parameters": {
-                        "jsCode": "// Check inventory levels\nconst order = $json;\nconst available = order.quantity <= 100; // Mock check\nreturn [{json: {...order, available}}];"
-                    },
-                    "position": [450, 250]
-                },
-                {
-                    "id": "process_payment",
-                    "type": "n8n-nodes-base.stripe",
-                    "name": "Process Payment",
-                    "description": "Processes payment via Stripe",
-                    "parameters": {
-                        "operation": "createCharge"
-                    },
-                    "position": [450, 350]
-                },
-                {
-                    "id": "update_database",
-                    "type": "n8n-nodes-base.postgres",
-                    "name": "Update Database",
-                    "description": "Updates order in database",
-                    "parameters": {
-                        "operation": "insert"
-                    },
-                    "position": [650, 200]
-                },
-                {
-                    "id": "send_confirmation",
-                    "type": "n8n-nodes-base.emailSend",
-                    "name": "Order Confirmation",
-                    "description": "Sends confirmation email",
-                    "parameters": {
-                        "subject": "Order Confirmation #{{$json.orderId}}"
-                    },
-                    "position": [650, 300]
-                },
-                {
-                    "id": "fulfill_order",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "Trigger Fulfillment",
-                    "description": "Triggers warehouse fulfillment",
-                    "parameters": {
-                        "method": "POST",
-                        "url": "https://warehouse-api.example.com/fulfill"
-                    },
-                    "position": [650, 400]
-                },
-                {
-                    "id": "analytics_update",
-                    "type": "n8n-nodes-base.googleSheets",
-                    "name": "Update Analytics",
-                    "description": "Updates business analytics",
-                    "parameters": {
-                        "operation": "append"
-                    },
-                    "position": [850, 300]
-                }
-            ],
-            "connections": [
-                {"from": "order_webhook", "to": "validate_inventory", "output_index": 0, "input_index": 0},
-                {"from": "order_webhook", "to": "process_payment", "output_index": 0, "input_index": 0},
-                {"from": "validate_inventory", "to": "update_database", "output_index": 0, "input_index": 0},
-                {"from": "process_payment", "to": "send_confirmation", "output_index": 0, "input_index": 0},
-                {"from": "send_confirmation", "to": "fulfill_order", "output_index": 0, "input_index": 0},
-                {"from": "fulfill_order", "to": "analytics_update", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "high",
-            "required_credentials": ["stripeApi", "postgresDb", "smtpEmail", "googleSheetsApi"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["ecommerce"].instantiate(user_input)
     
     def _create_testing_plan(self, user_input: str) -> Dict[str, Any]:
         """Create testing automation plan"""
-        return {
-            "workflow_name": f"Testing Automation: {user_input[:30]}...",
-            "description": f"Testing automation workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "code_trigger",
-                    "type": "n8n-nodes-base.github",
-                    "name": "Code Change Trigger",
-                    "description": "Triggered by code commits",
-                    "parameters": {
-                        "event": "push"
-                    },
-                    "position": [250, 300]
-                },
-                {
-                    "id": "run_unit_tests",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "Run Unit Tests",
-                    "description": "Executes unit test suite",
-                    "parameters": {
-                        "method": "POST",
-                        "url": "https://ci-server.example.com/run-tests",
-                        "jsonParameters": true,
-                        "options": {
-                            "bodyParametersUi": {
-                                "parameter": [
-                                    {"name": "test_type", "value": "unit"},
-                                    {"name": "branch", "value": "={{$json.branch}}"}
-                                ]
-                            }
-                        }
-                    },
-                    "position": [450, 200]
-                },
-                {
-                    "id": "run_integration_tests",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "Run Integration Tests",
-                    "description": "Executes integration tests",
-                    "parameters": {
-                        "method": "POST",
-                        "url": "https://ci-server.example.com/run-tests",
-                        "jsonParameters": true,
-                        "options": {
-                            "bodyParametersUi": {
-                                "parameter": [
-                                    {"name": "test_type", "value": "integration"},
-                                    {"name": "branch", "value": "={{$json.branch}}"}
-                                ]
-                            }
-                        }
-                    },
-                    "position": [450, 300]
-                },
-                {
-                    "id": "quality_check",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Quality Analysis",
-                    "description": "Analyzes code quality metrics",
-                    "parameters": {
-                        "jsCode": "// Analyze test results\nconst unitResults = $input.first().json;\nconst integrationResults = $input.last().json;\nconst passed = unitResults.passed && integrationResults.passed;\nreturn [{json: {passed, coverage: unitResults.coverage, quality: passed ? 'high' : 'needs_work'}}];"
-                    },
-                    "position": [650, 250]
-                },
-                {
-                    "id": "notify_team",
-                    "type": "n8n-nodes-base.slack",
-                    "name": "Notify Team",
-                    "description": "Sends test results to team",
-                    "parameters": {
-                        "operation": "postMessage",
-                        "channel": "#dev-team",
-                        "text": "Test Results: {{$json.passed ? '✅ PASSED' : '❌ FAILED'}} - Coverage: {{$json.coverage}}%"
-                    },
-                    "position": [850, 200]
-                },
-                {
-                    "id": "create_report",
-                    "type": "n8n-nodes-base.googleSheets",
-                    "name": "Test Report",
-                    "description": "Creates detailed test report",
-                    "parameters": {
-                        "operation": "append"
-                    },
-                    "position": [850, 300]
-                }
-            ],
-            "connections": [
-                {"from": "code_trigger", "to": "run_unit_tests", "output_index": 0, "input_index": 0},
-                {"from": "code_trigger", "to": "run_integration_tests", "output_index": 0, "input_index": 0},
-                {"from": "run_unit_tests", "to": "quality_check", "output_index": 0, "input_index": 0},
-                {"from": "run_integration_tests", "to": "quality_check", "output_index": 0, "input_index": 0},
-                {"from": "quality_check", "to": "notify_team", "output_index": 0, "input_index": 0},
-                {"from": "quality_check", "to": "create_report", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "high",
-            "required_credentials": ["githubApi", "slackApi", "googleSheetsApi"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["testing"].instantiate(user_input)
     
     def _create_developer_plan(self, user_input: str) -> Dict[str, Any]:
         """Create developer automation plan"""
-        return {
-            "workflow_name": f"Developer Automation: {user_input[:30]}...",
-            "description": f"Developer workflow for: {user_input}",
-            "nodes": [
-                {
-                    "id": "pull_request_trigger",
-                    "type": "n8n-nodes-base.github",
-                    "name": "PR Trigger",
-                    "description": "Triggered by pull requests",
-                    "parameters": {
-                        "event": "pull_request"
-                    },
-                    "position": [250, 300]
-                },
-                {
-                    "id": "code_review",
-                    "type": "n8n-nodes-base.code",
-                    "name": "Automated Code Review",
-                    "description": "Performs automated code analysis",
-                    "parameters": {
-                        "jsCode": "// Simulate code review\nconst pr = $json;\nconst issues = [\n  {type: 'style', severity: 'minor', message: 'Consider using const instead of let'},\n  {type: 'security', severity: 'major', message: 'Potential SQL injection vulnerability'}\n];\nreturn [{json: {pr_id: pr.id, issues, approved: issues.filter(i => i.severity === 'major').length === 0}}];"
-                    },
-                    "position": [450, 250]
-                },
-                {
-                    "id": "run_build",
-                    "type": "n8n-nodes-base.httpRequest",
-                    "name": "Build & Deploy",
-                    "description": "Triggers CI/CD pipeline",
-                    "parameters": {
-                        "method": "POST",
-                        "url": "https://ci.example.com/build",
-                        "jsonParameters": true
-                    },
-                    "position": [450, 350]
-                },
-                {
-                    "id": "update_pr",
-                    "type": "n8n-nodes-base.github",
-                    "name": "Update PR Status",
-                    "description": "Updates PR with review results",
-                    "parameters": {
-                        "operation": "createReview"
-                    },
-                    "position": [650, 250]
-                },
-                {
-                    "id": "notify_developer",
-                    "type": "n8n-nodes-base.slack",
-                    "name": "Notify Developer",
-                    "description": "Notifies developer of results",
-                    "parameters": {
-                        "operation": "postMessage",
-                        "text": "PR Review Complete: {{$json.approved ? '✅ Approved' : '❌ Needs Changes'}}"
-                    },
-                    "position": [650, 350]
-                },
-                {
-                    "id": "auto_merge",
-                    "type": "n8n-nodes-base.github",
-                    "name": "Auto Merge",
-                    "description": "Automatically merges if approved",
-                    "parameters": {
-                        "operation": "merge"
-                    },
-                    "position": [850, 300]
-                }
-            ],
-            "connections": [
-                {"from": "pull_request_trigger", "to": "code_review", "output_index": 0, "input_index": 0},
-                {"from": "pull_request_trigger", "to": "run_build", "output_index": 0, "input_index": 0},
-                {"from": "code_review", "to": "update_pr", "output_index": 0, "input_index": 0},
-                {"from": "run_build", "to": "notify_developer", "output_index": 0, "input_index": 0},
-                {"from": "update_pr", "to": "auto_merge", "output_index": 0, "input_index": 0}
-            ],
-            "estimated_complexity": "high",
-            "required_credentials": ["githubApi", "slackApi"]
-        }
+        return FALLBACK_PLAN_TEMPLATES["developer"].instantiate(user_input)
     
     def _create_intelligent_generic_plan(self, user_input: str) -> Dict[str, Any]:
         """Create intelligent generic plan based on input analysis"""
-        # Analyze input for complexity and create appropriate workflow
-        word_count = len(user_input.split())
-        
-        if word_count > 20:  # Complex request
-            return {
-                "workflow_name": f"Complex Workflow: {user_input[:40]}...",
-                "description": f"Multi-stage workflow for: {user_input}",
-                "nodes": [
-                    {
-                        "id": "trigger",
-                        "type": "n8n-nodes-base.manualTrigger",
-                        "name": "Start Workflow",
-                        "description": "Initiates the workflow",
-                        "parameters": {},
-                        "position": [250, 300]
-                    },
-                    {
-                        "id": "data_input",
-                        "type": "n8n-nodes-base.code",
-                        "name": "Data Processing",
-                        "description": "Processes input data",
-                        "parameters": {
-                            "jsCode": f"// Processing for: {user_input[:100]}\nconst processedData = {{\n  input: '{user_input}',\n  timestamp: new Date().toISOString(),\n  status: 'processing'\n}};\nreturn [{{json: processedData}}];"
-                        },
-                        "position": [450, 250]
-                    },
-                    {
-                        "id": "validation",
-                        "type": "n8n-nodes-base.code",
-                        "name": "Data Validation",
-                        "description": "Validates processed data",
-                        "parameters": {
-                            "jsCode": "// Validate data quality\nconst data = $json;\nconst isValid = data.input && data.input.length > 10;\nreturn [{json: {...data, validated: isValid}}];"
-                        },
-                        "position": [650, 200]
-                    },
-                    {
-                        "id": "transformation",
-                        "type": "n8n-nodes-base.code",
-                        "name": "Data Transformation",
-                        "description": "Transforms data for output",
-                        "parameters": {
-                            "jsCode": "// Transform data\nconst data = $json;\nconst transformed = {\n  ...data,\n  processed: true,\n  output_format: 'json',\n  complexity: 'high'\n};\nreturn [{json: transformed}];"
-                        },
-                        "position": [450, 350]
-                    },
-                    {
-                        "id": "notification",
-                        "type": "n8n-nodes-base.emailSend",
-                        "name": "Send Notification",
-                        "description": "Sends completion notification",
-                        "parameters": {
-                            "subject": "Workflow Completed",
-                            "text": "Your complex workflow has been completed successfully."
-                        },
-                        "position": [850, 300]
-                    }
-                ],
-                "connections": [
-                    {"from": "trigger", "to": "data_input", "output_index": 0, "input_index": 0},
-                    {"from": "data_input", "to": "validation", "output_index": 0, "input_index": 0},
-                    {"from": "data_input", "to": "transformation", "output_index": 0, "input_index": 0},
-                    {"from": "validation", "to": "notification", "output_index": 0, "input_index": 0},
-                    {"from": "transformation", "to": "notification", "output_index": 0, "input_index": 0}
-                ],
-                "estimated_complexity": "high",
-                "required_credentials": ["smtpEmail"]
-            }
-        else:  # Simple request
-            return {
-                "workflow_name": f"Simple Workflow: {user_input[:40]}...",
-                "description": f"Basic workflow for: {user_input}",
-                "nodes": [
-                    {
-                        "id": "start",
-                        "type": "n8n-nodes-base.manualTrigger",
-                        "name": "Manual Trigger",
-                        "description": "Starts the workflow",
-                        "parameters": {},
-                        "position": [250, 300]
-                    },
-                    {
-                        "id": "process",
-                        "type": "n8n-nodes-base.code",
-                        "name": "Process Request",
-                        "description": "Processes the request",
-                        "parameters": {
-                            "jsCode": f"// Processing for: {user_input}\nconst result = {{\n  request: '{user_input}',\n  processed_at: new Date().toISOString(),\n  status: 'completed'\n}};\nreturn [{{json: result}}];"
-                        },
-                        "position": [450, 300]
-                    },
-                    {
-                        "id": "output",
-                        "type": "n8n-nodes-base.code",
-                        "name": "Format Output",
-                        "description": "Formats the final output",
-                        "parameters": {
-                            "jsCode": "// Format output\nconst data = $json;\nreturn [{json: {...data, formatted: true}}];"
-                        },
-                        "position": [650, 300]
-                    }
-                ],
-                "connections": [
-                    {"from": "start", "to": "process", "output_index": 0, "input_index": 0},
-                    {"from": "process", "to": "output", "output_index": 0, "input_index": 0}
-                ],
-                "estimated_complexity": "low",
-                "required_credentials": []
-            }
+        return self._generic_template(user_input).instantiate(user_input)
     
     def _get_timestamp(self) -> str:
         from datetime import datetime
@@ -1068,13 +496,24 @@ class PlannerAgent(LlmAgent):
     
     async def run(self, message: Message) -> Message:
         """Main run method for ADK compatibility"""
-        input_data = json.loads(message.content)
+        input_data = loads(message.content)
         user_input = input_data.get("cleaned_input", input_data.get("original_input", ""))
         
-        plan = await self.plan_workflow(user_input)
+        if not self.provider:
+            # Fallback mode: emit the pre-serialized template without building the plan dict
+            print("No LLM client available, using fallback plan")
+            content = self._fallback_template(user_input).serialize(user_input, {
+                "status": "success",
+                "timestamp": self._get_timestamp(),
+                "note": FALLBACK_MODE_NOTE,
+                "plan_source": "fallback"
+            })
+        else:
+            plan = await self.plan_workflow(user_input)
+            content = dumps(plan)
         
         return Message(
-            content=json.dumps(plan),
+            content=content,
             sender=self.name,
             metadata={"planned": True}
         )
\ No newline at end of file
@@ -0,0 +1,273 @@
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Iterator
+from collections import deque
+import asyncio
+import math
+import os
+import threading
+import time
+from .llm_providers import LLMProvider, create_provider
+from .llm_usage import LLMUsage
+from .hedging import HEDGE_PARTNERS, percentile
+from .rate_limiter import RateLimitedProvider
+
+class ProviderUnavailableError(Exception):
+    """Every configured provider has an open circuit"""
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after a cooldown
+
+    While half-open, up to max_probes requests are let through; a successful
+    probe closes the circuit and a failed one re-opens it for another cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0, max_probes: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_probes = max_probes
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.times_opened = 0
+
+    def allow(self, now: float) -> bool:
+        """Whether a request may be sent now; reserves a probe slot when half-open"""
+        if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.probes_in_flight = 0
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and self.probes_in_flight < self.max_probes:
+            self.probes_in_flight += 1
+            return True
+        return False
+
+    def release(self):
+        """Give back a probe slot whose request never completed"""
+        if self.state == self.HALF_OPEN and self.probes_in_flight:
+            self.probes_in_flight -= 1
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.probes_in_flight = 0
+
+    def record_failure(self, now: float):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = now
+            self.probes_in_flight = 0
+
+class ProviderHealth:
+    """Rolling success rate and latency window for one provider/model
+
+    Samples older than horizon seconds are ignored, so a provider demoted
+    after a bad spell is ranked on fresh data again once it ages out.
+    """
+
+    def __init__(self, window: int = 100, horizon: float = 60.0, breaker: Optional[CircuitBreaker] = None):
+        self.horizon = horizon
+        self.outcomes: deque = deque(maxlen=window)
+        self.latencies: deque = deque(maxlen=window)
+        self.breaker = breaker or CircuitBreaker()
+
+    def _recent(self, samples: deque, now: float) -> List[float]:
+        return [value for at, value in samples if now - at <= self.horizon]
+
+    def success_rate(self, now: float) -> float:
+        outcomes = self._recent(self.outcomes, now)
+        return sum(outcomes) / len(outcomes) if outcomes else 1.0
+
+    def latency(self, fraction: float, now: float) -> Optional[float]:
+        latencies = self._recent(self.latencies, now)
+        return percentile(latencies, fraction) if latencies else None
+
+class ProviderHealthRegistry:
+    """Process-wide health per (provider, model), shared by every router"""
+
+    def __init__(self, window: int = 100, horizon: float = 60.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.window = window
+        self.horizon = horizon
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._health: Dict[Tuple[str, str], ProviderHealth] = {}
+
+    def _get(self, provider: LLMProvider, tier: Optional[str] = None) -> ProviderHealth:
+        key = (provider.name, provider.model_for(tier))
+        health = self._health.get(key)
+        if health is None:
+            health = ProviderHealth(self.window, self.horizon, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+            self._health[key] = health
+        return health
+
+    def allow(self, provider: LLMProvider, tier: Optional[str] = None) -> bool:
+        with self._lock:
+            return self._get(provider, tier).breaker.allow(time.monotonic())
+
+    def release(self, provider: LLMProvider, tier: Optional[str] = None):
+        with self._lock:
+            self._get(provider, tier).breaker.release()
+
+    def record(self, provider: LLMProvider, ok: bool, elapsed: float, tier: Optional[str] = None):
+        with self._lock:
+            now = time.monotonic()
+            health = self._get(provider, tier)
+            health.outcomes.append((now, 1 if ok else 0))
+            if ok:
+                health.latencies.append((now, elapsed))
+                health.breaker.record_success()
+            else:
+                health.breaker.record_failure(now)
+
+    def rank(self, providers: List[LLMProvider], tier: Optional[str] = None) -> List[LLMProvider]:
+        """Closed circuits first, then by success rate and p95 latency; keeps configured order on ties
+
+        A provider without latency samples ranks after measured ones, so an
+        untried failover never overtakes a healthy primary on its first call.
+        """
+        now = time.monotonic()
+        with self._lock:
+            def score(item):
+                position, provider = item
+                health = self._get(provider, tier)
+                p95 = health.latency(0.95, now)
+                return (health.breaker.state != CircuitBreaker.CLOSED,
+                        -round(health.success_rate(now), 1),
+                        p95 if p95 is not None else math.inf,
+                        position)
+            return [provider for _, provider in sorted(enumerate(providers), key=score)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Success rate, latency percentiles and circuit state per provider/model"""
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for (name, model), health in self._health.items():
+                p50, p95 = health.latency(0.5, now), health.latency(0.95, now)
+                stats[f"{name}/{model}"] = {
+                    "state": health.breaker.state,
+                    "success_rate": round(health.success_rate(now), 4),
+                    "p50_latency": round(p50, 4) if p50 is not None else None,
+                    "p95_latency": round(p95, 4) if p95 is not None else None,
+                    "requests": len(health._recent(health.outcomes, now)),
+                    "times_opened": health.breaker.times_opened
+                }
+            return stats
+
+class ProviderRouter(LLMProvider):
+    """Routes each request to the healthiest provider whose circuit allows it
+
+    A failed call is retried on the next allowed provider. When every circuit
+    is open the router raises ProviderUnavailableError without touching the
+    network, so the planner drops straight to its fallback plan.
+    """
+
+    def __init__(self, providers: List[LLMProvider], health: Optional[ProviderHealthRegistry] = None):
+        super().__init__(name="+".join(p.name for p in providers), model=providers[0].model,
+                         models=providers[0].models)
+        self.providers = providers
+        self.health = health or get_default_provider_health()
+
+    @property
+    def client(self):
+        return self.providers[0].client
+
+    def _candidates(self, tier: Optional[str]) -> Iterator[LLMProvider]:
+        """Providers to try in order; the circuit is checked only right before each attempt"""
+        attempted = False
+        for provider in self.health.rank(self.providers, tier):
+            if self.health.allow(provider, tier):
+                attempted = True
+                yield provider
+        if not attempted:
+            raise ProviderUnavailableError("All LLM provider circuits are open")
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        last_error: Optional[Exception] = None
+        for provider in self._candidates(tier):
+            start = time.monotonic()
+            try:
+                text = await provider.complete(prompt, max_tokens=max_tokens, temperature=temperature,
+                                               system=system, usage=usage, tier=tier)
+            except asyncio.CancelledError:
+                self.health.release(provider, tier)
+                raise
+            except Exception as e:
+                self.health.record(provider, False, time.monotonic() - start, tier)
+                print(f"LLM provider {provider.name} failed: {e}")
+                last_error = e
+                continue
+            self.health.record(provider, True, time.monotonic() - start, tier)
+            return text
+        raise last_error
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        last_error: Optional[Exception] = None
+        for provider in self._candidates(tier):
+            start = time.monotonic()
+            started = False
+            try:
+                async for chunk in provider.stream(prompt, max_tokens=max_tokens, temperature=temperature,
+                                                   system=system, usage=usage, tier=tier):
+                    started = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                self.health.release(provider, tier)
+                raise
+            except Exception as e:
+                self.health.record(provider, False, time.monotonic() - start, tier)
+                if started:
+                    # Chunks already reached the caller; it has to handle the reset
+                    raise
+                print(f"LLM provider {provider.name} failed: {e}")
+                last_error = e
+                continue
+            self.health.record(provider, True, time.monotonic() - start, tier)
+            return
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Health of the providers this router can use"""
+        stats = self.health.get_stats()
+        names = {f"{p.name}/" for p in self.providers}
+        return {key: value for key, value in stats.items() if any(key.startswith(n) for n in names)}
+
+_default_provider_health: Optional[ProviderHealthRegistry] = None
+
+def get_default_provider_health() -> ProviderHealthRegistry:
+    """Process-wide provider health configured from the environment"""
+    global _default_provider_health
+    if _default_provider_health is None:
+        _default_provider_health = ProviderHealthRegistry(
+            failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURES", "3")),
+            reset_timeout=float(os.getenv("LLM_CIRCUIT_RESET", "30"))
+        )
+    return _default_provider_health
+
+def create_provider_router(llm_provider: str, base_urls: Optional[Dict[str, str]] = None) -> Optional[LLMProvider]:
+    """Router over the chosen provider and, if its key is set, the other one as failover
+
+    base_urls maps provider names to base URL overrides.
+    """
+    base_urls = base_urls or {}
+    providers = [create_provider(llm_provider, base_urls.get(llm_provider))]
+    partner = HEDGE_PARTNERS.get(llm_provider)
+    if partner and os.getenv(f"{partner.upper()}_API_KEY"):
+        providers.append(create_provider(partner, base_urls.get(partner)))
+    providers = [RateLimitedProvider(p) for p in providers if p is not None]
+    if not providers:
+        return None
+    return ProviderRouter(providers)
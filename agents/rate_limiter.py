@@ -0,0 +1,287 @@
+from typing import Dict, Any, Optional, List, AsyncIterator
+from collections import deque
+import asyncio
+import os
+import threading
+import time
+from .llm_providers import LLMProvider
+from .llm_usage import LLMUsage
+
+class RateLimitTimeout(Exception):
+    """A request could not get a rate limit slot before its deadline"""
+
+class _Waiter:
+    __slots__ = ("tokens", "deadline", "loop", "event")
+
+    def __init__(self, tokens: int, deadline: Optional[float]):
+        self.tokens = tokens
+        self.deadline = deadline
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self.event.set)
+
+class _ProviderLimits:
+    """Request and token buckets, Retry-After block and FIFO queue for one provider"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, burst_seconds: float, now: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        # Bursts may use up to burst_seconds worth of the per-minute budget
+        self.request_capacity = max(1.0, requests_per_minute * burst_seconds / 60.0)
+        self.token_capacity = max(1.0, tokens_per_minute * burst_seconds / 60.0)
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.updated = now
+        self.blocked_until = 0.0
+        self.queue: deque = deque()
+        self.waits: deque = deque(maxlen=500)
+        self.stats = {"acquired": 0, "waited": 0, "timeouts": 0, "throttled": 0, "max_queue_depth": 0}
+
+    def refill(self, now: float):
+        elapsed = now - self.updated
+        self.requests = min(self.request_capacity, self.requests + elapsed * self.requests_per_minute / 60.0)
+        self.tokens = min(self.token_capacity, self.tokens + elapsed * self.tokens_per_minute / 60.0)
+        self.updated = now
+
+    def delay(self, tokens: int, now: float) -> float:
+        """Seconds until one request of this many tokens fits both buckets"""
+        self.refill(now)
+        # A request larger than the bucket waits for a full bucket rather than forever
+        tokens = min(tokens, self.token_capacity)
+        wait_requests = max(0.0, 1.0 - self.requests) * 60.0 / self.requests_per_minute
+        wait_tokens = max(0.0, tokens - self.tokens) * 60.0 / self.tokens_per_minute
+        return max(wait_requests, wait_tokens, self.blocked_until - now)
+
+    def take(self, tokens: int):
+        self.requests -= 1.0
+        self.tokens -= min(tokens, self.token_capacity)
+
+class RateLimiter:
+    """Shared async limiter with request-per-minute and token-per-minute buckets per provider
+
+    Requests for a provider are served strictly first come, first served:
+    only the head of the queue may take capacity, so a large request is not
+    starved by a stream of small ones. A provider's Retry-After blocks its
+    whole queue. Waiters may carry a deadline and give up with
+    RateLimitTimeout as soon as the limiter can tell the slot will come too
+    late. Queues may be shared by callers on different event loops.
+    """
+
+    def __init__(self, requests_per_minute: float = 60.0, tokens_per_minute: float = 100000.0,
+                 limits: Optional[Dict[str, Dict[str, float]]] = None, burst_seconds: float = 6.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+        self.limits = limits or {}
+        self._lock = threading.Lock()
+        self._providers: Dict[str, _ProviderLimits] = {}
+
+    def _get(self, provider: str, now: float) -> _ProviderLimits:
+        limits = self._providers.get(provider)
+        if limits is None:
+            configured = self.limits.get(provider, {})
+            limits = self._providers[provider] = _ProviderLimits(
+                configured.get("requests_per_minute", self.requests_per_minute),
+                configured.get("tokens_per_minute", self.tokens_per_minute),
+                self.burst_seconds,
+                now
+            )
+        return limits
+
+    async def acquire(self, provider: str = "default", tokens: int = 0, timeout: Optional[float] = None):
+        """Wait in the provider's queue for one request of `tokens` estimated tokens"""
+        start = time.monotonic()
+        waiter = _Waiter(tokens, start + timeout if timeout is not None else None)
+        with self._lock:
+            limits = self._get(provider, start)
+            limits.queue.append(waiter)
+            limits.stats["max_queue_depth"] = max(limits.stats["max_queue_depth"], len(limits.queue))
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    head = limits.queue[0] is waiter
+                    delay = limits.delay(tokens, now) if head else None
+                    if delay is not None and delay <= 0.0:
+                        limits.take(tokens)
+                        limits.queue.popleft()
+                        limits.stats["acquired"] += 1
+                        waited = now - start
+                        limits.waits.append(waited)
+                        if waited > 0.001:
+                            limits.stats["waited"] += 1
+                        if limits.queue:
+                            limits.queue[0].wake()
+                        return
+                remaining = waiter.deadline - now if waiter.deadline is not None else None
+                if remaining is not None and (remaining <= 0 or (delay is not None and delay > remaining)):
+                    raise RateLimitTimeout(f"No {provider} rate limit slot within {timeout:.1f}s")
+                wait = delay if remaining is None else min(x for x in (delay, remaining) if x is not None)
+                waiter.event.clear()
+                try:
+                    # Woken early when this waiter reaches the head of the queue
+                    await asyncio.wait_for(waiter.event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException as e:
+            with self._lock:
+                was_head = bool(limits.queue) and limits.queue[0] is waiter
+                if waiter in limits.queue:
+                    limits.queue.remove(waiter)
+                if isinstance(e, RateLimitTimeout):
+                    limits.stats["timeouts"] += 1
+                if was_head and limits.queue:
+                    limits.queue[0].wake()
+            raise
+
+    def settle(self, provider: str, reserved: int, used: int):
+        """Return unused tokens once the actual usage of a request is known"""
+        with self._lock:
+            limits = self._get(provider, time.monotonic())
+            limits.tokens = min(limits.token_capacity, limits.tokens + max(0, reserved - used))
+
+    def block(self, provider: str, retry_after: float):
+        """Pause the provider's queue after a 429, honouring its Retry-After"""
+        with self._lock:
+            now = time.monotonic()
+            limits = self._get(provider, now)
+            limits.blocked_until = max(limits.blocked_until, now + retry_after)
+            limits.stats["throttled"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and counters per provider"""
+        with self._lock:
+            now = time.monotonic()
+            stats = {}
+            for provider, limits in self._providers.items():
+                limits.refill(now)
+                waits: List[float] = sorted(limits.waits)
+                stats[provider] = {
+                    **limits.stats,
+                    "queue_depth": len(limits.queue),
+                    "blocked_for": round(max(0.0, limits.blocked_until - now), 3),
+                    "mean_wait": round(sum(waits) / len(waits), 4) if waits else 0.0,
+                    "p95_wait": round(waits[int(len(waits) * 0.95)], 4) if waits else 0.0,
+                    "requests_available": round(limits.requests, 2),
+                    "tokens_available": round(limits.tokens),
+                    "requests_per_minute": limits.requests_per_minute,
+                    "tokens_per_minute": limits.tokens_per_minute
+                }
+            return stats
+
+_default_rate_limiter: Optional[RateLimiter] = None
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Process-wide LLM limiter configured from the environment
+
+    LLM_REQUESTS_PER_MINUTE and LLM_TOKENS_PER_MINUTE set the default budget;
+    e.g. OPENROUTER_REQUESTS_PER_MINUTE overrides it for one provider.
+    """
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        limits = {}
+        for provider in ("openrouter", "anthropic"):
+            configured = {}
+            for name in ("requests_per_minute", "tokens_per_minute"):
+                value = os.getenv(f"{provider.upper()}_{name.upper()}")
+                if value:
+                    configured[name] = float(value)
+            if configured:
+                limits[provider] = configured
+        _default_rate_limiter = RateLimiter(
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "100000")),
+            limits=limits
+        )
+    return _default_rate_limiter
+
+def retry_after_seconds(error: BaseException, default: float = 1.0) -> Optional[float]:
+    """Retry-After of a provider 429 error in seconds, or None if it is not a rate limit error"""
+    if getattr(error, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return default
+
+class RateLimitedProvider(LLMProvider):
+    """Queues each request behind the shared limiter and retries 429s after their Retry-After
+
+    Requests that cannot get a slot within queue_timeout fail with
+    RateLimitTimeout, which the planner turns into its fallback plan.
+    """
+
+    def __init__(self, provider: LLMProvider, limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 3, queue_timeout: Optional[float] = 30.0):
+        super().__init__(name=provider.name, model=provider.model, models=provider.models)
+        self.provider = provider
+        self.limiter = limiter or get_default_rate_limiter()
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+
+    @property
+    def client(self):
+        return self.provider.client
+
+    def _estimate_tokens(self, prompt: str, system: Optional[str], max_tokens: int) -> int:
+        return (len(prompt) + len(system or "")) // 4 + max_tokens
+
+    def _settle(self, reserved: int, usage: Optional[LLMUsage]):
+        if usage is not None and usage.input_tokens:
+            self.limiter.settle(self.name, reserved, usage.input_tokens + usage.output_tokens)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Retry-After to wait before the next attempt, or None to give up"""
+        retry_after = retry_after_seconds(error)
+        if retry_after is None or attempt >= self.max_retries:
+            return None
+        print(f"{self.name} rate limited, retrying after {retry_after:.1f}s")
+        self.limiter.block(self.name, retry_after)
+        return retry_after
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        reserved = self._estimate_tokens(prompt, system, max_tokens)
+        attempt = 0
+        while True:
+            await self.limiter.acquire(self.name, reserved, self.queue_timeout)
+            try:
+                text = await self.provider.complete(prompt, max_tokens=max_tokens, temperature=temperature,
+                                                    system=system, usage=usage, tier=tier)
+            except Exception as e:
+                if self._retry_delay(e, attempt) is None:
+                    raise
+                attempt += 1
+                continue
+            self._settle(reserved, usage)
+            return text
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        reserved = self._estimate_tokens(prompt, system, max_tokens)
+        attempt = 0
+        while True:
+            await self.limiter.acquire(self.name, reserved, self.queue_timeout)
+            started = False
+            try:
+                async for chunk in self.provider.stream(prompt, max_tokens=max_tokens, temperature=temperature,
+                                                        system=system, usage=usage, tier=tier):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # Once chunks have reached the caller the request cannot be replayed
+                if started or self._retry_delay(e, attempt) is None:
+                    raise
+                attempt += 1
+                continue
+            self._settle(reserved, usage)
+            return
@@ -0,0 +1,110 @@
+from typing import Dict, Any, Optional, Callable, Awaitable
+import asyncio
+import concurrent.futures
+import threading
+
+class _FlightCancelled(Exception):
+    """The shared call was cancelled while other callers still wanted its result"""
+
+class _Flight:
+    def __init__(self):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 1
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one in-flight execution
+
+    The shared result is a concurrent.futures.Future, so callers running on
+    different event loops (e.g. separate Streamlit script threads) can join
+    the same flight. The underlying call is cancelled only when every caller
+    waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0,
+            "cancelled_waiters": 0,
+            "cancelled_flights": 0
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or wait for the identical call already in flight"""
+        with self._lock:
+            self.stats["calls"] += 1
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    self.stats["executions"] += 1
+                else:
+                    flight.waiters += 1
+                    self.stats["coalesced"] += 1
+
+            if leader:
+                flight.task = asyncio.ensure_future(fn())
+                flight.task.add_done_callback(lambda task, k=key, f=flight: self._finish(k, f, task))
+
+            try:
+                return await asyncio.shield(asyncio.wrap_future(flight.future))
+            except _FlightCancelled:
+                # The leader's call was torn down under us; start a new flight
+                continue
+            except asyncio.CancelledError:
+                self._leave(flight)
+                raise
+
+    def _leave(self, flight: _Flight):
+        """Drop a cancelled waiter and cancel the call if nobody is left"""
+        with self._lock:
+            flight.waiters -= 1
+            self.stats["cancelled_waiters"] += 1
+            abandoned = flight.waiters == 0
+        task = flight.task
+        if abandoned and task is not None and not task.done():
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def _finish(self, key: str, flight: _Flight, task: asyncio.Task):
+        """Publish the call outcome to every waiter"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if task.cancelled():
+                self.stats["cancelled_flights"] += 1
+            orphaned = flight.waiters == 0
+
+        if task.cancelled():
+            if not orphaned:
+                flight.future.set_exception(_FlightCancelled())
+            else:
+                flight.future.cancel()
+        elif task.exception() is not None:
+            flight.future.set_exception(task.exception())
+        else:
+            flight.future.set_result(task.result())
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently executing"""
+        with self._lock:
+            return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._flights)}
+
+_default_single_flight: Optional[SingleFlight] = None
+
+def get_default_single_flight() -> SingleFlight:
+    """Process-wide single-flight group shared by all planners"""
+    global _default_single_flight
+    if _default_single_flight is None:
+        _default_single_flight = SingleFlight()
+    return _default_single_flight
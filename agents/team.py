@@ -1,11 +1,10 @@
-from typing import Dict, Any, List, Callable
-import json
+from typing import Dict, Any, List, Callable, Set, Tuple
 import asyncio
+import time
 # Mock ADK Classes
 from typing import Dict, Any, List, Optional, Callable
 from abc import ABC, abstractmethod
 from datetime import datetime
-import json
 
 class Message:
     def __init__(self, content: str, sender: str, metadata: Optional[Dict[str, Any]] = None):
@@ -35,18 +34,22 @@ class AgentTeam:
     def add_agent(self, agent: LlmAgent):
         self.agents.append(agent)
 from .input_agent import InputAgent
+from .json_codec import loads
 from .planner_agent import PlannerAgent
+from .llm_providers import LLMProvider
 from tools.workflow_generator import WorkflowGenerator
+from tools.workflow_model import Plan, Workflow
 from tools.deploy_tool import DeployTool
 from memory.short_term import ShortTermMemory
 
 class DAForgeTeam(AgentTeam):
-    def __init__(self, llm_provider: str = "openrouter"):
+    def __init__(self, llm_provider: str = "openrouter", provider: Optional[LLMProvider] = None,
+                 base_urls: Optional[Dict[str, str]] = None):
         super().__init__(name="da_forge_team")
         
         # Initialize agents
         self.input_agent = InputAgent()
-        self.planner_agent = PlannerAgent(llm_provider=llm_provider)
+        self.planner_agent = PlannerAgent(llm_provider=llm_provider, provider=provider, base_urls=base_urls)
         
         # Initialize tools
         self.workflow_generator = WorkflowGenerator()
@@ -60,6 +63,8 @@ class DAForgeTeam(AgentTeam):
         self.add_agent(self.planner_agent)
         
         self.progress_callback = None
+        # LLM plans still running after their deadline; kept alive to upgrade the plan cache
+        self._background_tasks: Set[asyncio.Task] = set()
     
     def set_progress_callback(self, callback: Callable[[str, str], None]):
         """Set callback function for progress updates"""
@@ -70,8 +75,156 @@ class DAForgeTeam(AgentTeam):
         if self.progress_callback:
             self.progress_callback(stage, message)
     
-    async def execute_workflow_generation(self, user_input: str) -> Dict[str, Any]:
-        """Main execution pipeline for workflow generation"""
+    async def _tracked_plan_events(self, user_input: str, captured: Dict[str, Any],
+                                   report: Optional[Callable[[str, str], None]] = None):
+        """Relay the planner's event stream, reporting progress per node and capturing the final plan"""
+        report = report or self._update_progress
+        node_count = 0
+        async for event in self.planner_agent.plan_workflow_stream(user_input):
+            if event["type"] == "node":
+                node_count += 1
+                node_name = event["node"].get("name", event["node"].get("id", "node"))
+                report("planning", f"Planned node {node_count}: {node_name}")
+            elif event["type"] == "reset":
+                node_count = 0
+                report("planning", "Discarding partial plan, using fallback plan...")
+            elif event["type"] == "plan":
+                captured["plan"] = event["plan"]
+            yield event
+    
+    async def _plan_streaming(self, user_input: str) -> Dict[str, Any]:
+        """Consume the planner's event stream, reporting progress per node"""
+        captured: Dict[str, Any] = {}
+        async for _ in self._tracked_plan_events(user_input, captured):
+            pass
+        return captured.get("plan", {})
+    
+    async def _plan_and_generate_pipelined(self, user_input: str):
+        """Build workflow nodes while the plan is still streaming in"""
+        captured: Dict[str, Any] = {}
+        workflow_json = await self.workflow_generator.generate_workflow_stream(
+            self._tracked_plan_events(user_input, captured)
+        )
+        return captured.get("plan", {}), workflow_json
+    
+    def _previous_session(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Requirement and plan of the last run, if that plan can be edited incrementally"""
+        previous_input = self.memory.retrieve("user_input")
+        previous_plan = self.memory.retrieve("workflow_plan")
+        if not previous_input or not previous_plan or previous_plan.get("status") != "success":
+            return None
+        if not previous_plan.nodes or not previous_input.get("cleaned_input"):
+            return None
+        return previous_input["cleaned_input"], previous_plan.to_dict()
+    
+    async def _replan_and_generate(self, user_input: str, base: Tuple[str, Dict[str, Any]]
+                                   ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Re-plan as a patch of base (previous requirement and plan), then generate the workflow unless planning failed"""
+        plan_data = await self.planner_agent.replan_workflow(user_input, *base)
+        if plan_data.get("status") == "error":
+            return plan_data, None
+        return plan_data, await self.workflow_generator.generate_workflow(plan_data)
+    
+    async def _plan_llm(self, user_input: str, stream_planning: bool,
+                        base: Optional[Tuple[str, Dict[str, Any]]], report: Callable[[str, str], None],
+                        events: Optional[asyncio.Queue] = None) -> Dict[str, Any]:
+        """LLM plan only; with an events queue every plan event is also forwarded to it, then None"""
+        if base is not None:
+            return await self.planner_agent.replan_workflow(user_input, *base)
+        if events is None and not stream_planning:
+            return await self.planner_agent.plan_workflow(user_input)
+        captured: Dict[str, Any] = {}
+        try:
+            async for event in self._tracked_plan_events(user_input, captured, report):
+                if events is not None:
+                    events.put_nowait(event)
+        finally:
+            if events is not None:
+                events.put_nowait(None)
+        return captured.get("plan", {})
+    
+    async def _queued_events(self, events: asyncio.Queue):
+        event = await events.get()
+        while event is not None:
+            yield event
+            event = await events.get()
+    
+    async def _generate_planned(self, plan_task: asyncio.Task, events: Optional[asyncio.Queue]
+                                ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Workflow for the plan of plan_task; cancelling this leaves plan_task running"""
+        if events is not None:
+            workflow_json = await self.workflow_generator.generate_workflow_stream(self._queued_events(events))
+            return await asyncio.shield(plan_task), workflow_json
+        plan_data = await asyncio.shield(plan_task)
+        if plan_data.get("status") == "error":
+            return plan_data, None
+        return plan_data, await self.workflow_generator.generate_workflow(plan_data)
+    
+    async def _speculative_plan_and_generate(self, user_input: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        plan_data = self.planner_agent.speculative_plan(user_input)
+        return plan_data, await self.workflow_generator.generate_workflow(plan_data)
+    
+    async def _plan_with_deadline(self, user_input: str, remaining: float, stream_planning: bool,
+                                  pipelined: bool, upgrade_cache: bool,
+                                  base: Optional[Tuple[str, Dict[str, Any]]] = None
+                                  ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Race the LLM plan against the speculative fallback plan and workflow
+        
+        Returns (plan, workflow_json). The LLM result wins if it
+        is a valid plan with a generated workflow by the deadline; otherwise
+        the fallback is returned at the deadline and, with upgrade_cache, only
+        the LLM planning call keeps running so its plan is cached for the next
+        request. Workflow generation for it is cancelled, and its progress no
+        longer reaches the progress callback.
+        """
+        attached = True
+        
+        def report(stage: str, message: str):
+            if attached:
+                self._update_progress(stage, message)
+        
+        # Pipelined generation reads the plan events from a queue, so it can be
+        # cancelled without cancelling the planning stream that feeds it
+        events = asyncio.Queue() if pipelined and base is None else None
+        plan_task = asyncio.create_task(self._plan_llm(user_input, stream_planning, base, report, events))
+        llm_task = asyncio.create_task(self._generate_planned(plan_task, events))
+        speculative_task = asyncio.create_task(self._speculative_plan_and_generate(user_input))
+        
+        done, _ = await asyncio.wait({llm_task}, timeout=max(0.0, remaining))
+        if llm_task in done and not llm_task.cancelled() and llm_task.exception() is None:
+            plan_data, workflow_json = llm_task.result()
+            if workflow_json is not None and workflow_json.get("success", False):
+                speculative_task.cancel()
+                return plan_data, workflow_json
+        
+        if llm_task not in done:
+            llm_task.cancel()
+            if upgrade_cache and not plan_task.done():
+                attached = False
+                self._background_tasks.add(plan_task)
+                plan_task.add_done_callback(self._background_tasks.discard)
+            else:
+                plan_task.cancel()
+            self._update_progress("planning", "LLM plan missed the deadline, using fallback plan...")
+        print("DEBUG: Using speculative fallback plan")
+        return await speculative_task
+    
+    async def execute_workflow_generation(self, user_input: str, stream_planning: bool = False,
+                                          pipelined: bool = False, deadline: Optional[float] = None,
+                                          upgrade_cache: bool = True, incremental: bool = False) -> Dict[str, Any]:
+        """Main execution pipeline for workflow generation
+        
+        stream_planning reports progress per node while the plan streams in;
+        pipelined additionally generates the n8n workflow from the same stream.
+        deadline is a budget in seconds, counted from this call, for having a
+        plan and workflow ready: the keyword fallback plan and its workflow
+        are built alongside the LLM call and returned if the LLM has no valid
+        plan by then. With upgrade_cache the late LLM plan still lands in the
+        plan cache, as long as the event loop keeps running. incremental
+        re-plans an edited requirement as a patch of the previous run's plan
+        in memory instead of planning from scratch.
+        """
+        started = time.perf_counter()
         try:
             self._update_progress("input", "Processing user input...")
             print(f"DEBUG: Starting workflow generation for: {user_input}")
@@ -79,9 +232,11 @@ class DAForgeTeam(AgentTeam):
             # Step 1: Process input
             input_message = Message(content=user_input, sender="user")
             processed_input = await self.input_agent.run(input_message)
-            input_data = json.loads(processed_input.content)
+            input_data = loads(processed_input.content)
             print(f"DEBUG: Input processed: {input_data}")
             
+            base = self._previous_session() if incremental else None
+            
             # Store in memory
             self.memory.store("user_input", input_data)
             
@@ -98,13 +253,34 @@ class DAForgeTeam(AgentTeam):
             print("DEBUG: Starting planning phase...")
             
             # Step 2: Plan workflow
-            plan_message = Message(content=processed_input.content, sender="input_agent")
-            plan_result = await self.planner_agent.run(plan_message)
-            plan_data = json.loads(plan_result.content)
+            workflow_json = None
+            if deadline is not None:
+                plan_data, workflow_json = await self._plan_with_deadline(
+                    input_data.get("cleaned_input", user_input),
+                    deadline - (time.perf_counter() - started),
+                    stream_planning,
+                    pipelined,
+                    upgrade_cache,
+                    base
+                )
+            elif base is not None:
+                plan_data, workflow_json = await self._replan_and_generate(
+                    input_data.get("cleaned_input", user_input), base
+                )
+            elif pipelined:
+                plan_data, workflow_json = await self._plan_and_generate_pipelined(
+                    input_data.get("cleaned_input", user_input)
+                )
+            elif stream_planning:
+                plan_data = await self._plan_streaming(input_data.get("cleaned_input", user_input))
+            else:
+                plan_message = Message(content=processed_input.content, sender="input_agent")
+                plan_result = await self.planner_agent.run(plan_message)
+                plan_data = loads(plan_result.content)
             print(f"DEBUG: Plan result: {plan_data}")
             
-            # Store in memory
-            self.memory.store("workflow_plan", plan_data)
+            # Store in memory, compactly; dicts are rebuilt on the way out
+            self.memory.store("workflow_plan", Plan.from_dict(plan_data))
             
             if plan_data.get("status") == "error":
                 error_msg = f"Planning failed: {plan_data.get('error')}"
@@ -116,15 +292,15 @@ class DAForgeTeam(AgentTeam):
                     "fallback_available": "fallback_plan" in plan_data
                 }
             
-            self._update_progress("generation", "Generating n8n workflow JSON...")
-            print("DEBUG: Starting workflow generation...")
-            
-            # Step 3: Generate workflow JSON
-            workflow_json = await self.workflow_generator.generate_workflow(plan_data)
+            # Step 3: Generate workflow JSON (already done when pipelined)
+            if workflow_json is None:
+                self._update_progress("generation", "Generating n8n workflow JSON...")
+                print("DEBUG: Starting workflow generation...")
+                workflow_json = await self.workflow_generator.generate_workflow(plan_data)
             print(f"DEBUG: Workflow generation result: {workflow_json}")
             
             # Store in memory
-            self.memory.store("workflow_json", workflow_json)
+            self.memory.store("workflow_json", self._compact_workflow_result(workflow_json))
             
             if not workflow_json.get("success", False):
                 error_msg = f"Workflow generation failed: {workflow_json.get('error')}"
@@ -173,7 +349,9 @@ class DAForgeTeam(AgentTeam):
                     "workflow_generated": True,
                     "deployment_successful": True,
                     "total_nodes": len(plan_data.get("nodes", [])),
-                    "complexity": plan_data.get("estimated_complexity", "unknown")
+                    "complexity": plan_data.get("estimated_complexity", "unknown"),
+                    # Set by the planner: llm, cache, similar, fallback or speculative
+                    "plan_source": plan_data.get("plan_source")
                 }
             }
             
@@ -189,12 +367,22 @@ class DAForgeTeam(AgentTeam):
                 "stage": "execution"
             }
     
+    def _compact_workflow_result(self, workflow_json: Dict[str, Any]) -> Dict[str, Any]:
+        """Generation result with the workflow held as a slots model instead of n8n JSON"""
+        if not isinstance(workflow_json.get("workflow_data"), dict):
+            return workflow_json
+        return {**workflow_json, "workflow_data": Workflow.from_n8n(workflow_json["workflow_data"])}
+    
     async def get_memory_summary(self) -> Dict[str, Any]:
         """Get summary of stored memory"""
+        workflow_plan = self.memory.retrieve("workflow_plan")
+        workflow_json = self.memory.retrieve("workflow_json")
+        if workflow_json and isinstance(workflow_json.get("workflow_data"), Workflow):
+            workflow_json = {**workflow_json, "workflow_data": workflow_json["workflow_data"].to_n8n()}
         return {
             "user_input": self.memory.retrieve("user_input"),
-            "workflow_plan": self.memory.retrieve("workflow_plan"),
-            "workflow_json": self.memory.retrieve("workflow_json"),
+            "workflow_plan": workflow_plan.to_dict() if workflow_plan is not None else None,
+            "workflow_json": workflow_json,
             "deployment_result": self.memory.retrieve("deployment_result")
         }
     
@@ -0,0 +1,975 @@
+#!/usr/bin/env python3
+"""
+DA-Forge Benchmarks
+Local, offline performance checks for the planning pipeline
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.planner_agent import PlannerAgent
+from agents.llm_providers import FakeProvider
+from agents.single_flight import SingleFlight
+from agents.hedging import HedgedProvider
+from agents.provider_router import ProviderRouter, ProviderHealthRegistry
+from agents.intent_classifier import IntentClassifier, DEFAULT_INTENT_KEYWORDS
+from agents.plan_templates import FALLBACK_PLAN_TEMPLATES
+from tools.workflow_generator import WorkflowGenerator
+from memory.plan_index import PlanIndex
+from memory.plan_cache import PlanCache
+
+async def bench_async_planning(latency: float = 0.2, total_requests: int = 32):
+    """Measure planner throughput against a fake provider as concurrency grows"""
+    print(f"\n⏱️  Async planning: {total_requests} requests, provider latency {latency:.2f}s")
+    print(f"{'concurrency':>12} {'elapsed (s)':>12} {'req/s':>10}")
+
+    for concurrency in [1, 2, 4, 8, 16, 32]:
+        planner = PlannerAgent(provider=FakeProvider(latency=latency), use_cache=False, use_similarity=False)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def plan_one(i: int):
+            async with semaphore:
+                return await planner.plan_workflow(f"Benchmark request {i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(plan_one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - start
+        print(f"{concurrency:>12} {elapsed:>12.2f} {total_requests / elapsed:>10.1f}")
+
+async def bench_burst_coalescing(latency: float = 0.2, burst: int = 50):
+    """Fire a burst of identical requests and count provider calls"""
+    provider = FakeProvider(latency=latency)
+    single_flight = SingleFlight()
+    planners = [
+        PlannerAgent(provider=provider, use_cache=False, use_similarity=False, single_flight=single_flight)
+        for _ in range(burst)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(p.plan_workflow("Create a webhook that sends Slack alerts") for p in planners))
+    elapsed = time.perf_counter() - start
+
+    stats = single_flight.get_stats()
+    print(f"\n🧲 Burst of {burst} identical requests in {elapsed:.2f}s")
+    print(f"   provider calls: {provider.call_count}, coalesced: {stats['coalesced']}")
+
+async def bench_streaming(latency: float = 2.0):
+    """Compare time-to-first-node for streamed and blocking planning"""
+    plan = PlannerAgent(provider=FakeProvider(), use_cache=False, use_similarity=False)._create_social_media_plan("benchmark")
+    provider = FakeProvider(latency=latency, response=plan)
+    planner = PlannerAgent(provider=provider, use_cache=False, use_similarity=False, coalesce=False)
+
+    start = time.perf_counter()
+    await planner.plan_workflow("Blocking plan")
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_node = None
+    async for event in planner.plan_workflow_stream("Streamed plan"):
+        if first_node is None and event["type"] == "node":
+            first_node = time.perf_counter() - start
+    streamed = time.perf_counter() - start
+
+    print(f"\n🌊 Streaming: {len(plan['nodes'])} node plan, provider latency {latency:.1f}s")
+    print(f"   blocking first node:  {blocking:.2f}s")
+    print(f"   streamed first node:  {first_node:.2f}s (stream finished at {streamed:.2f}s)")
+
+def synthetic_plan(node_count: int) -> dict:
+    """A linear plan with node_count code nodes behind a manual trigger"""
+    nodes = [{"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "name": "Trigger", "parameters": {}}]
+    nodes += [
+        {"id": f"step_{i}", "type": "n8n-nodes-base.code", "name": f"Step {i}",
+         "parameters": {"jsCode": "return items;"}}
+        for i in range(1, node_count)
+    ]
+    connections = [
+        {"from": nodes[i]["id"], "to": nodes[i + 1]["id"], "output_index": 0, "input_index": 0}
+        for i in range(node_count - 1)
+    ]
+    return {"workflow_name": f"Synthetic {node_count} node workflow", "nodes": nodes, "connections": connections}
+
+async def bench_pipeline(latency: float = 1.0, node_count: int = 2000):
+    """Compare sequential plan-then-generate with the pipelined event stream"""
+    plan = synthetic_plan(node_count)
+    generator = WorkflowGenerator()
+
+    def planner() -> PlannerAgent:
+        provider = FakeProvider(latency=latency, response=plan, chunk_size=256)
+        return PlannerAgent(provider=provider, use_cache=False, use_similarity=False, coalesce=False)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        plan_data = await planner().plan_workflow("Sequential")
+        planned = time.perf_counter() - start
+        await generator.generate_workflow(plan_data)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await generator.generate_workflow_stream(planner().plan_workflow_stream("Pipelined"))
+        pipelined = time.perf_counter() - start
+
+    print(f"\n🚰 Pipeline: {node_count} node plan, provider latency {latency:.1f}s")
+    print(f"   sequential: {sequential:.2f}s (planning alone {planned:.2f}s)")
+    print(f"   pipelined:  {pipelined:.2f}s")
+
+async def bench_hedging(requests: int = 200, concurrency: int = 20):
+    """Compare tail latency with and without hedging against a slow-tailed primary"""
+    import random
+    rng = random.Random(11)
+
+    def tailed(median: float, tail: float, tail_rate: float):
+        # Lognormal body with an occasional stall, like a congested provider
+        return lambda: rng.lognormvariate(0, 0.3) * median + (tail if rng.random() < tail_rate else 0.0)
+
+    def providers():
+        return (FakeProvider(name="openrouter", latency_sampler=tailed(0.05, 1.0, 0.08)),
+                FakeProvider(name="anthropic", latency_sampler=tailed(0.07, 1.0, 0.08)))
+
+    async def measure(provider) -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+        timings = []
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                await provider.complete("plan")
+                timings.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return sorted(timings)
+
+    print(f"\n🪁 Hedged requests: {requests} calls, 8% of calls stall for 1s")
+    print(f"{'mode':>12} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'calls':>7}")
+    primary, secondary = providers()
+    hedged = HedgedProvider(primary, secondary, hedge_percentile=0.9, initial_delay=0.1)
+    await measure(hedged)  # warm up the latency history
+    primary.call_count = secondary.call_count = 0
+    modes = {"primary only": (providers()[0], None), "hedged": (hedged, (primary, secondary))}
+    for label, (provider, pair) in modes.items():
+        timings = await measure(provider)
+        calls = sum(p.call_count for p in pair) if pair else provider.call_count
+        p50, p95, p99 = (timings[int(len(timings) * q)] * 1000 for q in (0.5, 0.95, 0.99))
+        print(f"{label:>12} {p50:>10.1f} {p95:>10.1f} {p99:>10.1f} {calls:>7}")
+    print(f"   hedge delay {hedged.hedge_delay() * 1000:.0f}ms, stats {hedged.get_stats()}")
+
+async def bench_circuit_breaker(requests: int = 20, timeout: float = 0.5):
+    """Show planning latency while the primary provider is down, with and without the router"""
+    from agents.llm_providers import LLMProvider
+
+    class DownProvider(LLMProvider):
+        """Provider that hangs until the request times out"""
+        def __init__(self):
+            super().__init__(name="openrouter", model="down")
+            self.call_count = 0
+
+        async def complete(self, prompt: str, **options) -> str:
+            self.call_count += 1
+            await asyncio.sleep(timeout)
+            raise TimeoutError("request timed out")
+
+    async def run(provider) -> tuple:
+        planner = PlannerAgent(provider=provider, use_cache=False, use_similarity=False, coalesce=False)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(requests):
+                await planner.plan_workflow(f"Send a Slack message for order {i}")
+        return time.perf_counter() - start
+
+    print(f"\n🔌 Primary provider down ({timeout:.1f}s timeout), {requests} sequential requests")
+    print(f"{'setup':>22} {'elapsed (s)':>12} {'primary calls':>14}")
+    setups = {
+        "direct": lambda down: down,
+        "router, no failover": lambda down: ProviderRouter([down], ProviderHealthRegistry()),
+        "router + failover": lambda down: ProviderRouter(
+            [down, FakeProvider(name="anthropic", latency=0.05)], ProviderHealthRegistry()
+        ),
+    }
+    for label, build in setups.items():
+        down = DownProvider()
+        elapsed = await run(build(down))
+        print(f"{label:>22} {elapsed:>12.2f} {down.call_count:>14}")
+
+async def bench_client_pool(requests: int = 30, handshake: float = 0.03):
+    """Per-request latency with a fresh SDK client per request versus the shared keep-alive pool"""
+    import json
+    import openai
+    from agents.client_pool import LLMClientPool
+    from agents.llm_providers import OpenRouterProvider
+
+    body = json.dumps({
+        "id": "bench", "object": "chat.completion", "created": 0, "model": "bench-model",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "{}"}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    }).encode()
+    connections = 0
+
+    async def handle(reader, writer):
+        # Keep-alive HTTP/1.1 endpoint; new connections pay a simulated TCP+TLS setup
+        nonlocal connections
+        connections += 1
+        await asyncio.sleep(handshake)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                await reader.readexactly(length)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+    pool = LLMClientPool()
+
+    async def cold_request():
+        # Previous behaviour: every team built its own client and connection pool
+        client = openai.AsyncOpenAI(api_key="bench", base_url=base_url, max_retries=0)
+        try:
+            await client.chat.completions.create(model="bench-model", messages=[{"role": "user", "content": "hi"}])
+        finally:
+            await client.close()
+
+    async def pooled_request():
+        provider = OpenRouterProvider(api_key="bench", model="bench-model", base_url=base_url, client_pool=pool)
+        await provider.complete("hi")
+
+    print(f"\n🔗 LLM client pool: {requests} sequential requests, {handshake * 1000:.0f}ms connection setup")
+    print(f"{'clients':>16} {'p50 (ms)':>10} {'mean (ms)':>10} {'connections':>12}")
+    for label, request in [("new per request", cold_request), ("shared pool", pooled_request)]:
+        connections = 0
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            await request()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{label:>16} {timings[len(timings) // 2] * 1000:>10.1f} "
+              f"{sum(timings) / len(timings) * 1000:>10.1f} {connections:>12}")
+    await pool.aclose()
+    server.close()
+    await server.wait_closed()
+
+async def bench_prompt_cache(requests: int = 20, prefill_latency: float = 0.002):
+    """Input tokens and time to first token with the static prefix cached versus resent"""
+    from agents.llm_usage import LLMUsage, UsageStats
+    from agents.planner_agent import PLANNING_SYSTEM_PROMPT
+    prompts = [f"User Requirement: Send a Slack message when order {i} ships" for i in range(requests)]
+
+    print(f"\n🧠 Prompt prefix caching: {requests} requests, {prefill_latency * 1000:.1f}ms prefill per uncached token")
+    print(f"{'prompt':>16} {'input tok':>10} {'uncached tok':>13} {'p50 TTFT (ms)':>14}")
+    for label, cached in [("single message", False), ("system prefix", True)]:
+        provider = FakeProvider(latency=0.0, prefill_latency=prefill_latency)
+        stats = UsageStats()
+        for prompt in prompts:
+            usage = LLMUsage()
+            if cached:
+                chunks = provider.stream(prompt, system=PLANNING_SYSTEM_PROMPT, usage=usage)
+            else:
+                chunks = provider.stream(f"{PLANNING_SYSTEM_PROMPT}\n\n{prompt}", usage=usage)
+            async for _ in chunks:
+                pass
+            stats.record(usage)
+        summary = stats.get_stats()
+        uncached = summary["input_tokens"] - summary["cached_input_tokens"]
+        print(f"{label:>16} {summary['input_tokens'] // requests:>10} {uncached // requests:>13} "
+              f"{summary['p50_time_to_first_token'] * 1000:>14.1f}")
+
+def bench_model_routing(rounds: int = 2000):
+    """Show routing decisions for typical requests and the per-request routing cost"""
+    from agents.model_routing import ModelRoutingPolicy
+    prompts = [
+        "Send me an email every morning",
+        "Create a webhook that receives JSON data and sends a Slack notification",
+        "Monitor an RSS feed and save new items to a Google Sheet",
+        "Build an order processing system that monitors new orders, validates inventory, "
+        "processes payments, updates multiple databases and sends order confirmations",
+        "Create a workflow that integrates with multiple APIs (GitHub, Jira, Slack) and logs all activities, "
+        "then posts a weekly summary to Notion and emails the team",
+    ]
+    policy = ModelRoutingPolicy()
+    print(f"\n🧭 Model routing ({len(prompts)} sample requests)")
+    print(f"{'tier':>9} {'max_tokens':>11} {'score':>6}  request")
+    for prompt in prompts:
+        decision = policy.route(prompt)
+        print(f"{decision['tier']:>9} {decision['max_tokens']:>11} {decision['score']:>6.1f}  {prompt[:60]}")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in prompts:
+            policy.route(prompt)
+    per_call = (time.perf_counter() - start) / (rounds * len(prompts)) * 1e6
+    stats = policy.get_stats()
+    print(f"   {per_call:.1f}us per decision, average budget {stats['avg_max_tokens']} tokens (was 2000)")
+
+async def bench_bulk_planning(inputs: int = 120, latency: float = 0.2):
+    """Throughput of plan_workflows() versus a sequential plan_workflow() loop"""
+    requirements = [f"Sync CRM contact {i % 100} to a Google Sheet" for i in range(inputs)]
+
+    def planner() -> PlannerAgent:
+        # Fresh caches so neither run benefits from the other
+        return PlannerAgent(provider=FakeProvider(latency=latency), plan_cache=PlanCache(), use_similarity=False)
+
+    print(f"\n📚 Bulk planning: {inputs} requirements ({len(set(requirements))} unique), {latency:.1f}s latency")
+    print(f"{'mode':>22} {'elapsed (s)':>12} {'LLM calls':>10} {'first result (s)':>17}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        sequential = planner()
+        start = time.perf_counter()
+        first = None
+        for requirement in requirements:
+            await sequential.plan_workflow(requirement)
+            first = first or time.perf_counter() - start
+        sequential_time = time.perf_counter() - start
+    print(f"{'sequential loop':>22} {sequential_time:>12.2f} {sequential.provider.call_count:>10} {first:>17.2f}")
+
+    for concurrency in [8, 32]:
+        bulk = planner()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            first = None
+            results = 0
+            async for index, plan in bulk.plan_workflows(requirements, concurrency=concurrency):
+                first = first or time.perf_counter() - start
+                results += 1
+            elapsed = time.perf_counter() - start
+        assert results == inputs
+        label = f"plan_workflows({concurrency})"
+        print(f"{label:>22} {elapsed:>12.2f} {bulk.provider.call_count:>10} {first:>17.2f}")
+
+async def bench_rate_limiter(requests: int = 60, provider_rpm: int = 600, latency: float = 0.05):
+    """Fallback plans and latency in a burst against a provider that enforces its RPM with 429s"""
+    from agents.llm_providers import LLMProvider
+    from agents.rate_limiter import RateLimiter, RateLimitedProvider
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+        def __init__(self, retry_after: float):
+            super().__init__("429 Too Many Requests")
+            self.response = type("Response", (), {"headers": {"retry-after": f"{retry_after:.3f}"}})()
+
+    class ThrottlingProvider(LLMProvider):
+        """Fake provider that rejects requests beyond provider_rpm in any rolling second"""
+        def __init__(self):
+            super().__init__(name="openrouter", model="throttled")
+            self.inner = FakeProvider(latency=latency)
+            self.sent = []
+
+        async def complete(self, prompt: str, **options) -> str:
+            now = time.monotonic()
+            self.sent = [t for t in self.sent if now - t < 1.0]
+            if len(self.sent) >= provider_rpm / 60:
+                raise RateLimitError(retry_after=1.0 - (now - self.sent[0]))
+            self.sent.append(now)
+            return await self.inner.complete(prompt, **options)
+
+    async def run(provider) -> tuple:
+        planner = PlannerAgent(provider=provider, use_cache=False, use_similarity=False, coalesce=False)
+        timings = []
+        fallbacks = 0
+
+        async def one(i: int):
+            nonlocal fallbacks
+            start = time.perf_counter()
+            plan = await planner.plan_workflow(f"Send a Slack message for ticket {i}")
+            timings.append(time.perf_counter() - start)
+            fallbacks += "LLM API failed" in plan.get("note", "")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            await asyncio.gather(*(one(i) for i in range(requests)))
+        timings.sort()
+        return fallbacks, timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+    print(f"\n🚦 Rate limiting: burst of {requests} requests, provider allows {provider_rpm // 60}/s")
+    print(f"{'setup':>18} {'fallback plans':>15} {'p50 (s)':>8} {'p95 (s)':>8}")
+    fallbacks, p50, p95 = await run(ThrottlingProvider())
+    print(f"{'unmanaged':>18} {fallbacks:>15} {p50:>8.2f} {p95:>8.2f}")
+    limiter = RateLimiter(requests_per_minute=provider_rpm, tokens_per_minute=10_000_000, burst_seconds=1.0)
+    fallbacks, p50, p95 = await run(RateLimitedProvider(ThrottlingProvider(), limiter))
+    print(f"{'shared limiter':>18} {fallbacks:>15} {p50:>8.2f} {p95:>8.2f}")
+    stats = limiter.get_stats()["openrouter"]
+    print(f"   max queue depth {stats['max_queue_depth']}, mean wait {stats['mean_wait']:.2f}s, "
+          f"429s retried {stats['throttled']}")
+
+def bench_intent_classifier(scale: int = 10, rounds: int = 2000):
+    """Show classification cost stays flat as the keyword vocabulary grows
+
+    The first-hit scan is the old fallback routing: it stops at the first
+    category with any substring match and cannot rank. The scored scan
+    checks every keyword, which is what ranking costs without the
+    classifier's set lookup.
+    """
+    import random
+    import string
+    import timeit
+    rng = random.Random(7)
+    prompts = [
+        "Create a webhook that receives JSON data and sends a Slack notification",
+        "Monitor an RSS feed and save new items to a Google Sheet",
+        "Build an order processing system that monitors new orders, validates inventory, "
+        "processes payments, updates multiple databases and sends order confirmations",
+        "Create a workflow that integrates with multiple APIs (GitHub, Jira, Slack) and logs all activities",
+    ]
+
+    def grown_vocabulary(factor: int) -> dict:
+        grown = {category: dict(keywords) for category, keywords in DEFAULT_INTENT_KEYWORDS.items()}
+        for category, keywords in grown.items():
+            for _ in range(len(DEFAULT_INTENT_KEYWORDS[category]) * (factor - 1)):
+                word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+                keywords[word] = 1
+        return grown
+
+    def first_hit_scan(vocabulary: dict, text: str) -> str:
+        lowered = text.lower()
+        for category, keywords in vocabulary.items():
+            if any(word in lowered for word in keywords):
+                return category
+        return "generic"
+
+    def scored_scan(vocabulary: dict, text: str) -> dict:
+        lowered = text.lower()
+        scores = {}
+        for category, keywords in vocabulary.items():
+            score = sum(weight for word, weight in keywords.items() if word in lowered)
+            if score:
+                scores[category] = score
+        return scores
+
+    def per_prompt(fn) -> float:
+        best = min(timeit.repeat(lambda: [fn(prompt) for prompt in prompts], number=rounds // 4, repeat=5))
+        return best / (rounds // 4 * len(prompts)) * 1e6
+
+    print(f"\n🏷️  Intent classification over {len(prompts)} prompts (us per prompt, best of 5)")
+    print(f"{'vocabulary':>12} {'keywords':>9} {'top_intent':>11} {'classify':>9} {'first-hit scan':>15} "
+          f"{'scored scan':>12}")
+    for factor in [1, scale, 3 * scale]:
+        vocabulary = grown_vocabulary(factor)
+        classifier = IntentClassifier(vocabulary)
+        keyword_count = sum(len(k) for k in vocabulary.values())
+        top = per_prompt(classifier.top_intent)
+        ranked = per_prompt(classifier.classify)
+        first_hit = per_prompt(lambda prompt: first_hit_scan(vocabulary, prompt))
+        scored = per_prompt(lambda prompt: scored_scan(vocabulary, prompt))
+        print(f"{f'{factor}x':>12} {keyword_count:>9} {top:>11.1f} {ranked:>9.1f} {first_hit:>15.1f} {scored:>12.1f}")
+
+def bench_plan_templates(rounds: int = 5000):
+    """Compare fallback plan copies and serialization against per-call dict building"""
+    import copy
+    import json
+    user_input = "Create a workflow that posts new YouTube videos to our social media channels every day"
+    extra = {"status": "success", "timestamp": "2024-01-01T00:00:00", "note": "fallback"}
+
+    def per_call(fn) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        return (time.perf_counter() - start) / rounds * 1e6
+
+    print(f"\n🧩 Fallback plan templates ({rounds} rounds, us per call)")
+    print(f"{'template':>16} {'deepcopy':>9} {'instantiate':>12} {'dumps':>8} {'serialize':>10}")
+    for key in ["social_media", "developer", "generic_simple"]:
+        template = FALLBACK_PLAN_TEMPLATES[key]
+        plan = template.instantiate(user_input)
+        deep = per_call(lambda: copy.deepcopy(plan))
+        instantiate = per_call(lambda: template.instantiate(user_input))
+        dumps = per_call(lambda: json.dumps({**template.instantiate(user_input), **extra}))
+        serialize = per_call(lambda: template.serialize(user_input, extra))
+        print(f"{key:>16} {deep:>9.1f} {instantiate:>12.1f} {dumps:>8.1f} {serialize:>10.1f}")
+
+def bench_plan_index(items: int = 100000, lookups: int = 2000):
+    """Measure near-duplicate lookup latency with a large plan index"""
+    import random
+    rng = random.Random(42)
+    vocabulary = (
+        "slack email webhook rss feed github jira sheets csv file upload order payment inventory "
+        "test deploy code youtube video schedule daily weekly hourly report summary database "
+        "postgres mysql api http json parse transform filter validate customer invoice stripe "
+        "shopify twitter linkedin image resize pdf ocr translate summarize classify ticket "
+        "support crm hubspot salesforce lead contact calendar meeting zoom discord telegram sms "
+        "twilio backup s3 dropbox drive folder"
+    ).split()
+
+    def random_prompt() -> str:
+        return " ".join(rng.choices(vocabulary, k=rng.randint(5, 12)))
+
+    index = PlanIndex()
+    start = time.perf_counter()
+    for i in range(items):
+        index.store(f"{random_prompt()} project {i}", {"workflow_name": f"Plan {i}"})
+    print(f"\n🔎 Plan index: {items} prompts indexed in {time.perf_counter() - start:.1f}s")
+
+    queries = {
+        "unseen": [random_prompt() for _ in range(lookups)],
+        "near-duplicate": [index._prompts[rng.randrange(items)] for _ in range(lookups)],
+    }
+    print(f"{'queries':>16} {'p50 (ms)':>10} {'p99 (ms)':>10} {'reused':>8}")
+    for label, batch in queries.items():
+        timings = []
+        reused = 0
+        for query in batch:
+            start = time.perf_counter()
+            reused += index.lookup(query) is not None
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[int(len(timings) * 0.99)] * 1000
+        print(f"{label:>16} {p50:>10.3f} {p99:>10.3f} {reused:>8}")
+
+def bench_plan_salvage(rounds: int = 500):
+    """Share of typical malformed LLM plan outputs recovered by parse_plan() versus json.loads()"""
+    import json
+    from agents.plan_parser import PlanParseStats, PlanParseError, parse_plan
+    plan = FakeProvider().response
+    text = json.dumps(plan, indent=2)
+    outputs = {
+        "clean": text,
+        "fenced": f"```json\n{text}\n```",
+        "prose": f"Here is the workflow plan you asked for:\n\n{text}\n\nLet me know if you need changes!",
+        "trailing commas": text.replace("}\n  ]", "},\n  ]").replace("[]\n}", "[],\n}"),
+        "single quotes": text.replace('"', "'"),
+        "python literals": text.replace("[]", "None").replace('"low"', "True").replace('"', "'"),
+        "comments": text.replace('"nodes": [', '"nodes": [ // trigger first\n'),
+        "unquoted keys": text.replace('"id":', "id:").replace('"type":', "type:"),
+        "truncated": text[:len(text) // 2],
+        "no nodes": json.dumps({"workflow_name": "Empty", "nodes": []}),
+    }
+    stats = PlanParseStats()
+    print(f"\n🩹 Plan salvage: {len(outputs)} LLM output variants")
+    print(f"{'output':>16} {'json.loads':>11} {'parse_plan':>11} {'us/parse':>9}")
+    for label, output in outputs.items():
+        try:
+            json.loads(output)
+            strict = "ok"
+        except json.JSONDecodeError:
+            strict = "fallback"
+        try:
+            parse_plan(output, stats)
+            salvaged = "ok"
+        except PlanParseError:
+            salvaged = "fallback"
+        start = time.perf_counter()
+        for _ in range(rounds):
+            try:
+                parse_plan(output)
+            except PlanParseError:
+                pass
+        per_parse = (time.perf_counter() - start) / rounds * 1e6
+        print(f"{label:>16} {strict:>11} {salvaged:>11} {per_parse:>9.1f}")
+    summary = stats.get_stats()
+    print(f"   salvaged {summary['salvaged']} of {summary['salvaged'] + summary['discarded']} non-strict outputs "
+          f"(salvage rate {summary['salvage_rate']:.0%})")
+
+async def bench_deadline(requests: int = 20, deadline: float = 0.5, slow_latency: float = 2.0):
+    """Time to a generated workflow with and without a deadline when some LLM calls are very slow"""
+    import random
+    from agents.team import DAForgeTeam
+    rng = random.Random(3)
+    prompts = [f"Post new Jira issue {i} to a Slack channel" for i in range(requests)]
+    # One call in four stalls far past the deadline
+    provider = FakeProvider(latency_sampler=lambda: slow_latency if rng.random() < 0.25 else 0.1)
+
+    async def run(cache: PlanCache, teams: list, **options) -> tuple:
+        timings, sources = [], []
+
+        async def one(prompt: str):
+            team = DAForgeTeam(provider=provider)
+            team.planner_agent.plan_cache = cache
+            team.planner_agent.plan_index = None
+            teams.append(team)
+            start = time.perf_counter()
+            ready = []
+            # Deployment (a fixed 2s in mock mode) starts once plan and workflow are ready
+            team.set_progress_callback(
+                lambda stage, _: ready.append(time.perf_counter() - start) if stage == "deployment" else None
+            )
+            result = await team.execute_workflow_generation(prompt, **options)
+            timings.append(ready[0])
+            sources.append(result["execution_summary"]["plan_source"])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            await asyncio.gather(*(one(prompt) for prompt in prompts))
+        timings.sort()
+        return timings[len(timings) // 2], timings[-1], sources.count("speculative")
+
+    print(f"\n⏰ Deadline: {requests} requests, 25% of LLM calls take {slow_latency:.1f}s, deadline {deadline:.1f}s")
+    print(f"{'mode':>20} {'p50 ready (s)':>14} {'max ready (s)':>14} {'fallback plans':>15}")
+    p50, worst, speculative = await run(PlanCache(), [])
+    print(f"{'no deadline':>20} {p50:>14.2f} {worst:>14.2f} {speculative:>15}")
+    cache, teams = PlanCache(), []
+    p50, worst, speculative = await run(cache, teams, deadline=deadline)
+    print(f"{'deadline':>20} {p50:>14.2f} {worst:>14.2f} {speculative:>15}")
+    # Let the late LLM plans land in the cache, then repeat the same requests
+    await asyncio.gather(*(task for team in teams for task in list(team._background_tasks)))
+    p50, worst, speculative = await run(cache, [], deadline=deadline)
+    print(f"{'deadline, repeated':>20} {p50:>14.2f} {worst:>14.2f} {speculative:>15}")
+
+async def bench_incremental_replan(edits: int = 5, token_latency: float = 0.01):
+    """Output tokens and latency of an edit loop: full re-plans versus plan patches"""
+    from agents.planner_agent import PLAN_PATCH_SYSTEM_PROMPT
+    plan = synthetic_plan(12)
+    prompts = ["Run twelve processing steps on each new order"]
+    prompts += [f"Run twelve processing steps on each new order and notify channel {i} on Slack"
+                for i in range(edits)]
+
+    class EditingProvider(FakeProvider):
+        """Answers plan requests with the whole plan and patch requests with a one-node patch"""
+        async def complete(self, prompt: str, **options) -> str:
+            if options.get("system") == PLAN_PATCH_SYSTEM_PROMPT:
+                self.response = {
+                    "add_nodes": [{"id": "notify", "type": "n8n-nodes-base.slack", "name": "Notify",
+                                   "parameters": {"channel": prompt.split("notify channel ")[-1].split()[0]}}],
+                    "add_connections": [{"from": plan["nodes"][-1]["id"], "to": "notify"}]
+                }
+            else:
+                self.response = plan
+            return await super().complete(prompt, **options)
+
+    async def run(incremental: bool) -> tuple:
+        provider = EditingProvider(latency=0.1, token_latency=token_latency)
+        planner = PlannerAgent(provider=provider, plan_cache=PlanCache(), use_similarity=False)
+        output_tokens, elapsed, previous = 0, 0.0, None
+        with contextlib.redirect_stdout(io.StringIO()):
+            for prompt in prompts:
+                start = time.perf_counter()
+                if incremental and previous is not None:
+                    plan_data = await planner.replan_workflow(prompt, *previous)
+                else:
+                    plan_data = await planner.plan_workflow(prompt)
+                if previous is not None:
+                    elapsed += time.perf_counter() - start
+                    output_tokens += plan_data["llm_usage"]["output_tokens"]
+                previous = (prompt, plan_data)
+        return output_tokens // edits, elapsed / edits, len(plan_data["nodes"])
+
+    print(f"\n✏️  Incremental re-planning: {edits} edits of a 12 node plan, {token_latency * 1000:.0f}ms per output token")
+    print(f"{'mode':>14} {'output tokens/edit':>19} {'latency/edit (s)':>17} {'final nodes':>12}")
+    for label, incremental in (("full re-plan", False), ("plan patch", True)):
+        tokens, latency, nodes = await run(incremental)
+        print(f"{label:>14} {tokens:>19} {latency:>17.2f} {nodes:>12}")
+
+async def bench_replay_server(requests: int = 64, seed: int = 7):
+    """Planner throughput and tail latency through the real SDK and HTTP stack against the local replay server"""
+    from llm_replay_server import ReplayServer
+    from agents.client_pool import LLMClientPool
+    from agents.llm_providers import OpenRouterProvider
+    from agents.rate_limiter import RateLimiter, RateLimitedProvider
+    prompts = [f"Copy new Typeform response {i} into Airtable and notify Slack" for i in range(requests)]
+
+    print(f"\n🎞️  Replay server: {requests} plans, lognormal TTFT (median 300ms), 400 tok/s, 2% injected 429s")
+    print(f"{'mode':>10} {'concurrency':>12} {'req/s':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'fallbacks':>10}")
+    for stream in (False, True):
+        for concurrency in (1, 8, 32):
+            # A fresh, identically seeded server per run makes every run replay the same latencies
+            async with ReplayServer(first_token_latency="lognormal:0.3:0.6", tokens_per_second=400,
+                                    rate_limit_rate=0.02, retry_after=0.2, seed=seed) as server:
+                pool = LLMClientPool()
+                provider = RateLimitedProvider(
+                    OpenRouterProvider(api_key="replay", model="replay-model",
+                                       base_url=server.base_urls["openrouter"], client_pool=pool),
+                    RateLimiter(requests_per_minute=100_000, tokens_per_minute=100_000_000)
+                )
+                planner = PlannerAgent(provider=provider, use_cache=False, use_similarity=False, coalesce=False)
+                semaphore = asyncio.Semaphore(concurrency)
+                timings, fallbacks = [], 0
+
+                async def one(prompt: str):
+                    nonlocal fallbacks
+                    async with semaphore:
+                        start = time.perf_counter()
+                        if stream:
+                            plan = {}
+                            async for event in planner.plan_workflow_stream(prompt):
+                                if event["type"] == "plan":
+                                    plan = event["plan"]
+                        else:
+                            plan = await planner.plan_workflow(prompt)
+                        timings.append(time.perf_counter() - start)
+                        fallbacks += "llm_usage" not in plan
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    await asyncio.gather(*(one(prompt) for prompt in prompts))
+                    elapsed = time.perf_counter() - start
+                await pool.aclose()
+            timings.sort()
+            mode = "stream" if stream else "blocking"
+            print(f"{mode:>10} {concurrency:>12} {requests / elapsed:>7.1f} {timings[len(timings) // 2]:>8.2f} "
+                  f"{timings[int(len(timings) * 0.95)]:>8.2f} {timings[int(len(timings) * 0.99)]:>8.2f} {fallbacks:>10}")
+
+async def bench_shared_generator(generations: int = 4000, threads: int = 8):
+    """Interleave thousands of generations on one shared WorkflowGenerator and check none mixes up another's nodes"""
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    generator = WorkflowGenerator()
+    rng = random.Random(5)
+    # Every plan reuses the same plan node IDs, so a connection wired through
+    # another call's ID mapping points at nodes outside its own workflow
+    plans = [synthetic_plan(rng.randint(2, 40)) for _ in range(64)]
+    for index, plan in enumerate(plans):
+        plan["workflow_name"] = f"Plan {index}"
+
+    async def events(plan: dict):
+        for node in plan["nodes"]:
+            yield {"type": "node", "node": node}
+            await asyncio.sleep(0)
+        for connection in plan["connections"]:
+            yield {"type": "connection", "connection": connection}
+            await asyncio.sleep(0)
+        yield {"type": "plan", "plan": plan}
+
+    def mixed_up(plan: dict, result: dict) -> bool:
+        workflow = result.get("workflow_data") or {}
+        node_ids = {node["id"] for node in workflow.get("nodes", [])}
+        targets = {target["node"] for outputs in workflow.get("connections", {}).values()
+                   for output in outputs["main"] for target in output}
+        return (workflow.get("name") != plan["workflow_name"] or len(node_ids) != len(plan["nodes"])
+                or not set(workflow.get("connections", {})) <= node_ids or not targets <= node_ids
+                or result["connection_count"] != len({c["from"] for c in plan["connections"]}))
+
+    async def one(index: int) -> bool:
+        plan = plans[index % len(plans)]
+        if index % 2:
+            result = await generator.generate_workflow_stream(events(plan))
+        else:
+            await asyncio.sleep(0)
+            result = await generator.generate_workflow(plan)
+        return mixed_up(plan, result)
+
+    async def batch(indexes: list) -> int:
+        return sum(await asyncio.gather(*(one(index) for index in indexes)))
+
+    print(f"\n🧵 Shared generator: {generations} interleaved generations ({generations // 2} as tasks, "
+          f"{generations // 2} across {threads} threads)")
+    switch_interval = sys.getswitchinterval()
+    # Force frequent thread switches so threads interleave inside generation calls
+    sys.setswitchinterval(1e-6)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            task_mixups = await batch(list(range(generations // 2)))
+            task_elapsed = time.perf_counter() - start
+
+            indexes = list(range(generations // 2, generations))
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                thread_mixups = sum(pool.map(lambda part: asyncio.run(batch(part)),
+                                             [indexes[i::threads] for i in range(threads)]))
+            thread_elapsed = time.perf_counter() - start
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    print(f"{'mode':>10} {'generations':>12} {'seconds':>8} {'mixed up':>9}")
+    print(f"{'tasks':>10} {generations // 2:>12} {task_elapsed:>8.2f} {task_mixups:>9}")
+    print(f"{'threads':>10} {generations - generations // 2:>12} {thread_elapsed:>8.2f} {thread_mixups:>9}")
+    print("   ✅ no generation used another call's node IDs" if task_mixups + thread_mixups == 0
+          else "   ❌ generations mixed up each other's node IDs")
+
+def synthetic_workflow(node_count: int, seed: int = 3) -> dict:
+    """A machine-generated style n8n workflow: a trigger fanning into a random DAG with a few back edges"""
+    import random
+    rng = random.Random(seed)
+    nodes = [{"id": "n0", "name": "Trigger", "type": "n8n-nodes-base.manualTrigger"}]
+    nodes += [{"id": f"n{i}", "name": f"Step {i}", "type": "n8n-nodes-base.code"} for i in range(1, node_count)]
+    connections: dict = {}
+
+    def connect(source: int, target: int):
+        connections.setdefault(f"n{source}", {"main": [[]]})["main"][0].append(
+            {"node": f"n{target}", "type": "main", "index": 0})
+
+    for i in range(1, node_count):
+        for source in {rng.randrange(max(0, i - 50), i) for _ in range(rng.choice((1, 1, 2, 3)))}:
+            connect(source, i)
+    for _ in range(node_count // 500):
+        target = rng.randrange(1, node_count - 1)
+        connect(rng.randrange(target + 1, min(node_count, target + 10)), target)
+    return {"id": "synthetic", "name": f"Synthetic {node_count}", "nodes": nodes, "connections": connections}
+
+def bench_graph_validation(sizes: tuple = (1000, 5000, 20000)):
+    """Time workflow validation (IDs, cycles, topological order, reachability) as workflows grow"""
+    generator = WorkflowGenerator()
+    print("\n🕸️  Graph validation: random DAG workflows with occasional back edges")
+    print(f"{'nodes':>7} {'edges':>7} {'ms':>8} {'µs/(V+E)':>9} {'cycle nodes':>12}")
+    for size in sizes:
+        workflow = synthetic_workflow(size)
+        runs = 5
+        start = time.perf_counter()
+        for _ in range(runs):
+            result = generator._validate_workflow(workflow)
+        elapsed = (time.perf_counter() - start) / runs
+        edges = result["connection_count"]
+        print(f"{size:>7} {edges:>7} {elapsed * 1000:>8.1f} {elapsed * 1e6 / (size + edges):>9.2f} "
+              f"{len(result['cycle_nodes']):>12}")
+
+def bench_layered_layout(sizes: tuple = (1000, 5000, 20000)):
+    """Layered layout time and edge crossings between adjacent layers, with and without crossing reduction"""
+    from tools.workflow_graph import WorkflowGraph
+    from tools.workflow_layout import assign_layers, order_layers, layered_layout
+
+    def crossings(graph: WorkflowGraph, rows: list) -> int:
+        slot, layer_of = {}, {}
+        for layer, row in enumerate(rows):
+            for index, node in enumerate(row):
+                slot[node], layer_of[node] = index, layer
+        by_layer: dict = {}
+        for source in range(len(graph)):
+            for target in graph.successors(source):
+                if layer_of[target] == layer_of[source] + 1:
+                    by_layer.setdefault(layer_of[source], []).append((slot[source], slot[target]))
+        return sum(1 for edges in by_layer.values() for i, (a, b) in enumerate(edges)
+                   for c, d in edges[i + 1:] if (a - c) * (b - d) < 0)
+
+    print("\n📐 Layered layout: random DAG workflows, n8n positions from the connection graph")
+    print(f"{'nodes':>7} {'index ms':>9} {'layout ms':>10} {'overlaps':>9} {'crossings before':>17} {'after':>7}")
+    for size in sizes:
+        workflow = synthetic_workflow(size)
+        start = time.perf_counter()
+        graph = WorkflowGraph.from_workflow(workflow)
+        indexed = time.perf_counter()
+        positions = layered_layout(graph)
+        laid_out = time.perf_counter()
+        overlaps = len(positions) - len(set(map(tuple, positions)))
+        layers = assign_layers(graph, graph.topological_order()[0])
+        before = crossings(graph, order_layers(graph, layers, sweeps=0))
+        after = crossings(graph, order_layers(graph, layers))
+        print(f"{size:>7} {(indexed - start) * 1000:>9.1f} {(laid_out - indexed) * 1000:>10.1f} {overlaps:>9} "
+              f"{before:>17} {after:>7}")
+
+async def bench_model_memory(total_nodes: int = 100_000, nodes_per_workflow: int = 1000):
+    """Bytes per node of plans and n8n workflows held as dicts versus __slots__ models"""
+    import gc
+    import json
+    import tracemalloc
+    from tools.workflow_model import Plan, Workflow
+    generator = WorkflowGenerator()
+    plan = synthetic_plan(nodes_per_workflow)
+    with contextlib.redirect_stdout(io.StringIO()):
+        workflow = (await generator.generate_workflow(plan))["workflow_data"]
+    # Batches arrive as JSON (LLM output, cache, API), so every copy has its own strings
+    texts = {"plan": json.dumps(plan), "workflow": json.dumps(workflow)}
+    copies = total_nodes // nodes_per_workflow
+
+    def measure(build) -> int:
+        gc.collect()
+        tracemalloc.start()
+        held = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        return size
+
+    def models(text: str, model) -> list:
+        held = []
+        for _ in range(copies):
+            data = json.loads(text)
+            held.append(model.from_dict(data) if model is Plan else model.from_n8n(data))
+        return held
+
+    print(f"\n🧱 Model memory: {copies} workflows x {nodes_per_workflow} nodes ({copies * nodes_per_workflow} nodes)")
+    print(f"{'':>10} {'dict B/node':>12} {'model B/node':>13} {'saved':>7}")
+    for name, model in (("plan", Plan), ("workflow", Workflow)):
+        as_dicts = measure(lambda: [json.loads(texts[name]) for _ in range(copies)])
+        as_models = measure(lambda: models(texts[name], model))
+        nodes = copies * nodes_per_workflow
+        print(f"{name:>10} {as_dicts / nodes:>12.0f} {as_models / nodes:>13.0f} {1 - as_models / as_dicts:>7.0%}")
+
+async def bench_json_codec(sizes: tuple = (10, 200, 2000), rounds: int = 50):
+    """Total JSON encode/decode time of one request's hops (agents, caches, UI) per codec backend"""
+    from agents import json_codec
+    from agents.input_agent import InputAgent
+    generator = WorkflowGenerator()
+    input_data = InputAgent().process_input("Copy new Typeform responses into Airtable and notify Slack")
+    codecs = []
+    for name in json_codec.CODECS:
+        try:
+            codecs.append(json_codec.create_json_codec(name))
+        except ImportError:
+            print(f"   ({name} not installed)")
+
+    def one_request(codec, plan: dict, workflow: dict):
+        processed = codec.dumps(input_data)           # InputAgent.run
+        codec.loads(processed)                         # DAForgeTeam
+        codec.loads(processed)                         # PlannerAgent.run
+        content = codec.dumps(plan)                    # PlannerAgent.run
+        codec.loads(content)                           # DAForgeTeam
+        codec.dumps(plan)                              # PlanCache.store
+        codec.dumps(plan)                              # PlanIndex.store
+        codec.format(workflow)                         # UI display
+        codec.format(workflow)                         # UI download
+
+    print(f"\n🔣 JSON codec: serialization time per request ({rounds} rounds)")
+    print(f"{'nodes':>7} " + " ".join(f"{codec.name + ' ms':>12}" for codec in codecs) + f" {'speedup':>8}")
+    for size in sizes:
+        plan = synthetic_plan(size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            workflow = (await generator.generate_workflow(plan))["workflow_data"]
+        timings = []
+        for codec in codecs:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                one_request(codec, plan, workflow)
+            timings.append((time.perf_counter() - start) / rounds * 1000)
+        stdlib = timings[[codec.name for codec in codecs].index("stdlib")]
+        print(f"{size:>7} " + " ".join(f"{t:>12.3f}" for t in timings) + f" {stdlib / min(timings):>7.1f}x")
+
+BENCHMARKS = {
+    "async": bench_async_planning,
+    "index": bench_plan_index,
+    "burst": bench_burst_coalescing,
+    "stream": bench_streaming,
+    "pipeline": bench_pipeline,
+    "intents": bench_intent_classifier,
+    "templates": bench_plan_templates,
+    "hedge": bench_hedging,
+    "breaker": bench_circuit_breaker,
+    "pool": bench_client_pool,
+    "prompt": bench_prompt_cache,
+    "routing": bench_model_routing,
+    "bulk": bench_bulk_planning,
+    "limiter": bench_rate_limiter,
+    "salvage": bench_plan_salvage,
+    "deadline": bench_deadline,
+    "replan": bench_incremental_replan,
+    "replay": bench_replay_server,
+    "generator": bench_shared_generator,
+    "graph": bench_graph_validation,
+    "layout": bench_layered_layout,
+    "memory": bench_model_memory,
+    "json": bench_json_codec,
+}
+
+async def main():
+    """Main function"""
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name}")
+            print(f"Available benchmarks: {', '.join(BENCHMARKS)}")
+            return
+
+    for name in selected:
+        result = BENCHMARKS[name]()
+        if asyncio.iscoroutine(result):
+            await result
+
+if __name__ == "__main__":
+    print("📊 DA-Forge Benchmarks")
+    print("Usage:")
+    print("  python benchmarks.py              # Run all benchmarks")
+    print("  python benchmarks.py <name> ...   # Run selected benchmarks")
+
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+DA-Forge Import Time Check
+Fails when a cold import of agents.team goes over its time budget or pulls in heavy SDKs
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a provider or a real deployment is
+# actually used
+DEFERRED_MODULES = ["openai", "anthropic", "aiohttp"]
+
+def measure_import(module: str) -> tuple:
+    """Cumulative import time of a module in a fresh interpreter (-X importtime), plus the rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    total = next(cumulative for _, cumulative, name in rows if name.strip() == module and not name.startswith("  "))
+    return total, rows
+
+def loaded_deferred_modules(module: str) -> list:
+    """Deferred modules that are in sys.modules after importing module and building a team"""
+    script = (
+        f"import sys, {module}\n"
+        "from agents.team import DAForgeTeam\n"
+        "DAForgeTeam()\n"
+        f"print('loaded:' + ','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = next(line for line in result.stdout.splitlines() if line.startswith("loaded:"))
+    return [m for m in loaded[len("loaded:"):].split(",") if m]
+
+def main() -> int:
+    """Main function"""
+    module = "agents.team"
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.getenv("IMPORT_TIME_BUDGET_MS", "300"))
+    runs = 3
+
+    # Best of a few runs, so one slow run on a busy machine does not fail the check
+    measurements = [measure_import(module) for _ in range(runs)]
+    total_us, rows = min(measurements, key=lambda m: m[0])
+    print(f"⏱️  import {module}: {total_us / 1000:.1f}ms (best of {runs}, budget {budget_ms:.0f}ms)")
+    print(f"{'self (ms)':>10} {'cumulative (ms)':>16}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:10]:
+        print(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>16.1f}  {name}")
+
+    failed = False
+    if total_us / 1000 > budget_ms:
+        print(f"❌ {module} took {total_us / 1000:.1f}ms to import, over the {budget_ms:.0f}ms budget")
+        failed = True
+    loaded = loaded_deferred_modules(module)
+    if loaded:
+        print(f"❌ Importing {module} and building a team loaded {', '.join(loaded)}")
+        failed = True
+    if not failed:
+        print(f"✅ Within budget; {', '.join(DEFERRED_MODULES)} stay unloaded until used")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+DA-Forge LLM Replay Server
+Local stand-in for the OpenAI chat-completions and Anthropic messages APIs,
+replaying recorded plan responses for reproducible offline load tests
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.llm_providers import LLMProvider, FakeProvider
+from agents.llm_usage import LLMUsage
+from agents.json_codec import dumps, loads
+from memory.plan_cache import normalize_input
+
+def _system_fingerprint(system: Optional[str]) -> str:
+    return hashlib.sha256((system or "").encode("utf-8")).hexdigest()[:16]
+
+class RecordingProvider(LLMProvider):
+    """Passes requests through to a live provider and appends each response to a JSONL file
+
+    The file is the input of ReplayServer. Each line holds the user prompt,
+    a fingerprint of the system prefix and the completion text.
+    """
+
+    def __init__(self, provider: LLMProvider, path: str):
+        super().__init__(name=provider.name, model=provider.model, models=provider.models)
+        self.provider = provider
+        self.path = path
+
+    @property
+    def client(self):
+        return self.provider.client
+
+    def _record(self, prompt: str, system: Optional[str], text: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(dumps({"system": _system_fingerprint(system), "prompt": prompt, "response": text}) + "\n")
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                       system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                       tier: Optional[str] = None) -> str:
+        text = await self.provider.complete(prompt, max_tokens=max_tokens, temperature=temperature,
+                                            system=system, usage=usage, tier=tier)
+        self._record(prompt, system, text)
+        return text
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.3,
+                     system: Optional[str] = None, usage: Optional[LLMUsage] = None,
+                     tier: Optional[str] = None) -> AsyncIterator[str]:
+        chunks = []
+        async for chunk in self.provider.stream(prompt, max_tokens=max_tokens, temperature=temperature,
+                                                system=system, usage=usage, tier=tier):
+            chunks.append(chunk)
+            yield chunk
+        self._record(prompt, system, "".join(chunks))
+
+class LatencyDistribution:
+    """Seconds-valued distribution parsed from a spec string
+
+    "0.5" is a fixed latency, "uniform:LOW:HIGH" is uniform,
+    "lognormal:MEDIAN:SIGMA" has a long tail, and "empirical:A,B,C" draws
+    from observed samples.
+    """
+
+    def __init__(self, spec: str = "0.2"):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        if not args:
+            self.kind, self.params = "fixed", [float(kind)]
+        elif kind in ("uniform", "lognormal"):
+            self.kind, self.params = kind, [float(x) for x in args.split(":")]
+        elif kind == "empirical":
+            self.kind, self.params = kind, [float(x) for x in args.split(",")]
+        else:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.params[0]), self.params[1])
+        return rng.choice(self.params)
+
+class _Request:
+    __slots__ = ("method", "path", "headers", "body")
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+class ReplayServer:
+    """OpenAI- and Anthropic-compatible HTTP server that replays recorded completions
+
+    Responses come from a recordings JSONL file (see RecordingProvider):
+    an exact match on system prefix and prompt wins, otherwise a recording
+    with the same system prefix is picked by prompt hash, so replays are
+    deterministic. Without recordings it serves the FakeProvider plan.
+
+    Every request waits for a time to first token drawn from
+    first_token_latency, then produces output at tokens_per_second, in
+    chunk_size character chunks when streaming. error_rate and
+    rate_limit_rate inject 500s and 429s (with Retry-After), and
+    max_requests_per_second rejects requests beyond a rolling one-second
+    window with 429s, like a provider enforcing its rate limit. All
+    randomness comes from one seeded generator.
+    """
+
+    def __init__(self, recordings: Optional[str] = None, first_token_latency: str = "0.2",
+                 tokens_per_second: float = 200.0, chunk_size: int = 16, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 max_requests_per_second: Optional[float] = None, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency = LatencyDistribution(first_token_latency)
+        self.tokens_per_second = tokens_per_second
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_requests_per_second = max_requests_per_second
+        self.host = host
+        self.port = port
+        self._rng = random.Random(seed)
+        self._recordings: List[Dict[str, str]] = []
+        self._exact: Dict[Tuple[str, str], str] = {}
+        self._by_system: Dict[str, List[str]] = {}
+        self._recent: List[float] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.stats: Dict[str, Any] = {"requests": 0, "streamed": 0, "connections": 0, "statuses": {},
+                                      "routes": {}, "replayed_exact": 0}
+        if recordings:
+            with open(recordings, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self.add_recording(**loads(line))
+        if not self._recordings:
+            self.add_recording("", "", dumps(FakeProvider().response))
+
+    def add_recording(self, system: str, prompt: str, response: str):
+        """Register a completion for a system prefix fingerprint and prompt"""
+        self._recordings.append({"system": system, "prompt": prompt, "response": response})
+        self._exact[(system, normalize_input(prompt))] = response
+        self._by_system.setdefault(system, []).append(response)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def base_urls(self) -> Dict[str, str]:
+        """Provider name -> base URL override for PlannerAgent(base_urls=...)"""
+        return {"openrouter": f"{self.url}/api/v1", "anthropic": self.url}
+
+    async def start(self) -> "ReplayServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "ReplayServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "statuses": dict(self.stats["statuses"]), "routes": dict(self.stats["routes"]),
+                "recordings": len(self._recordings)}
+
+    # HTTP plumbing
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> _Request:
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+        return _Request(method, path.split("?", 1)[0], headers, body)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                request = await self._read_request(reader)
+                await self._dispatch(request, writer)
+                if request.headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _count(self, route: str, status: int):
+        self.stats["statuses"][status] = self.stats["statuses"].get(status, 0) + 1
+        self.stats["routes"][route] = self.stats["routes"].get(route, 0) + 1
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None):
+        payload = dumps(body).encode("utf-8")
+        reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}[status]
+        head = [f"HTTP/1.1 {status} {reason}", "Content-Type: application/json",
+                f"Content-Length: {len(payload)}"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _send_events(self, writer: asyncio.StreamWriter, events: AsyncIterator[str]):
+        """Server-sent events over a chunked response"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n")
+        async for event in events:
+            data = event.encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # Request handling
+
+    def _reply_for(self, system: Optional[str], prompt: str) -> str:
+        fingerprint = _system_fingerprint(system)
+        exact = self._exact.get((fingerprint, normalize_input(prompt)))
+        if exact is not None:
+            self.stats["replayed_exact"] += 1
+            return exact
+        candidates = self._by_system.get(fingerprint) or [r["response"] for r in self._recordings]
+        digest = int(hashlib.sha256(normalize_input(prompt).encode("utf-8")).hexdigest(), 16)
+        return candidates[digest % len(candidates)]
+
+    def _injected_error(self) -> Optional[str]:
+        """"rate_limit", "error" or None for the next request"""
+        now = time.monotonic()
+        if self.max_requests_per_second is not None:
+            self._recent = [t for t in self._recent if now - t < 1.0]
+            if len(self._recent) >= self.max_requests_per_second:
+                return "rate_limit"
+            self._recent.append(now)
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limit"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return None
+
+    def _chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+
+    async def _paced(self, chunks: List[str], first_token: float) -> AsyncIterator[str]:
+        """Yield chunks on an absolute schedule: first_token, then tokens_per_second"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        elapsed = first_token
+        for chunk in chunks:
+            await asyncio.sleep(max(0.0, start + elapsed - loop.time()))
+            yield chunk
+            elapsed += max(1, len(chunk) // 4) / self.tokens_per_second
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter):
+        if request.method == "GET" and request.path == "/stats":
+            await self._send(writer, 200, self.get_stats())
+            return
+        if request.method == "POST" and request.path.endswith("/chat/completions"):
+            route = "openai"
+        elif request.method == "POST" and request.path.endswith("/messages"):
+            route = "anthropic"
+        else:
+            await self._send(writer, 404, {"error": {"message": f"No route for {request.method} {request.path}"}})
+            return
+
+        self.stats["requests"] += 1
+        body = loads(request.body or b"{}")
+        error = self._injected_error()
+        if error is not None:
+            status = 429 if error == "rate_limit" else 500
+            self._count(route, status)
+            message = "Rate limit exceeded (injected)" if status == 429 else "Internal error (injected)"
+            kind = "rate_limit_error" if status == 429 else "api_error"
+            payload = ({"error": {"message": message, "type": kind, "code": kind}} if route == "openai"
+                       else {"type": "error", "error": {"type": kind, "message": message}})
+            headers = {"retry-after": f"{self.retry_after:g}",
+                       "retry-after-ms": str(int(self.retry_after * 1000))} if status == 429 else None
+            await self._send(writer, status, payload, headers)
+            return
+
+        if route == "openai":
+            system, prompt = self._openai_prompt(body)
+        else:
+            system, prompt = self._anthropic_prompt(body)
+        text = self._reply_for(system, prompt)
+        input_tokens = (len(system or "") + len(prompt)) // 4
+        output_tokens = len(text) // 4
+        first_token = self.latency.sample(self._rng)
+        self._count(route, 200)
+
+        if body.get("stream"):
+            self.stats["streamed"] += 1
+            chunks = self._paced(self._chunks(text), first_token)
+            events = (self._openai_events if route == "openai" else self._anthropic_events)(
+                body, chunks, input_tokens, output_tokens
+            )
+            await self._send_events(writer, events)
+            return
+
+        await asyncio.sleep(first_token + output_tokens / self.tokens_per_second)
+        if route == "openai":
+            await self._send(writer, 200, self._openai_completion(body, text, input_tokens, output_tokens))
+        else:
+            await self._send(writer, 200, self._anthropic_message(body, text, input_tokens, output_tokens))
+
+    # OpenAI chat-completions format
+
+    @staticmethod
+    def _text_of(content: Any) -> str:
+        if isinstance(content, list):
+            return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        return content or ""
+
+    def _openai_prompt(self, body: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        system, prompt = None, ""
+        for message in body.get("messages", []):
+            if message.get("role") == "system":
+                system = self._text_of(message.get("content"))
+            elif message.get("role") == "user":
+                prompt = self._text_of(message.get("content"))
+        return system, prompt
+
+    def _openai_completion(self, body: Dict[str, Any], text: str, input_tokens: int,
+                           output_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "replay-model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": input_tokens, "completion_tokens": output_tokens,
+                      "total_tokens": input_tokens + output_tokens}
+        }
+
+    async def _openai_events(self, body: Dict[str, Any], chunks: AsyncIterator[str], input_tokens: int,
+                             output_tokens: int) -> AsyncIterator[str]:
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": body.get("model", "replay-model")}
+        async for chunk in chunks:
+            delta = {"index": 0, "delta": {"role": "assistant", "content": chunk}, "finish_reason": None}
+            yield f"data: {dumps({**base, 'choices': [delta]})}\n\n"
+        yield f"data: {dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {"prompt_tokens": input_tokens, "completion_tokens": output_tokens,
+                     "total_tokens": input_tokens + output_tokens}
+            yield f"data: {dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    # Anthropic messages format
+
+    def _anthropic_prompt(self, body: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        system = body.get("system")
+        prompt = ""
+        for message in body.get("messages", []):
+            if message.get("role") == "user":
+                prompt = self._text_of(message.get("content"))
+        return (self._text_of(system) if system else None), prompt
+
+    def _anthropic_message(self, body: Dict[str, Any], text: str, input_tokens: int,
+                           output_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "replay-model"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+        }
+
+    async def _anthropic_events(self, body: Dict[str, Any], chunks: AsyncIterator[str], input_tokens: int,
+                                output_tokens: int) -> AsyncIterator[str]:
+        def event(name: str, data: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {dumps({'type': name, **data})}\n\n"
+
+        message = self._anthropic_message(body, "", input_tokens, 0)
+        message["content"] = []
+        message["stop_reason"] = None
+        yield event("message_start", {"message": message})
+        yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        async for chunk in chunks:
+            yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+        yield event("content_block_stop", {"index": 0})
+        yield event("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": output_tokens}})
+        yield event("message_stop", {})
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Local OpenAI/Anthropic stand-in replaying recorded plans")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--recordings", help="JSONL file written by RecordingProvider")
+    parser.add_argument("--latency", default="0.2",
+                        help='time to first token: "0.5", "uniform:LOW:HIGH", "lognormal:MEDIAN:SIGMA" '
+                             'or "empirical:A,B,C"')
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        recordings=args.recordings, first_token_latency=args.latency,
+        tokens_per_second=args.tokens_per_second, chunk_size=args.chunk_size,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        max_requests_per_second=args.max_rps, seed=args.seed, host=args.host, port=args.port
+    )
+    print(f"🎞️  Replaying {server.get_stats()['recordings']} recording(s) on {server.url}")
+    print(f"   export OPENROUTER_BASE_URL={server.base_urls['openrouter']}")
+    print(f"   export ANTHROPIC_BASE_URL={server.base_urls['anthropic']}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ Demonstrates how to use the DA-Forge system programmatically
 """
 
 import asyncio
-import json
 import os
 import sys
 from datetime import datetime
@@ -14,6 +13,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.team import DAForgeTeam
+from agents.json_codec import format_json
 
 def setup_environment():
     """Setup environment variables for demo"""
@@ -145,7 +145,7 @@ def interactive_mode():
             show_json = input("\n📄 Show generated JSON? (y/n) [n]: ").strip().lower()
             if show_json == 'y' and result.get("workflow_json"):
                 print("\n📄 Generated Workflow JSON:")
-                print(json.dumps(result["workflow_json"], indent=2))
+                print(format_json(result["workflow_json"]))
         
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
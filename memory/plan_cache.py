@@ -0,0 +1,168 @@
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from .short_term import Memory
+from agents.json_codec import dumps, loads
+
+def normalize_input(user_input: str) -> str:
+    """Normalize user input so trivially different prompts share a cache key"""
+    return " ".join(user_input.lower().split())
+
+def make_plan_key(user_input: str, provider: str, model: str, template_version: str) -> str:
+    """Content-addressed key for a plan request"""
+    payload = "\x1f".join([normalize_input(user_input), provider or "", model or "", template_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class PlanCache(Memory):
+    """Two-tier plan cache: in-memory LRU with TTL plus optional SQLite persistence"""
+
+    def __init__(self, max_items: int = 256, ttl_seconds: float = 3600.0, db_path: Optional[str] = None):
+        super().__init__(name="plan_cache")
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "stores": 0
+        }
+        if db_path:
+            self._setup_db()
+
+    def _setup_db(self):
+        """Open the on-disk tier"""
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, plan TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"Plan cache disk tier disabled: {e}")
+            self._db = None
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def store(self, key: str, data: Any) -> bool:
+        """Store a plan under key in both tiers"""
+        try:
+            plan_text = dumps(data)
+            created_at = time.time()
+            with self._lock:
+                self._entries[key] = (plan_text, created_at)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_items:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+                self.stats["stores"] += 1
+                if self._db is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO plans (key, plan, created_at) VALUES (?, ?, ?)",
+                        (key, plan_text, created_at)
+                    )
+                    self._db.commit()
+            return True
+        except Exception as e:
+            print(f"Error storing plan in cache: {e}")
+            return False
+
+    def retrieve(self, key: str) -> Optional[Any]:
+        """Return a fresh copy of the cached plan, or None on miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[1]):
+                    del self._entries[key]
+                    self.stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return loads(entry[0])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT plan, created_at FROM plans WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if self._expired(row[1]):
+                        self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                        self._db.commit()
+                        self.stats["expirations"] += 1
+                    else:
+                        # Promote to the memory tier
+                        self._entries[key] = (row[0], row[1])
+                        while len(self._entries) > self.max_items:
+                            self._entries.popitem(last=False)
+                            self.stats["evictions"] += 1
+                        self.stats["disk_hits"] += 1
+                        return loads(row[0])
+
+            self.stats["misses"] += 1
+            return None
+
+    def delete(self, key: str) -> bool:
+        """Remove a plan from both tiers"""
+        with self._lock:
+            found = self._entries.pop(key, None) is not None
+            if self._db is not None:
+                cursor = self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                self._db.commit()
+                found = found or cursor.rowcount > 0
+            return found
+
+    def exists(self, key: str) -> bool:
+        """Check if a non-expired plan is cached, without touching stats or LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                return True
+            if self._db is not None:
+                row = self._db.execute("SELECT created_at FROM plans WHERE key = ?", (key,)).fetchone()
+                return row is not None and not self._expired(row[0])
+            return False
+
+    def clear_all(self) -> bool:
+        """Clear both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM plans")
+                self._db.commit()
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters and hit ratio"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_ratio": (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0,
+                "memory_items": len(self._entries),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._db is not None
+            }
+
+_default_plan_cache: Optional[PlanCache] = None
+
+def get_default_plan_cache() -> PlanCache:
+    """Process-wide plan cache configured from the environment"""
+    global _default_plan_cache
+    if _default_plan_cache is None:
+        _default_plan_cache = PlanCache(
+            max_items=int(os.getenv("PLAN_CACHE_SIZE", "256")),
+            ttl_seconds=float(os.getenv("PLAN_CACHE_TTL", "3600")),
+            db_path=os.getenv("PLAN_CACHE_PATH") or None
+        )
+    return _default_plan_cache
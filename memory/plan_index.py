@@ -0,0 +1,286 @@
+from typing import Dict, Any, Optional, List, Tuple
+from array import array
+from operator import itemgetter
+import math
+import os
+import re
+import threading
+import zlib
+from .short_term import Memory
+from .plan_cache import normalize_input
+from agents.json_codec import dumps, loads
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset([
+    "a", "an", "the", "and", "or", "to", "of", "on", "in", "into", "for", "from", "with",
+    "by", "at", "as", "is", "are", "be", "it", "its", "this", "that", "these", "those",
+    "when", "whenever", "then", "if", "i", "we", "me", "my", "our", "you", "your",
+    "please", "create", "make", "build", "workflow", "automatically", "new"
+])
+
+# Collapse common rephrasings onto one feature ("send a message" ~ "notify")
+_SYNONYMS = {
+    "send": "notify", "notif": "notify", "alert": "notify", "messag": "notify", "ping": "notify",
+    "fire": "trigger", "trigge": "trigger", "receiv": "trigger", "incomi": "trigger",
+    "save": "store", "write": "store", "insert": "store", "append": "store",
+    "fetch": "read", "get": "read", "pull": "read", "retrie": "read",
+    "mail": "email", "e": "email",
+    "sheet": "sheets", "spread": "sheets",
+}
+
+def _stem(token: str) -> str:
+    """Crude stemmer: drop plural 's' and truncate to six characters"""
+    if not token.isalpha():
+        return token
+    if len(token) > 3 and token.endswith("s"):
+        token = token[:-1]
+    token = token[:6]
+    return _SYNONYMS.get(token, token)
+
+def extract_features(text: str) -> Dict[int, int]:
+    """Hashed stemmed-unigram term counts for a prompt"""
+    counts: Dict[int, int] = {}
+    for token in _TOKEN_RE.findall(normalize_input(text)):
+        if token in _STOPWORDS:
+            continue
+        term = _stem(token)
+        feature = zlib.crc32(term.encode("utf-8"))
+        counts[feature] = counts.get(feature, 0) + 1
+    return counts
+
+# Services and triggers a plan is built around; a stored plan is only reused
+# when the prompt names exactly the same ones ("github webhook" != "webhook")
+_ENTITY_TERMS = (
+    "slack github gitlab jira trello asana notion airtable gmail email outlook sheets excel csv "
+    "discord telegram twitter linkedin instagram youtube tiktok facebook shopify stripe paypal "
+    "woocommerce hubspot salesforce pipedrive zendesk intercom postgres mysql mongodb redis s3 "
+    "dropbox drive calendar zoom twilio sms whatsapp openai webhook rss form cron schedule "
+    "hourly daily weekly monthly"
+).split()
+_ENTITY_FEATURES = frozenset(zlib.crc32(_stem(term).encode("utf-8")) for term in _ENTITY_TERMS)
+
+# The IDF snapshot is refreshed once the live corpus grows by this factor
+_IDF_REFRESH_GROWTH = 1.5
+
+class PlanIndex(Memory):
+    """Local TF-IDF index over past prompts for near-duplicate plan reuse
+
+    Every stored prompt is indexed only under its heaviest features, just
+    enough that the weight left out is below the threshold: by
+    Cauchy-Schwarz a query sharing none of them cannot reach the threshold,
+    so a lookup only scores prompts that share an indexed feature with it.
+
+    Queries and stored prompts are weighted with one IDF snapshot, so scores
+    stay comparable however old an entry is. The snapshot, and every
+    indexed prefix with it, is rebuilt once the corpus has grown by half
+    or more prompts were deleted than are left, so rebuilds cost O(1)
+    amortised per stored prompt.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.8, max_items: int = 100000):
+        super().__init__(name="plan_index")
+        self.similarity_threshold = similarity_threshold
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._prompts: List[str] = []
+        self._plans: List[Optional[str]] = []
+        self._counts: List[Optional[Dict[int, int]]] = []
+        self._norms = array("d")
+        self._by_prompt: Dict[str, int] = {}
+        self._postings: Dict[int, array] = {}
+        self._doc_freq: Dict[int, int] = {}
+        # IDF snapshot taken at the last rebuild; features new since then get the unseen IDF
+        self._idf_table: Dict[int, float] = {}
+        self._idf_unseen = 1.0
+        self._indexed_threshold = similarity_threshold
+        self._rebuild_at = 0
+        self._deleted = 0
+        self.stats = {"lookups": 0, "reuses": 0, "misses": 0, "stored": 0, "rebuilds": 0}
+
+    def __len__(self) -> int:
+        return len(self._by_prompt)
+
+    def _idf(self, feature: int) -> float:
+        return self._idf_table.get(feature, self._idf_unseen)
+
+    def _weights(self, counts: Dict[int, int]) -> Tuple[Dict[int, float], float]:
+        """Sublinear TF-IDF weights under the current snapshot and their norm"""
+        table, unseen = self._idf_table, self._idf_unseen
+        weights = {f: table.get(f, unseen) if c == 1 else (1.0 + math.log(c)) * table.get(f, unseen)
+                   for f, c in counts.items()}
+        return weights, math.sqrt(sum(w * w for w in weights.values())) or 1.0
+
+    def _vectorize(self, counts: Dict[int, int]) -> Dict[int, float]:
+        """Unit-length sublinear TF-IDF vector"""
+        weights, norm = self._weights(counts)
+        return {f: w / norm for f, w in weights.items()}
+
+    def _index_prefix(self, doc_id: int, counts: Dict[int, int]):
+        """Post a prompt under its heaviest features until the rest weighs less than the threshold"""
+        weights, norm = self._weights(counts)
+        self._norms[doc_id] = norm
+        # Squared weights are compared unnormalised; the margin keeps rounding
+        # from dropping a feature the bound needs
+        limit = (self._indexed_threshold ** 2 - 1e-9) * norm * norm
+        remaining_sq = norm * norm
+        postings = self._postings
+        for feature, weight in sorted(weights.items(), key=itemgetter(1), reverse=True):
+            if remaining_sq < limit:
+                break
+            posting = postings.get(feature)
+            if posting is None:
+                posting = postings[feature] = array("i")
+            posting.append(doc_id)
+            remaining_sq -= weight * weight
+
+    def _rebuild(self):
+        """Take a fresh IDF snapshot and re-index every live prompt under it; drops deleted ones"""
+        self._doc_freq = {f: n for f, n in self._doc_freq.items() if n > 0}
+        log_docs = math.log(len(self._by_prompt) + 1) + 1.0
+        self._idf_table = {f: log_docs - math.log(n + 1) for f, n in self._doc_freq.items()}
+        self._idf_unseen = log_docs
+        self._indexed_threshold = self.similarity_threshold
+        self._postings = {}
+        for doc_id, counts in enumerate(self._counts):
+            if counts is None:
+                continue
+            if self._plans[doc_id] is None:
+                self._counts[doc_id] = None
+                continue
+            self._index_prefix(doc_id, counts)
+        self._deleted = 0
+        self._rebuild_at = int(len(self._by_prompt) * _IDF_REFRESH_GROWTH) + 1
+        self.stats["rebuilds"] += 1
+
+    def store(self, key: str, data: Any) -> bool:
+        """Index a prompt together with the plan it produced"""
+        try:
+            normalized = normalize_input(key)
+            counts = extract_features(normalized)
+            if not counts:
+                return False
+            plan_text = dumps(data)
+            with self._lock:
+                existing = self._by_prompt.get(normalized)
+                if existing is not None:
+                    self._plans[existing] = plan_text
+                    return True
+                if len(self._by_prompt) >= self.max_items:
+                    return False
+
+                doc_id = len(self._prompts)
+                for feature in counts:
+                    self._doc_freq[feature] = self._doc_freq.get(feature, 0) + 1
+                self._prompts.append(normalized)
+                self._plans.append(plan_text)
+                self._counts.append(counts)
+                self._norms.append(1.0)
+                self._by_prompt[normalized] = doc_id
+                self.stats["stored"] += 1
+                if len(self._by_prompt) > self._rebuild_at:
+                    self._rebuild()
+                else:
+                    self._index_prefix(doc_id, counts)
+            return True
+        except Exception as e:
+            print(f"Error indexing plan: {e}")
+            return False
+
+    def search(self, query: str) -> Optional[Tuple[float, int]]:
+        """Return (similarity, doc_id) of the best live stored prompt at or above the threshold"""
+        counts = extract_features(query)
+        if not counts or not self._by_prompt:
+            return None
+        if self.similarity_threshold < self._indexed_threshold:
+            # Prefixes were cut for a higher threshold and would miss matches
+            self._rebuild()
+
+        query_vector = self._vectorize(counts)
+        candidates = set()
+        for feature in query_vector:
+            postings = self._postings.get(feature)
+            if postings is not None:
+                candidates.update(postings)
+        if not candidates:
+            return None
+
+        query_entities = _ENTITY_FEATURES.intersection(counts)
+        best_score, best_id = self.similarity_threshold, -1
+        for doc_id in candidates:
+            if self._plans[doc_id] is None:
+                continue
+            doc_counts = self._counts[doc_id]
+            score = 0.0
+            for feature, weight in query_vector.items():
+                count = doc_counts.get(feature)
+                if count:
+                    score += weight * (1.0 + math.log(count)) * self._idf(feature)
+            score /= self._norms[doc_id]
+            if score >= best_score and _ENTITY_FEATURES.intersection(doc_counts) == query_entities:
+                best_score, best_id = score, doc_id
+        if best_id < 0:
+            return None
+        return best_score, best_id
+
+    def retrieve(self, key: str) -> Optional[Any]:
+        """Return a copy of the most similar stored plan, or None"""
+        match = self.lookup(key)
+        return match["plan"] if match else None
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Find a reusable plan and report which prompt it came from"""
+        with self._lock:
+            self.stats["lookups"] += 1
+            match = self.search(query)
+            if match is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["reuses"] += 1
+            score, doc_id = match
+            return {
+                "plan": loads(self._plans[doc_id]),
+                "similarity": round(score, 4),
+                "matched_prompt": self._prompts[doc_id]
+            }
+
+    def delete(self, key: str) -> bool:
+        """Forget the plan stored for an exact prompt"""
+        with self._lock:
+            doc_id = self._by_prompt.pop(normalize_input(key), None)
+            if doc_id is None:
+                return False
+            # Postings are append-only; a tombstoned plan is skipped at lookup time
+            # and dropped by the next rebuild
+            self._plans[doc_id] = None
+            for feature in self._counts[doc_id]:
+                self._doc_freq[feature] -= 1
+            self._deleted += 1
+            if self._deleted > len(self._by_prompt):
+                self._rebuild()
+            return True
+
+    def exists(self, key: str) -> bool:
+        """Check if an exact prompt is indexed"""
+        return normalize_input(key) in self._by_prompt
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and reuse counters"""
+        return {
+            **self.stats,
+            "items": len(self._by_prompt),
+            "features": len(self._doc_freq),
+            "indexed_postings": sum(len(p) for p in self._postings.values()),
+            "similarity_threshold": self.similarity_threshold
+        }
+
+_default_plan_index: Optional[PlanIndex] = None
+
+def get_default_plan_index() -> PlanIndex:
+    """Process-wide plan index configured from the environment"""
+    global _default_plan_index
+    if _default_plan_index is None:
+        _default_plan_index = PlanIndex(
+            similarity_threshold=float(os.getenv("PLAN_SIMILARITY_THRESHOLD", "0.8"))
+        )
+    return _default_plan_index
@@ -0,0 +1,48 @@
+import asyncio
+import gc
+
+from agents.client_pool import LLMClientPool
+
+BASE_URL = "http://127.0.0.1:9/v1"
+
+def test_pool_size_stays_flat_across_asyncio_run():
+    pool = LLMClientPool()
+    clients = []
+
+    async def use_pool():
+        client = pool.openai_client("test-key", BASE_URL)
+        assert pool.openai_client("test-key", BASE_URL) is client
+        pool.anthropic_client("test-key", BASE_URL)
+        clients.append(client)
+
+    for _ in range(5):
+        asyncio.run(use_pool())
+        gc.collect()
+        stats = pool.get_stats()
+        assert stats["event_loops"] == 0
+        assert stats["clients"] == 0
+
+    assert pool.stats == {"created": 10, "reused": 5}
+    assert all(client.is_closed() for client in clients)
+
+def test_clients_are_reused_within_one_loop():
+    pool = LLMClientPool()
+
+    async def use_pool():
+        first = pool.openai_client("test-key", BASE_URL)
+        await asyncio.sleep(0)
+        assert pool.openai_client("test-key", BASE_URL) is first
+        assert pool.get_stats()["clients"] == 1
+
+    asyncio.run(use_pool())
+
+def test_loop_closed_without_shutdown_is_evicted():
+    pool = LLMClientPool()
+
+    async def use_pool():
+        pool.openai_client("test-key", BASE_URL)
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(use_pool())
+    loop.close()
+    assert pool.get_stats()["event_loops"] == 0
@@ -0,0 +1,57 @@
+import asyncio
+
+from aiohttp import web
+
+from agents.json_codec import JSONCodec, get_default_json_codec, set_default_json_codec
+from tools.deploy_tool import DeployTool
+
+class CountingCodec(JSONCodec):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def dumps(self, obj):
+        self.calls.append("dumps")
+        return super().dumps(obj)
+
+    def loads(self, data):
+        self.calls.append("loads")
+        return super().loads(data)
+
+def test_deploy_hop_uses_configured_codec(monkeypatch):
+    received = []
+
+    async def create(request):
+        received.append(await request.json())
+        return web.json_response({"id": "wf-1"}, status=201)
+
+    async def activate(request):
+        return web.json_response({"active": True})
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/api/v1/workflows", create)
+        app.router.add_post("/api/v1/workflows/{id}/activate", activate)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setenv("N8N_BASE_URL", f"http://127.0.0.1:{port}")
+        monkeypatch.setenv("N8N_API_KEY", "test")
+        monkeypatch.setenv("MOCK_DEPLOYMENT", "false")
+        try:
+            return await DeployTool().deploy_workflow({"name": "Deployed", "nodes": []})
+        finally:
+            await runner.cleanup()
+
+    codec = CountingCodec()
+    previous = get_default_json_codec()
+    set_default_json_codec(codec)
+    try:
+        result = asyncio.run(run())
+    finally:
+        set_default_json_codec(previous)
+    assert result["success"] and result["workflow_id"] == "wf-1"
+    assert received == [{"name": "Deployed", "nodes": []}]
+    assert codec.calls == ["dumps", "loads"]
@@ -0,0 +1,71 @@
+import asyncio
+
+from agents.hedging import HedgedProvider, create_hedged_provider
+from agents.llm_providers import FakeProvider
+from agents.llm_usage import LLMUsage
+from agents.provider_router import CircuitBreaker, ProviderHealthRegistry, ProviderRouter
+
+class LateUsageProvider(FakeProvider):
+    """Slow provider that reports usage even when its request is cancelled"""
+
+    async def complete(self, prompt, max_tokens=2000, temperature=0.3, system=None, usage=None, tier=None):
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            if usage is not None:
+                usage.record(self.name, self.model, input_tokens=999, output_tokens=999)
+        return "{}"
+
+class BrokenProvider(FakeProvider):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.call_count = 0
+
+    async def complete(self, prompt, max_tokens=2000, temperature=0.3, system=None, usage=None, tier=None):
+        self.call_count += 1
+        raise ConnectionError("provider is down")
+
+def test_losing_request_does_not_overwrite_winner_usage():
+    primary = LateUsageProvider(name="openrouter", latency=1.0)
+    secondary = FakeProvider(name="anthropic", latency=0.01)
+    hedged = HedgedProvider(primary, secondary, initial_delay=0.01)
+    usage = LLMUsage()
+    asyncio.run(hedged.complete("Send a daily report", usage=usage))
+    assert hedged.stats["secondary_wins"] == 1
+    assert usage.provider == "anthropic"
+    assert usage.output_tokens not in (0, 999)
+
+def test_streamed_usage_comes_from_winner():
+    primary = FakeProvider(name="openrouter", latency=1.0)
+    secondary = FakeProvider(name="anthropic", latency=0.01)
+    hedged = HedgedProvider(primary, secondary, initial_delay=0.01)
+    usage = LLMUsage()
+
+    async def consume():
+        return "".join([chunk async for chunk in hedged.stream("Send a daily report", usage=usage)])
+
+    asyncio.run(consume())
+    assert usage.provider == "anthropic"
+    assert usage.output_tokens > 0
+
+def test_open_circuit_skips_broken_side_of_hedge():
+    health = ProviderHealthRegistry(failure_threshold=2, reset_timeout=60)
+    broken = BrokenProvider(name="openrouter")
+    healthy = FakeProvider(name="anthropic", latency=0.0)
+    hedged = HedgedProvider(ProviderRouter([broken], health), ProviderRouter([healthy], health), initial_delay=1.0)
+
+    async def requests():
+        for _ in range(5):
+            await hedged.complete("Send a daily report")
+
+    asyncio.run(requests())
+    assert broken.call_count == 2
+    assert health.get_stats()["openrouter/fake-model"]["state"] == CircuitBreaker.OPEN
+
+def test_hedged_provider_routes_each_side(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    hedged = create_hedged_provider("openrouter")
+    assert isinstance(hedged.primary, ProviderRouter)
+    assert isinstance(hedged.secondary, ProviderRouter)
+    assert hedged.primary.name == "openrouter"
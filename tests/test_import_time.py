@@ -0,0 +1,12 @@
+import os
+
+from examples.check_import_time import loaded_deferred_modules, measure_import
+
+def test_team_import_stays_within_budget():
+    budget_ms = float(os.getenv("IMPORT_TIME_BUDGET_MS", "300"))
+    # Best of a few runs, as the script does, so one slow run does not fail it
+    total_us = min(measure_import("agents.team")[0] for _ in range(3))
+    assert total_us / 1000 <= budget_ms
+
+def test_building_a_team_leaves_heavy_sdks_unloaded():
+    assert loaded_deferred_modules("agents.team") == []
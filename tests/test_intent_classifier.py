@@ -0,0 +1,24 @@
+from agents.intent_classifier import IntentClassifier
+
+def test_keywords_match_words_and_their_endings():
+    classifier = IntentClassifier()
+    assert classifier.classify("Send email notifications when payments fail") == [
+        ("email", 4.0), ("ecommerce", 3.0)
+    ]
+    assert classifier.classify("rapid prototype") == []
+
+def test_multi_word_keywords_match_consecutive_words():
+    classifier = IntentClassifier()
+    assert classifier.top_intent("Build an e-commerce pipeline") == "ecommerce"
+    assert classifier.top_intent("Share clips on social media") == "social_media"
+    assert classifier.top_intent("Share clips on social channels") == "social_media"
+    assert classifier.classify("Share media on social") == []
+
+def test_ranking_prefers_score_then_category_order():
+    classifier = IntentClassifier()
+    # "api" counts for webhook and api_integration; GitHub outweighs it
+    assert classifier.top_intent("Integrate the GitHub API") == "api_integration"
+    # Equal scores keep the configured category order
+    assert classifier.classify("post the api") == [("webhook", 1.0), ("social_media", 1.0), ("api_integration", 1.0)]
+    assert classifier.top_intent("post the api") == "webhook"
+    assert classifier.top_intent("nothing to see here") is None
@@ -0,0 +1,39 @@
+from memory.plan_index import PlanIndex
+
+def filled_index(**kwargs) -> PlanIndex:
+    index = PlanIndex(**kwargs)
+    index.store("send a Slack message when a webhook fires", {"workflow_name": "Webhook to Slack"})
+    index.store("save new gmail attachments to dropbox", {"workflow_name": "Gmail to Dropbox"})
+    index.store("post new rss feed items to discord", {"workflow_name": "RSS to Discord"})
+    return index
+
+def test_rephrased_prompt_reuses_plan():
+    match = filled_index().lookup("notify slack when a webhook is received")
+    assert match["plan"] == {"workflow_name": "Webhook to Slack"}
+
+def test_prompt_naming_another_service_is_not_reused():
+    index = filled_index()
+    assert index.lookup("send a Slack message when a github webhook fires") is None
+    assert index.lookup("send a Discord message when a webhook fires") is None
+
+def test_deleted_best_match_falls_back_to_live_prompt():
+    index = filled_index()
+    index.store("send a Slack message whenever a webhook fires", {"workflow_name": "Second"})
+    index.delete("send a Slack message when a webhook fires")
+    match = index.lookup("send a Slack message when a webhook fires")
+    assert match["plan"] == {"workflow_name": "Second"}
+
+def test_old_entries_score_like_new_ones():
+    index = filled_index()
+    for i in range(300):
+        index.store(f"send a slack message with report {i}", {"workflow_name": f"Report {i}"})
+    assert index.stats["rebuilds"] > 1
+    # Stored first, scored under the same IDF snapshot as the query
+    assert index.lookup("send a Slack message when a webhook fires")["similarity"] == 1.0
+    assert index.lookup("send a slack message with report 299")["similarity"] == 1.0
+
+def test_lowering_threshold_after_indexing_finds_weaker_matches():
+    index = filled_index(similarity_threshold=0.99)
+    assert index.lookup("post rss feed items to discord every day") is None
+    index.similarity_threshold = 0.5
+    assert index.lookup("post rss feed items to discord every day")["plan"] == {"workflow_name": "RSS to Discord"}
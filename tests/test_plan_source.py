@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from agents.llm_providers import FakeProvider
+from agents.team import DAForgeTeam
+from memory.plan_cache import PlanCache
+from memory.plan_index import PlanIndex
+
+def fast_team(provider) -> DAForgeTeam:
+    team = DAForgeTeam(provider=provider)
+    team.planner_agent.plan_cache = PlanCache()
+    team.planner_agent.plan_index = PlanIndex()
+
+    async def deploy_workflow(workflow_data):
+        return {"success": True, "workflow_id": "wf"}
+
+    team.deploy_tool.deploy_workflow = deploy_workflow
+    return team
+
+def plan_sources(team: DAForgeTeam, prompts, **options) -> list:
+    async def run():
+        return [(await team.execute_workflow_generation(prompt, **options))["execution_summary"]["plan_source"]
+                for prompt in prompts]
+
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("options", [{}, {"stream_planning": True}, {"pipelined": True}, {"deadline": 5.0}])
+def test_summary_reports_where_the_plan_came_from(options):
+    team = fast_team(FakeProvider(latency=0.0))
+    prompts = ["Send a Slack message when a webhook fires", "Send a Slack message when a webhook fires",
+               "Notify Slack when a webhook is received"]
+    assert plan_sources(team, prompts, **options) == ["llm", "cache", "similar"]
+
+def test_summary_reports_fallback_without_provider():
+    team = fast_team(None)
+    team.planner_agent.provider = None
+    assert plan_sources(team, ["Send a Slack message when a webhook fires"]) == ["fallback"]
+    assert plan_sources(team, ["Send a Slack message when a webhook fires"], stream_planning=True) == ["fallback"]
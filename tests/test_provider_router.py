@@ -0,0 +1,27 @@
+import asyncio
+
+from agents.llm_providers import FakeProvider
+from agents.provider_router import ProviderHealthRegistry, ProviderRouter
+
+def test_primary_keeps_traffic_after_one_successful_call():
+    primary = FakeProvider(name="openrouter", latency=0.01)
+    failover = FakeProvider(name="anthropic", latency=0.0)
+    health = ProviderHealthRegistry()
+    router = ProviderRouter([primary, failover], health)
+
+    async def requests():
+        for _ in range(3):
+            await router.complete("Send a daily report")
+
+    asyncio.run(requests())
+    assert primary.call_count == 3
+    assert failover.call_count == 0
+    assert health.rank([primary, failover]) == [primary, failover]
+
+def test_failing_primary_is_ranked_after_failover():
+    primary = FakeProvider(name="openrouter", latency=0.0)
+    failover = FakeProvider(name="anthropic", latency=0.0)
+    health = ProviderHealthRegistry()
+    health.record(primary, False, 0.1)
+    health.record(failover, True, 0.1)
+    assert health.rank([primary, failover]) == [failover, primary]
@@ -0,0 +1,17 @@
+import asyncio
+
+from agents.llm_providers import FakeProvider
+from agents.planner_agent import PlannerAgent
+from memory.plan_cache import PlanCache
+from memory.plan_index import PlanIndex
+
+def test_replan_reuses_similar_plan_without_llm():
+    provider = FakeProvider(latency=0.0)
+    planner = PlannerAgent(provider=provider, plan_cache=PlanCache(), plan_index=PlanIndex())
+    planner.plan_index.store("send a Slack message when a webhook fires", {"workflow_name": "Webhook to Slack"})
+    plan = asyncio.run(planner.replan_workflow(
+        "notify slack when a webhook is received", "send a Slack message every day", {"nodes": []}
+    ))
+    assert provider.call_count == 0
+    assert plan["workflow_name"] == "Webhook to Slack"
+    assert plan["reused_from"]["prompt"] == "send a slack message when a webhook fires"
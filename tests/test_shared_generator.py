@@ -0,0 +1,73 @@
+import asyncio
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.workflow_generator import WorkflowGenerator
+
+def random_plan(index: int, rng: random.Random) -> dict:
+    """A branching plan; every plan reuses the same node IDs, so a call wired
+    through another call's ID mapping points outside its own workflow"""
+    count = rng.randint(2, 30)
+    nodes = [{"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "name": "Trigger"}]
+    nodes += [{"id": f"step_{i}", "type": "n8n-nodes-base.code", "name": f"Step {i}",
+               "parameters": {"jsCode": f"return items; // {index}"}} for i in range(1, count)]
+    connections = [{"from": nodes[rng.randrange(i)]["id"], "to": nodes[i]["id"]} for i in range(1, count)]
+    return {"workflow_name": f"Plan {index}", "nodes": nodes, "connections": connections}
+
+def shape(result: dict) -> tuple:
+    """The generated workflow without its random IDs: nodes and connections by node name"""
+    workflow = result["workflow_data"]
+    names = {node["id"]: node["name"] for node in workflow["nodes"]}
+    nodes = [(node["name"], node["type"], node["position"], node["parameters"]) for node in workflow["nodes"]]
+    connections = {
+        names.get(source, source): [[(names.get(target["node"], target["node"]), target["index"])
+                                     for target in output] for output in outputs["main"]]
+        for source, outputs in workflow["connections"].items()
+    }
+    return workflow["name"], nodes, connections, result["connection_count"]
+
+async def generate(generator: WorkflowGenerator, plan: dict, streamed: bool) -> tuple:
+    if not streamed:
+        await asyncio.sleep(0)
+        return shape(await generator.generate_workflow(plan))
+
+    async def events():
+        for node in plan["nodes"]:
+            yield {"type": "node", "node": node}
+            await asyncio.sleep(0)
+        for connection in plan["connections"]:
+            yield {"type": "connection", "connection": connection}
+            await asyncio.sleep(0)
+        yield {"type": "plan", "plan": plan}
+
+    return shape(await generator.generate_workflow_stream(events()))
+
+def test_interleaved_generations_match_single_threaded_runs():
+    rng = random.Random(5)
+    plans = [random_plan(index, rng) for index in range(16)]
+    jobs = [(index % len(plans), bool(index % 2)) for index in range(320)]
+
+    async def run(generator: WorkflowGenerator, part: list) -> list:
+        return await asyncio.gather(*(generate(generator, plans[plan], streamed) for plan, streamed in part))
+
+    # Expected output of every (plan, mode), each generated alone on its own generator
+    expected = {(plan, streamed): asyncio.run(run(WorkflowGenerator(), [(plan, streamed)]))[0]
+                for plan in range(len(plans)) for streamed in (False, True)}
+
+    # One shared generator; tasks interleave within each thread, and frequent
+    # switches interleave the threads inside generation calls
+    shared = WorkflowGenerator()
+    threads = 4
+    parts = [jobs[i::threads] for i in range(threads)]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outputs = list(pool.map(lambda part: asyncio.run(run(shared, part)), parts))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    for thread, (part, output) in enumerate(zip(parts, outputs)):
+        for job, generated in zip(part, output):
+            assert generated == expected[job], f"thread {thread}: plan {job[0]} (streamed={job[1]}) differs"
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from agents.llm_providers import FakeProvider
+from agents.team import DAForgeTeam
+from memory.plan_cache import PlanCache
+
+PROMPT = "Post new Jira issues to a Slack channel"
+
+def slow_team() -> DAForgeTeam:
+    team = DAForgeTeam(provider=FakeProvider(latency=0.3, chunk_size=40, token_latency=0.001))
+    team.planner_agent.plan_cache = PlanCache()
+    team.planner_agent.plan_index = None
+    return team
+
+@pytest.mark.parametrize("mode", [{}, {"stream_planning": True}, {"pipelined": True}])
+def test_late_llm_plan_only_plans_in_background(mode):
+    team = slow_team()
+    progress = []
+    team.set_progress_callback(lambda stage, message: progress.append(message))
+    generated = []
+    generate_workflow = team.workflow_generator.generate_workflow
+
+    async def counting_generate_workflow(plan_data):
+        generated.append(plan_data)
+        return await generate_workflow(plan_data)
+
+    team.workflow_generator.generate_workflow = counting_generate_workflow
+
+    async def run():
+        plan_data, _ = await team._plan_with_deadline(
+            PROMPT, 0.05, mode.get("stream_planning", False), mode.get("pipelined", False), True
+        )
+        reported = len(progress)
+        assert plan_data["plan_source"] == "speculative"
+        assert len(team._background_tasks) == 1
+        await asyncio.gather(*team._background_tasks)
+        return reported
+
+    reported = asyncio.run(run())
+    # Only the speculative workflow was generated, and the background plan stayed quiet
+    assert len(generated) == 1
+    assert len(progress) == reported
+    assert team.planner_agent.plan_cache.retrieve(team.planner_agent._plan_key(PROMPT)) is not None
+
+def test_late_llm_plan_is_cancelled_without_upgrade_cache():
+    team = slow_team()
+
+    async def run():
+        await team._plan_with_deadline(PROMPT, 0.05, False, False, False)
+        assert not team._background_tasks
+        await asyncio.sleep(0.4)
+
+    asyncio.run(run())
+    assert team.planner_agent.plan_cache.retrieve(team.planner_agent._plan_key(PROMPT)) is None
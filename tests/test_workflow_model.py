@@ -0,0 +1,43 @@
+import copy
+
+from tools.workflow_model import MISSING, Plan, Workflow
+
+def test_plan_round_trip_keeps_absent_and_empty_keys():
+    plan = {
+        "workflow_name": "Webhook to Slack",
+        "description": "Notify Slack",
+        "nodes": [
+            {"type": "webhook", "name": "Webhook"},
+            {"id": "slack", "type": "slack", "parameters": {}},
+            {"id": "log", "parameters": {"level": "info"}, "retries": 2, "name": None},
+        ],
+        "connections": [{"from": "webhook", "to": "slack"}, {"from": "slack", "to": "log", "output_index": 1}],
+    }
+    model = Plan.from_dict(copy.deepcopy(plan))
+    assert model.nodes[0].id is MISSING
+    assert model.to_dict() == plan
+    # Each empty dict is a fresh object, not the one shared by the nodes
+    assert model.to_dict()["nodes"][1]["parameters"] is not model.to_dict()["nodes"][1]["parameters"]
+
+def test_workflow_nodes_round_trip_exactly():
+    workflow = {
+        "name": "Webhook to Slack",
+        "nodes": [
+            {"id": "1", "name": "Webhook", "type": "n8n-nodes-base.webhook"},
+            {"id": "2", "name": "Slack", "type": "n8n-nodes-base.slack", "typeVersion": 2,
+             "position": [450, 300], "parameters": {}, "executeOnce": None},
+            {"name": "Note", "type": "n8n-nodes-base.stickyNote", "position": {"x": 1}, "notes": "odd"},
+        ],
+        "connections": {"1": {"main": [[{"node": "2", "type": "main", "index": 0}]]}},
+    }
+    assert Workflow.from_n8n(copy.deepcopy(workflow)).to_n8n() == workflow
+
+def test_workflow_connections_come_back_in_n8n_form():
+    workflow = {
+        "nodes": [{"id": "1"}, {"id": "2"}],
+        "connections": {"1": {"main": [[{"node": "gone", "type": "main", "index": 0}, {"node": "2"}]]}},
+    }
+    assert Workflow.from_n8n(workflow).to_n8n()["connections"] == {
+        "1": {"main": [[{"node": "2", "type": "main", "index": 0}, {"node": "gone", "type": "main", "index": 0}]]}
+    }
+    assert Workflow.from_n8n({}).to_n8n() == {"nodes": [], "connections": {}}
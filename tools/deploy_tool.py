@@ -1,6 +1,4 @@
-from typing import Dict, Any
-import json
-import aiohttp
+from typing import Dict, Any, TYPE_CHECKING
 import asyncio
 import os
 from datetime import datetime
@@ -8,6 +6,10 @@ from datetime import datetime
 from typing import Dict, Any
 from abc import ABC, abstractmethod
 from datetime import datetime
+from agents.json_codec import dumps, loads
+
+if TYPE_CHECKING:
+    import aiohttp
 
 class Tool(ABC):
     def __init__(self, name: str):
@@ -49,7 +51,10 @@ class DeployTool(Tool):
             "X-N8N-API-KEY": self.n8n_api_key
         }
         
-        async with aiohttp.ClientSession() as session:
+        # Imported here so mock deployments never load aiohttp
+        import aiohttp
+        # Request and response bodies go through the configured JSON codec
+        async with aiohttp.ClientSession(json_serialize=dumps) as session:
             # Create workflow
             create_url = f"{self.n8n_base_url}/api/v1/workflows"
             
@@ -61,7 +66,7 @@ class DeployTool(Tool):
             ) as response:
                 
                 if response.status == 201:
-                    result = await response.json()
+                    result = loads(await response.text())
                     workflow_id = result.get("id")
                     
                     # Activate workflow if it has a trigger
@@ -84,7 +89,7 @@ class DeployTool(Tool):
                         "timestamp": datetime.now().isoformat()
                     }
     
-    async def _activate_workflow(self, session: aiohttp.ClientSession, workflow_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    async def _activate_workflow(self, session: "aiohttp.ClientSession", workflow_id: str, headers: Dict[str, str]) -> Dict[str, Any]:
         """Activate workflow if it has triggers"""
         try:
             activate_url = f"{self.n8n_base_url}/api/v1/workflows/{workflow_id}/activate"
@@ -163,12 +168,13 @@ class DeployTool(Tool):
                 "X-N8N-API-KEY": self.n8n_api_key
             }
             
-            async with aiohttp.ClientSession() as session:
+            import aiohttp
+            async with aiohttp.ClientSession(json_serialize=dumps) as session:
                 status_url = f"{self.n8n_base_url}/api/v1/workflows/{workflow_id}"
                 
                 async with session.get(status_url, headers=headers, timeout=10) as response:
                     if response.status == 200:
-                        result = await response.json()
+                        result = loads(await response.text())
                         return {
                             "success": True,
                             "workflow_data": result,
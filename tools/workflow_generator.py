@@ -1,7 +1,8 @@
-from typing import Dict, Any, List
-import json
+from typing import Dict, Any, List, Optional, AsyncIterator
 import uuid
 from datetime import datetime
+from .workflow_graph import WorkflowGraph
+from .workflow_layout import apply_layout
 # Mock ADK Classes
 from typing import Dict, Any, List
 from abc import ABC, abstractmethod
@@ -17,17 +18,47 @@ class Tool(ABC):
     async def run(self, input_data: Any) -> Any:
         pass
 
-class WorkflowGenerator(Tool):
+class _GenerationContext:
+    """State of one generation call, kept off the generator so a shared
+    instance can serve concurrent tasks and threads"""
+    __slots__ = ("workflow_id", "nodes", "node_id_mapping", "connections", "pending_connections", "warnings")
+
     def __init__(self):
+        self.workflow_id = str(uuid.uuid4())
+        self.nodes: List[Dict[str, Any]] = []
+        # Plan node IDs to generated n8n node IDs, used to wire connections
+        self.node_id_mapping: Dict[str, str] = {}
+        self.connections: Dict[str, Any] = {}
+        self.pending_connections: List[Dict[str, Any]] = []
+        self.warnings: List[str] = []
+
+    def reset(self):
+        self.nodes.clear()
+        self.node_id_mapping.clear()
+        self.connections.clear()
+        self.pending_connections.clear()
+        self.warnings.clear()
+
+class WorkflowGenerator(Tool):
+    """Builds n8n workflow JSON from plans
+
+    The generator holds no per-call state: every generate_workflow or
+    generate_workflow_stream call works on its own _GenerationContext, so
+    one instance can be shared across async tasks and worker threads.
+    """
+
+    def __init__(self, auto_layout: bool = True):
         super().__init__(name="workflow_generator")
         self.description = "Generates complete n8n workflow JSON from plan"
+        # Place nodes with the layered layout instead of plan/LLM positions
+        self.auto_layout = auto_layout
     
     async def generate_workflow(self, plan_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate complete n8n workflow JSON"""
         try:
             print(f"DEBUG: Workflow generator received plan: {plan_data}")
             
-            workflow_id = str(uuid.uuid4())
+            context = _GenerationContext()
             
             # Extract plan details with safety checks
             nodes = plan_data.get("nodes", [])
@@ -37,54 +68,127 @@ class WorkflowGenerator(Tool):
             print(f"DEBUG: Extracted - nodes: {len(nodes)}, connections: {len(connections)}, name: {workflow_name}")
             
             # Generate nodes first (this creates the ID mapping)
-            generated_nodes = self._generate_nodes(nodes)
+            self._generate_nodes(nodes, context)
             
             # Generate connections using the ID mapping
-            generated_connections = self._generate_connections(connections)
+            self._generate_connections(connections, context)
+            
+            return self._finalize_workflow(context.workflow_id, workflow_name, context.nodes, context.connections)
             
-            # Generate n8n compatible workflow
-            n8n_workflow = {
-                "id": workflow_id,
-                "name": workflow_name,
-                "active": False,
-                "nodes": generated_nodes,
-                "connections": generated_connections,
-                "createdAt": datetime.now().isoformat(),
-                "updatedAt": datetime.now().isoformat(),
-                "settings": {
-                    "saveManualExecutions": True,
-                    "callerPolicy": "workflowsFromSameOwner"
-                },
-                "staticData": {},
-                "tags": ["da-forge", "auto-generated"],
-                "triggerCount": 0,
-                "versionId": str(uuid.uuid4())
+        except Exception as e:
+            error_msg = f"Workflow generation exception: {str(e)}"
+            print(f"DEBUG ERROR: {error_msg}")
+            import traceback
+            traceback.print_exc()
+            return {
+                "success": False,
+                "error": error_msg,
+                "workflow_data": None
             }
+    
+    def _finalize_workflow(self, workflow_id: str, workflow_name: str, generated_nodes: List[Dict[str, Any]],
+                           generated_connections: Dict[str, Any], warnings: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Assemble, validate and wrap the n8n workflow"""
+        # Generate n8n compatible workflow
+        n8n_workflow = {
+            "id": workflow_id,
+            "name": workflow_name,
+            "active": False,
+            "nodes": generated_nodes,
+            "connections": generated_connections,
+            "createdAt": datetime.now().isoformat(),
+            "updatedAt": datetime.now().isoformat(),
+            "settings": {
+                "saveManualExecutions": True,
+                "callerPolicy": "workflowsFromSameOwner"
+            },
+            "staticData": {},
+            "tags": ["da-forge", "auto-generated"],
+            "triggerCount": 0,
+            "versionId": str(uuid.uuid4())
+        }
+        
+        print(f"DEBUG: Generated n8n workflow with {len(n8n_workflow['nodes'])} nodes")
+        
+        # One graph index and topological order serve both layout and validation
+        graph = WorkflowGraph(generated_nodes, generated_connections)
+        topology = graph.topological_order()
+        if self.auto_layout:
+            apply_layout(generated_nodes, graph, topology[0])
+        
+        # Validate workflow
+        validation_result = self._validate_workflow(n8n_workflow, graph, topology)
+        if warnings:
+            validation_result["warnings"] = warnings + validation_result["warnings"]
+        print(f"DEBUG: Validation result: {validation_result}")
+        
+        if not validation_result["valid"]:
+            # Join all validation errors
+            error_messages = validation_result.get("errors", ["Unknown validation error"])
+            error_msg = f"Workflow validation failed: {'; '.join(error_messages)}"
+            print(f"DEBUG: {error_msg}")
+            # Don't fail on validation - just warn and continue
+            print("DEBUG: Continuing despite validation warnings...")
+        
+        result = {
+            "success": True,
+            "workflow_data": n8n_workflow,
+            "workflow_id": workflow_id,
+            "node_count": len(n8n_workflow["nodes"]),
+            "connection_count": len(generated_connections),
+            "validation": validation_result
+        }
+        print(f"DEBUG: Workflow generation successful: {result}")
+        return result
+    
+    async def generate_workflow_stream(self, plan_events: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """Generate n8n workflow JSON incrementally from a plan event stream
+        
+        Consumes the events produced by PlannerAgent.plan_workflow_stream: nodes
+        are built and checked as they arrive, connections are wired as soon as
+        both endpoints exist, and the workflow is finalized on the "plan" event.
+        """
+        try:
+            context = _GenerationContext()
+            plan_data: Dict[str, Any] = {}
             
-            print(f"DEBUG: Generated n8n workflow with {len(n8n_workflow['nodes'])} nodes")
+            async for event in plan_events:
+                event_type = event.get("type")
+                if event_type == "node":
+                    node = event["node"]
+                    plan_id = node.get("id", f"node_{len(context.nodes)}")
+                    if plan_id in context.node_id_mapping:
+                        context.warnings.append(f"Duplicate plan node ID: {plan_id}")
+                    if not node.get("type"):
+                        context.warnings.append(f"Plan node {plan_id} has no type, using noOp")
+                    n8n_node = self._build_node(node, len(context.nodes))
+                    context.node_id_mapping[plan_id] = n8n_node["id"]
+                    context.nodes.append(n8n_node)
+                elif event_type == "connection":
+                    connection = event["connection"]
+                    if connection.get("from") in context.node_id_mapping and connection.get("to") in context.node_id_mapping:
+                        self._add_connection(context.connections, connection, context.node_id_mapping)
+                    else:
+                        context.pending_connections.append(connection)
+                elif event_type == "reset":
+                    context.reset()
+                elif event_type == "plan":
+                    plan_data = event.get("plan", {})
             
-            # Validate workflow
-            validation_result = self._validate_workflow(n8n_workflow)
-            print(f"DEBUG: Validation result: {validation_result}")
+            # Connections whose endpoints arrived later (or never) are wired last
+            for connection in context.pending_connections:
+                self._add_connection(context.connections, connection, context.node_id_mapping)
             
-            if not validation_result["valid"]:
-                # Join all validation errors
-                error_messages = validation_result.get("errors", ["Unknown validation error"])
-                error_msg = f"Workflow validation failed: {'; '.join(error_messages)}"
-                print(f"DEBUG: {error_msg}")
-                # Don't fail on validation - just warn and continue
-                print("DEBUG: Continuing despite validation warnings...")
+            if not context.nodes:
+                self._add_default_trigger(context)
             
-            result = {
-                "success": True,
-                "workflow_data": n8n_workflow,
-                "workflow_id": workflow_id,
-                "node_count": len(n8n_workflow["nodes"]),
-                "connection_count": len(generated_connections),
-                "validation": validation_result
-            }
-            print(f"DEBUG: Workflow generation successful: {result}")
-            return result
+            return self._finalize_workflow(
+                context.workflow_id,
+                plan_data.get("workflow_name", "Generated Workflow"),
+                context.nodes,
+                context.connections,
+                context.warnings
+            )
             
         except Exception as e:
             error_msg = f"Workflow generation exception: {str(e)}"
@@ -97,104 +201,113 @@ class WorkflowGenerator(Tool):
                 "workflow_data": None
             }
     
-    def _generate_nodes(self, plan_nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Generate n8n compatible nodes"""
-        n8n_nodes = []
+    def _build_node(self, node: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Build one n8n node from a plan node"""
+        n8n_node = {
+            "id": str(uuid.uuid4()),
+            "name": node.get("name", f"Node {index+1}"),
+            "type": node.get("type", "n8n-nodes-base.noOp"),
+            "typeVersion": 1,
+            "position": node.get("position", [250 + (index * 200), 300]),
+            "parameters": node.get("parameters", {}),
+            "executeOnce": False
+        }
         
-        # Keep a mapping of plan IDs to preserve connections
-        self.node_id_mapping = {}
+        # Add node-specific configurations
+        if node.get("type") == "n8n-nodes-base.manualTrigger":
+            n8n_node["parameters"] = {}
+        elif node.get("type") == "n8n-nodes-base.code":
+            n8n_node["parameters"] = {
+                "jsCode": node.get("parameters", {}).get("jsCode", "return items;"),
+                "mode": "runOnceForEachItem"
+            }
+        elif node.get("type") == "n8n-nodes-base.webhook":
+            n8n_node["parameters"] = {
+                "httpMethod": "POST",
+                "path": f"webhook-{str(uuid.uuid4())[:8]}",
+                "responseMode": "onReceived"
+            }
         
+        return n8n_node
+    
+    def _default_trigger(self) -> Dict[str, Any]:
+        """Manual trigger used when a plan has no nodes"""
+        return {
+            "id": str(uuid.uuid4()),
+            "name": "Manual Trigger",
+            "type": "n8n-nodes-base.manualTrigger",
+            "typeVersion": 1,
+            "position": [250, 300],
+            "parameters": {}
+        }
+    
+    def _add_default_trigger(self, context: _GenerationContext):
+        trigger = self._default_trigger()
+        context.nodes.append(trigger)
+        context.node_id_mapping["default_trigger"] = trigger["id"]
+    
+    def _generate_nodes(self, plan_nodes: List[Dict[str, Any]], context: _GenerationContext) -> List[Dict[str, Any]]:
+        """Generate n8n compatible nodes into the call's context"""
         for i, node in enumerate(plan_nodes):
             plan_id = node.get("id", f"node_{i}")
-            actual_id = str(uuid.uuid4())
+            n8n_node = self._build_node(node, i)
             
             # Store mapping for connections
-            self.node_id_mapping[plan_id] = actual_id
-            
-            n8n_node = {
-                "id": actual_id,
-                "name": node.get("name", f"Node {i+1}"),
-                "type": node.get("type", "n8n-nodes-base.noOp"),
-                "typeVersion": 1,
-                "position": node.get("position", [250 + (i * 200), 300]),
-                "parameters": node.get("parameters", {}),
-                "executeOnce": False
-            }
+            context.node_id_mapping[plan_id] = n8n_node["id"]
             
-            # Add node-specific configurations
-            if node.get("type") == "n8n-nodes-base.manualTrigger":
-                n8n_node["parameters"] = {}
-            elif node.get("type") == "n8n-nodes-base.code":
-                n8n_node["parameters"] = {
-                    "jsCode": node.get("parameters", {}).get("jsCode", "return items;"),
-                    "mode": "runOnceForEachItem"
-                }
-            elif node.get("type") == "n8n-nodes-base.webhook":
-                n8n_node["parameters"] = {
-                    "httpMethod": "POST",
-                    "path": f"webhook-{str(uuid.uuid4())[:8]}",
-                    "responseMode": "onReceived"
-                }
-            
-            n8n_nodes.append(n8n_node)
-            print(f"DEBUG: Created node {plan_id} -> {actual_id}: {n8n_node['name']}")
+            context.nodes.append(n8n_node)
+            print(f"DEBUG: Created node {plan_id} -> {n8n_node['id']}: {n8n_node['name']}")
         
         # Ensure we have at least a manual trigger if no nodes provided
-        if not n8n_nodes:
-            trigger_id = str(uuid.uuid4())
-            n8n_nodes.append({
-                "id": trigger_id,
-                "name": "Manual Trigger",
-                "type": "n8n-nodes-base.manualTrigger",
-                "typeVersion": 1,
-                "position": [250, 300],
-                "parameters": {}
-            })
-            self.node_id_mapping["default_trigger"] = trigger_id
+        if not context.nodes:
+            self._add_default_trigger(context)
         
-        return n8n_nodes
+        return context.nodes
     
-    def _generate_connections(self, plan_connections: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate n8n compatible connections"""
-        connections = {}
-        
+    def _generate_connections(self, plan_connections: List[Dict[str, Any]],
+                              context: _GenerationContext) -> Dict[str, Any]:
+        """Generate n8n compatible connections from the context's node ID mapping"""
         print(f"DEBUG: Generating connections from plan: {plan_connections}")
-        print(f"DEBUG: Node ID mapping: {getattr(self, 'node_id_mapping', {})}")
+        print(f"DEBUG: Node ID mapping: {context.node_id_mapping}")
         
         for connection in plan_connections:
-            from_node_plan = connection.get("from")
-            to_node_plan = connection.get("to")
-            output_index = connection.get("output_index", 0)
-            input_index = connection.get("input_index", 0)
-            
-            # Map plan IDs to actual node IDs
-            from_node = getattr(self, 'node_id_mapping', {}).get(from_node_plan, from_node_plan)
-            to_node = getattr(self, 'node_id_mapping', {}).get(to_node_plan, to_node_plan)
-            
-            print(f"DEBUG: Processing connection: {from_node_plan} ({from_node}) -> {to_node_plan} ({to_node})")
-            
-            if from_node not in connections:
-                connections[from_node] = {}
-            
-            if "main" not in connections[from_node]:
-                connections[from_node]["main"] = []
-            
-            # Ensure we have enough output arrays
-            while len(connections[from_node]["main"]) <= output_index:
-                connections[from_node]["main"].append([])
-            
-            # Add connection
-            connections[from_node]["main"][output_index].append({
-                "node": to_node,
-                "type": "main",
-                "index": input_index
-            })
+            self._add_connection(context.connections, connection, context.node_id_mapping)
+        
+        print(f"DEBUG: Generated connections: {context.connections}")
+        return context.connections
+    
+    def _add_connection(self, connections: Dict[str, Any], connection: Dict[str, Any],
+                        node_id_mapping: Dict[str, str]):
+        """Add one plan connection to an n8n connection map"""
+        from_node_plan = connection.get("from")
+        to_node_plan = connection.get("to")
+        output_index = connection.get("output_index", 0)
+        input_index = connection.get("input_index", 0)
+        
+        # Map plan IDs to actual node IDs
+        from_node = node_id_mapping.get(from_node_plan, from_node_plan)
+        to_node = node_id_mapping.get(to_node_plan, to_node_plan)
+        
+        if from_node not in connections:
+            connections[from_node] = {}
         
-        print(f"DEBUG: Generated connections: {connections}")
-        return connections
+        if "main" not in connections[from_node]:
+            connections[from_node]["main"] = []
+        
+        # Ensure we have enough output arrays
+        while len(connections[from_node]["main"]) <= output_index:
+            connections[from_node]["main"].append([])
+        
+        # Add connection
+        connections[from_node]["main"][output_index].append({
+            "node": to_node,
+            "type": "main",
+            "index": input_index
+        })
     
-    def _validate_workflow(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate n8n workflow structure"""
+    def _validate_workflow(self, workflow: Dict[str, Any], graph: Optional[WorkflowGraph] = None,
+                           topology: Optional[tuple] = None) -> Dict[str, Any]:
+        """Validate n8n workflow structure and graph topology"""
         try:
             errors = []
             
@@ -204,52 +317,30 @@ class WorkflowGenerator(Tool):
                 if field not in workflow:
                     errors.append(f"Missing required field: {field}")
             
-            # Validate nodes
             nodes = workflow.get("nodes", [])
             if not nodes:
                 errors.append("Workflow must have at least one node")
             
-            node_ids = set()
-            for node in nodes:
-                if "id" not in node:
-                    errors.append("Node missing required 'id' field")
-                else:
-                    if node["id"] in node_ids:
-                        errors.append(f"Duplicate node ID: {node['id']}")
-                    node_ids.add(node["id"])
-                
-                if "type" not in node:
-                    errors.append(f"Node {node.get('id', 'unknown')} missing 'type' field")
-            
-            # Validate connections reference valid nodes
-            connections = workflow.get("connections", {})
-            for from_node, outputs in connections.items():
-                if from_node not in node_ids:
-                    errors.append(f"Connection references non-existent source node: {from_node}")
-                
-                if isinstance(outputs, dict) and "main" in outputs:
-                    for output_array in outputs["main"]:
-                        for connection in output_array:
-                            to_node = connection.get("node")
-                            if to_node not in node_ids:
-                                errors.append(f"Connection references non-existent target node: {to_node}")
+            # One O(V+E) index answers IDs, dangling connections, cycles,
+            # ordering, triggers and reachability
+            if graph is None:
+                graph = WorkflowGraph.from_workflow(workflow)
+            analysis = graph.analyze(topology)
+            errors.extend(analysis.pop("errors"))
             
             return {
                 "valid": len(errors) == 0,
                 "errors": errors,
                 "node_count": len(nodes),
-                "connection_count": sum(
-                    len(output_array) 
-                    for outputs in connections.values() 
-                    if isinstance(outputs, dict) and "main" in outputs
-                    for output_array in outputs["main"]
-                )
+                "connection_count": graph.edge_count,
+                **analysis
             }
             
         except Exception as e:
             return {
                 "valid": False,
                 "errors": [f"Validation error: {str(e)}"],
+                "warnings": [],
                 "node_count": 0,
                 "connection_count": 0
             }
@@ -0,0 +1,193 @@
+from typing import Dict, Any, List, Optional
+from array import array
+from collections import deque
+
+# Node types that start a workflow besides the "...Trigger" node family
+TRIGGER_TYPES = frozenset({
+    "n8n-nodes-base.webhook",
+    "n8n-nodes-base.cron",
+    "n8n-nodes-base.interval",
+})
+
+def is_trigger_type(node_type: Optional[str]) -> bool:
+    """Whether an n8n node type starts a workflow"""
+    return bool(node_type) and (node_type.endswith("Trigger") or node_type in TRIGGER_TYPES)
+
+class WorkflowGraph:
+    """Compact graph index of an n8n workflow
+
+    Nodes are numbered by ordinal in workflow order. Edges are stored twice
+    in CSR form (offsets plus a flat int array), once by source and once by
+    target, so successors and predecessors of a node are a slice. Building
+    the index and every analysis are O(V+E).
+    """
+    __slots__ = ("node_ids", "node_names", "node_types", "index", "errors",
+                 "out_offsets", "out_targets", "in_offsets", "in_sources")
+
+    def __init__(self, nodes: List[Dict[str, Any]], connections: Dict[str, Any]):
+        self.node_ids: List[str] = []
+        self.node_names: List[str] = []
+        self.node_types: List[Optional[str]] = []
+        self.index: Dict[str, int] = {}
+        self.errors: List[str] = []
+
+        for node in nodes:
+            if "type" not in node:
+                self.errors.append(f"Node {node.get('id', 'unknown')} missing 'type' field")
+            if "id" not in node:
+                self.errors.append("Node missing required 'id' field")
+                continue
+            node_id = node["id"]
+            if node_id in self.index:
+                self.errors.append(f"Duplicate node ID: {node_id}")
+                continue
+            self.index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.node_names.append(node.get("name", node_id))
+            self.node_types.append(node.get("type"))
+
+        sources = array("i")
+        targets = array("i")
+        index = self.index
+        for from_node, outputs in connections.items():
+            source = index.get(from_node)
+            if source is None:
+                self.errors.append(f"Connection references non-existent source node: {from_node}")
+            if not isinstance(outputs, dict) or "main" not in outputs:
+                continue
+            for output_array in outputs["main"]:
+                for connection in output_array:
+                    target = index.get(connection.get("node"))
+                    if target is None:
+                        self.errors.append(f"Connection references non-existent target node: {connection.get('node')}")
+                    elif source is not None:
+                        sources.append(source)
+                        targets.append(target)
+
+        self.out_offsets, self.out_targets = self._csr(sources, targets)
+        self.in_offsets, self.in_sources = self._csr(targets, sources)
+
+    @classmethod
+    def from_workflow(cls, workflow: Dict[str, Any]) -> "WorkflowGraph":
+        return cls(workflow.get("nodes", []), workflow.get("connections", {}))
+
+    def _csr(self, keys: array, values: array) -> tuple:
+        """Counting sort of edges by key into (offsets, values) arrays"""
+        offsets = array("i", bytes(4 * (len(self.node_ids) + 1)))
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(len(self.node_ids)):
+            offsets[i + 1] += offsets[i]
+        cursor = offsets[:-1]
+        ordered = array("i", bytes(4 * len(values)))
+        for key, value in zip(keys, values):
+            ordered[cursor[key]] = value
+            cursor[key] += 1
+        return offsets, ordered
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.out_targets)
+
+    def successors(self, ordinal: int) -> array:
+        return self.out_targets[self.out_offsets[ordinal]:self.out_offsets[ordinal + 1]]
+
+    def predecessors(self, ordinal: int) -> array:
+        return self.in_sources[self.in_offsets[ordinal]:self.in_offsets[ordinal + 1]]
+
+    def triggers(self) -> List[int]:
+        return [i for i, node_type in enumerate(self.node_types) if is_trigger_type(node_type)]
+
+    def topological_order(self) -> tuple:
+        """(order, cyclic) by Kahn's algorithm; nodes on or between cycles follow the acyclic part in ordinal order"""
+        out_offsets, out_targets = self.out_offsets, self.out_targets
+        in_offsets = self.in_offsets
+        in_degree = array("i", (in_offsets[i + 1] - in_offsets[i] for i in range(len(self.node_ids))))
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        order: List[int] = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for k in range(out_offsets[node], out_offsets[node + 1]):
+                target = out_targets[k]
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    queue.append(target)
+        if len(order) == len(self.node_ids):
+            return order, []
+
+        # Peel nodes that only lead into the acyclic remainder from the other
+        # side as well; what is left sits on a cycle or between two cycles
+        remaining = [i for i, degree in enumerate(in_degree) if degree > 0]
+        in_remaining = bytearray(len(self.node_ids))
+        for node in remaining:
+            in_remaining[node] = 1
+        in_sources = self.in_sources
+        out_degree = array("i", bytes(4 * len(self.node_ids)))
+        for node in remaining:
+            out_degree[node] = sum(in_remaining[out_targets[k]] for k in range(out_offsets[node], out_offsets[node + 1]))
+        queue = deque(node for node in remaining if out_degree[node] == 0)
+        while queue:
+            node = queue.popleft()
+            in_remaining[node] = 0
+            for k in range(in_offsets[node], in_offsets[node + 1]):
+                source = in_sources[k]
+                if in_remaining[source]:
+                    out_degree[source] -= 1
+                    if out_degree[source] == 0:
+                        queue.append(source)
+        order.extend(remaining)
+        return order, [node for node in remaining if in_remaining[node]]
+
+    def reachable_from(self, roots: List[int]) -> bytearray:
+        """Flags of the nodes reachable from roots"""
+        seen = bytearray(len(self.node_ids))
+        out_offsets, out_targets = self.out_offsets, self.out_targets
+        stack = list(roots)
+        for root in roots:
+            seen[root] = 1
+        while stack:
+            node = stack.pop()
+            for k in range(out_offsets[node], out_offsets[node + 1]):
+                target = out_targets[k]
+                if not seen[target]:
+                    seen[target] = 1
+                    stack.append(target)
+        return seen
+
+    def analyze(self, topology: Optional[tuple] = None) -> Dict[str, Any]:
+        """Structural errors plus cycles, topological order, triggers and unreachable nodes
+
+        topology is a (order, cyclic) result of topological_order() the
+        caller already computed, e.g. for the layout.
+        """
+        order, cyclic = topology or self.topological_order()
+        triggers = self.triggers()
+        warnings: List[str] = []
+        unreachable: List[int] = []
+        if not triggers:
+            warnings.append("Workflow has no trigger node")
+        else:
+            seen = self.reachable_from(triggers)
+            unreachable = [i for i in range(len(self.node_ids)) if not seen[i]]
+        if cyclic:
+            warnings.append(f"Nodes on a cycle ({len(cyclic)}): {self._describe(cyclic)}")
+        if unreachable:
+            warnings.append(f"Nodes unreachable from a trigger ({len(unreachable)}): {self._describe(unreachable)}")
+
+        node_ids = self.node_ids
+        return {
+            "errors": list(self.errors),
+            "warnings": warnings,
+            "topological_order": [node_ids[i] for i in order],
+            "cycle_nodes": [node_ids[i] for i in cyclic],
+            "unreachable_nodes": [node_ids[i] for i in unreachable],
+            "trigger_nodes": [node_ids[i] for i in triggers],
+        }
+
+    def _describe(self, ordinals: List[int], limit: int = 5) -> str:
+        names = ", ".join(self.node_names[i] for i in ordinals[:limit])
+        return names + (f" and {len(ordinals) - limit} more" if len(ordinals) > limit else "")
@@ -0,0 +1,120 @@
+from typing import Dict, Any, List, Optional
+from array import array
+from .workflow_graph import WorkflowGraph
+
+# n8n canvas coordinates of the first node and the spacing between layers
+# (left to right) and between nodes of one layer (top to bottom)
+ORIGIN_X = 250
+ORIGIN_Y = 300
+LAYER_SPACING = 220
+NODE_SPACING = 140
+CROSSING_SWEEPS = 4
+
+def assign_layers(graph: WorkflowGraph, order: List[int]) -> array:
+    """Longest-path layering along a topological order; edges pointing back in the order are treated as reversed"""
+    rank = array("i", bytes(4 * len(graph)))
+    for position, node in enumerate(order):
+        rank[node] = position
+    layers = array("i", bytes(4 * len(graph)))
+    in_offsets, in_sources = graph.in_offsets, graph.in_sources
+    for node in order:
+        layer = 0
+        for k in range(in_offsets[node], in_offsets[node + 1]):
+            source = in_sources[k]
+            if rank[source] < rank[node] and layers[source] >= layer:
+                layer = layers[source] + 1
+        layers[node] = layer
+    return layers
+
+def order_layers(graph: WorkflowGraph, layers: array, sweeps: int = CROSSING_SWEEPS) -> List[List[int]]:
+    """Nodes of each layer, ordered by alternating barycenter sweeps to reduce edge crossings
+
+    Each sweep sorts a layer by the mean slot of its neighbours in the
+    layer swept just before (predecessors going down, successors going up).
+    Long edges are not split into dummy nodes, which keeps every sweep at
+    O(V+E) plus one sort per layer.
+    """
+    layer_count = max(layers) + 1 if len(layers) else 0
+    rows: List[List[int]] = [[] for _ in range(layer_count)]
+    for node in range(len(graph)):
+        rows[layers[node]].append(node)
+    # Slots are normalised to [0, 1] so rows of different sizes compare
+    slot = array("d", bytes(8 * len(graph)))
+
+    def renumber(row: List[int]):
+        scale = 1.0 / max(len(row) - 1, 1)
+        for index, node in enumerate(row):
+            slot[node] = index * scale
+
+    for row in rows:
+        renumber(row)
+
+    def sweep(row: List[int], offsets: array, neighbours: array, adjacent: int):
+        barycenter = {}
+        for node in row:
+            total, count = 0.0, 0
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbour = neighbours[k]
+                if layers[neighbour] == adjacent:
+                    total += slot[neighbour]
+                    count += 1
+            # Nodes without neighbours in the adjacent layer keep their current slot
+            barycenter[node] = total / count if count else slot[node]
+        row.sort(key=barycenter.__getitem__)
+        renumber(row)
+
+    for _ in range(sweeps):
+        for layer in range(1, layer_count):
+            sweep(rows[layer], graph.in_offsets, graph.in_sources, layer - 1)
+        for layer in range(layer_count - 2, -1, -1):
+            sweep(rows[layer], graph.out_offsets, graph.out_targets, layer + 1)
+    return rows
+
+def assign_coordinates(graph: WorkflowGraph, rows: List[List[int]]) -> List[List[int]]:
+    """n8n [x, y] per node ordinal; each node is pulled toward its predecessors without overlapping its layer"""
+    y = array("d", bytes(8 * len(graph)))
+    placed_nodes = bytearray(len(graph))
+    in_offsets, in_sources = graph.in_offsets, graph.in_sources
+    for layer, row in enumerate(rows):
+        # Desired height is the mean of the already placed predecessors
+        desired = []
+        for index, node in enumerate(row):
+            total, count = 0.0, 0
+            for k in range(in_offsets[node], in_offsets[node + 1]):
+                source = in_sources[k]
+                if placed_nodes[source]:
+                    total += y[source]
+                    count += 1
+            desired.append(total / count if count else (index - (len(row) - 1) / 2) * NODE_SPACING)
+        # Keep the barycenter order with at least NODE_SPACING between nodes,
+        # then shift the layer so it is centred on the desired heights
+        placed = []
+        for want in desired:
+            placed.append(max(want, placed[-1] + NODE_SPACING) if placed else want)
+        shift = (sum(desired) - sum(placed)) / len(placed) if placed else 0.0
+        for node, height in zip(row, placed):
+            y[node] = height + shift
+            placed_nodes[node] = 1
+    positions: List[List[int]] = [[0, 0] for _ in range(len(graph))]
+    for layer, row in enumerate(rows):
+        for node in row:
+            positions[node] = [ORIGIN_X + layer * LAYER_SPACING, round(ORIGIN_Y + y[node])]
+    return positions
+
+def layered_layout(graph: WorkflowGraph, order: Optional[List[int]] = None) -> List[List[int]]:
+    """Sugiyama-style layout: n8n [x, y] for every node ordinal, flowing left to right"""
+    if not len(graph):
+        return []
+    if order is None:
+        order, _ = graph.topological_order()
+    layers = assign_layers(graph, order)
+    return assign_coordinates(graph, order_layers(graph, layers))
+
+def apply_layout(nodes: List[Dict[str, Any]], graph: WorkflowGraph, order: Optional[List[int]] = None):
+    """Set the position of every indexed node in place"""
+    positions = layered_layout(graph, order)
+    index = graph.index
+    for node in nodes:
+        ordinal = index.get(node.get("id"))
+        if ordinal is not None:
+            node["position"] = positions[ordinal]
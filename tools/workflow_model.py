@@ -0,0 +1,291 @@
+from typing import Dict, Any, List, Optional
+import sys
+
+# Keys modelled as slots; anything else a node or connection carries is kept in extra
+_PLAN_NODE_KEYS = frozenset({"id", "type", "name", "description", "parameters"})
+_PLAN_CONNECTION_KEYS = frozenset({"from", "to", "output_index", "input_index"})
+_WORKFLOW_NODE_KEYS = frozenset({"id", "name", "type", "typeVersion", "position", "parameters", "executeOnce"})
+
+class _Missing:
+    """Slot value of a key the source dict did not have; to_dict()/to_n8n() leave it out"""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __bool__(self) -> bool:
+        return False
+
+MISSING: Any = _Missing()
+
+# Every empty parameter dict is stored as this one object; a fresh {} is emitted for it
+_EMPTY_PARAMETERS: Dict[str, Any] = {}
+
+def intern_str(value: Any) -> Any:
+    """The interned copy of a string, so repeated values (node types, plan IDs) are stored once"""
+    return sys.intern(value) if type(value) is str else value
+
+def _extra(data: Dict[str, Any], known: frozenset) -> Optional[Dict[str, Any]]:
+    extra = {key: value for key, value in data.items() if key not in known}
+    return extra or None
+
+def _parameters(value: Any) -> Any:
+    return _EMPTY_PARAMETERS if type(value) is dict and not value else value
+
+def _put(data: Dict[str, Any], key: str, value: Any):
+    if value is _EMPTY_PARAMETERS:
+        data[key] = {}
+    elif value is not MISSING:
+        data[key] = value
+
+class PlanNode:
+    """One node of a workflow plan; keys the plan did not have stay MISSING"""
+    __slots__ = ("id", "type", "name", "description", "parameters", "extra")
+
+    def __init__(self, id: Any = MISSING, type: Any = MISSING, name: Any = MISSING,
+                 description: Any = MISSING, parameters: Any = MISSING,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = intern_str(id)
+        self.type = intern_str(type)
+        self.name = name
+        self.description = description
+        self.parameters = _parameters(parameters)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanNode":
+        get = data.get
+        return cls(get("id", MISSING), get("type", MISSING), get("name", MISSING), get("description", MISSING),
+                   get("parameters", MISSING), _extra(data, _PLAN_NODE_KEYS))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        _put(data, "id", self.id)
+        _put(data, "type", self.type)
+        _put(data, "name", self.name)
+        _put(data, "description", self.description)
+        _put(data, "parameters", self.parameters)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+class PlanConnection:
+    """A connection between two plan nodes, by plan node ID"""
+    __slots__ = ("source", "target", "output_index", "input_index", "extra")
+
+    def __init__(self, source: Any = MISSING, target: Any = MISSING, output_index: Any = MISSING,
+                 input_index: Any = MISSING, extra: Optional[Dict[str, Any]] = None):
+        self.source = intern_str(source)
+        self.target = intern_str(target)
+        self.output_index = output_index
+        self.input_index = input_index
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanConnection":
+        get = data.get
+        return cls(get("from", MISSING), get("to", MISSING), get("output_index", MISSING),
+                   get("input_index", MISSING), _extra(data, _PLAN_CONNECTION_KEYS))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        _put(data, "from", self.source)
+        _put(data, "to", self.target)
+        _put(data, "output_index", self.output_index)
+        _put(data, "input_index", self.input_index)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+class Plan:
+    """A workflow plan: nodes and connections as slots objects, other plan fields as they are
+
+    from_dict() then to_dict() gives back an equal dict: keys a node or
+    connection did not have are not filled in, and unknown keys are kept.
+    """
+    __slots__ = ("nodes", "connections", "fields")
+
+    def __init__(self, nodes: Optional[List[PlanNode]] = None, connections: Optional[List[PlanConnection]] = None,
+                 fields: Optional[Dict[str, Any]] = None):
+        # None marks a plan (e.g. an error result) without that key
+        self.nodes = nodes
+        self.connections = connections
+        self.fields = fields or {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Plan":
+        nodes = data.get("nodes")
+        connections = data.get("connections")
+        fields = {key: value for key, value in data.items() if key not in ("nodes", "connections")}
+        # A non-list value is not modelled and stays a plain field
+        if nodes is not None and not isinstance(nodes, list):
+            fields["nodes"] = nodes
+        if connections is not None and not isinstance(connections, list):
+            fields["connections"] = connections
+        return cls(
+            [PlanNode.from_dict(node) for node in nodes] if isinstance(nodes, list) else None,
+            [PlanConnection.from_dict(c) for c in connections] if isinstance(connections, list) else None,
+            fields
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.fields.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for key, value in self.fields.items():
+            data[key] = value
+            # Keep nodes and connections right after the description, where plans put them
+            if key == "description":
+                self._add_graph(data)
+        self._add_graph(data)
+        return data
+
+    def _add_graph(self, data: Dict[str, Any]):
+        if self.nodes is not None and "nodes" not in data:
+            data["nodes"] = [node.to_dict() for node in self.nodes]
+        if self.connections is not None and "connections" not in data:
+            data["connections"] = [connection.to_dict() for connection in self.connections]
+
+class WorkflowNode:
+    """One n8n node; keys the node did not have stay MISSING"""
+    __slots__ = ("id", "name", "type", "type_version", "x", "y", "parameters", "execute_once", "extra")
+
+    def __init__(self, id: Any = MISSING, name: Any = MISSING, type: Any = MISSING, type_version: Any = MISSING,
+                 position: Any = MISSING, parameters: Any = MISSING, execute_once: Any = MISSING,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.name = name
+        self.type = intern_str(type)
+        self.type_version = type_version
+        if isinstance(position, list) and len(position) == 2:
+            self.x, self.y = position
+        else:
+            # Absent, or not an [x, y] pair; the latter is kept in extra
+            self.x = self.y = MISSING
+            if position is not MISSING:
+                extra = {**(extra or {}), "position": position}
+        self.parameters = _parameters(parameters)
+        self.execute_once = execute_once
+        self.extra = extra
+
+    @classmethod
+    def from_n8n(cls, data: Dict[str, Any]) -> "WorkflowNode":
+        get = data.get
+        return cls(get("id", MISSING), get("name", MISSING), get("type", MISSING), get("typeVersion", MISSING),
+                   get("position", MISSING), get("parameters", MISSING), get("executeOnce", MISSING),
+                   _extra(data, _WORKFLOW_NODE_KEYS))
+
+    def to_n8n(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        _put(data, "id", self.id)
+        _put(data, "name", self.name)
+        _put(data, "type", self.type)
+        _put(data, "typeVersion", self.type_version)
+        if self.x is not MISSING:
+            data["position"] = [self.x, self.y]
+        _put(data, "parameters", self.parameters)
+        _put(data, "executeOnce", self.execute_once)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+class WorkflowConnection:
+    """An n8n connection between two nodes, by node ordinal in the workflow"""
+    __slots__ = ("source", "target", "output_index", "input_index", "type")
+
+    def __init__(self, source: int, target: int, output_index: int = 0, input_index: int = 0, type: str = "main"):
+        self.source = source
+        self.target = target
+        self.output_index = output_index
+        self.input_index = input_index
+        self.type = intern_str(type)
+
+class Workflow:
+    """An n8n workflow held as slots objects; n8n JSON is built only by to_n8n()
+
+    Connections refer to nodes by ordinal, so node IDs are stored once.
+    Connections to IDs that are not nodes of the workflow are kept in
+    dangling as n8n JSON, so a round trip never loses them. Nodes round trip
+    exactly; connections come back in n8n's own form: every entry as
+    {"node", "type", "index"}, and in each output the entries to unknown
+    nodes after the resolved ones. to_n8n() always has "nodes" and
+    "connections".
+    """
+    __slots__ = ("nodes", "connections", "dangling", "fields")
+
+    def __init__(self, nodes: List[WorkflowNode], connections: List[WorkflowConnection],
+                 fields: Dict[str, Any], dangling: Optional[Dict[str, Any]] = None):
+        self.nodes = nodes
+        self.connections = connections
+        self.fields = fields
+        self.dangling = dangling
+
+    @classmethod
+    def from_n8n(cls, data: Dict[str, Any]) -> "Workflow":
+        nodes = [WorkflowNode.from_n8n(node) for node in data.get("nodes", [])]
+        index = {node.id: ordinal for ordinal, node in enumerate(nodes)}
+        connections: List[WorkflowConnection] = []
+        dangling: Dict[str, Any] = {}
+        for from_node, outputs in data.get("connections", {}).items():
+            source = index.get(from_node)
+            if source is None or not isinstance(outputs, dict) or set(outputs) != {"main"}:
+                dangling[from_node] = outputs
+                continue
+            for output_index, output_array in enumerate(outputs["main"]):
+                for connection in output_array:
+                    target = index.get(connection.get("node"))
+                    if target is None:
+                        dangling.setdefault(from_node, {"main": []})
+                        main = dangling[from_node]["main"]
+                        while len(main) <= output_index:
+                            main.append([])
+                        main[output_index].append(connection)
+                        continue
+                    connections.append(WorkflowConnection(source, target, output_index,
+                                                          connection.get("index", 0), connection.get("type", "main")))
+        fields = {key: value for key, value in data.items() if key not in ("nodes", "connections")}
+        return cls(nodes, connections, fields, dangling or None)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.fields.get(key, default)
+
+    def to_n8n(self) -> Dict[str, Any]:
+        connections: Dict[str, Any] = {}
+        nodes = self.nodes
+        for connection in self.connections:
+            outputs = connections.setdefault(nodes[connection.source].id, {"main": []})["main"]
+            while len(outputs) <= connection.output_index:
+                outputs.append([])
+            outputs[connection.output_index].append({
+                "node": nodes[connection.target].id,
+                "type": connection.type,
+                "index": connection.input_index
+            })
+        for from_node, outputs in (self.dangling or {}).items():
+            if from_node not in connections:
+                connections[from_node] = outputs
+                continue
+            main = connections[from_node]["main"]
+            for output_index, output_array in enumerate(outputs["main"]):
+                while len(main) <= output_index:
+                    main.append([])
+                main[output_index].extend(output_array)
+
+        data: Dict[str, Any] = {}
+        for key, value in self.fields.items():
+            data[key] = value
+            # n8n puts nodes and connections right after the name and active flag
+            if key == "active":
+                data["nodes"] = [node.to_n8n() for node in nodes]
+                data["connections"] = connections
+        if "nodes" not in data:
+            data["nodes"] = [node.to_n8n() for node in nodes]
+            data["connections"] = connections
+        return data
+
+    to_dict = to_n8n
@@ -1,6 +1,4 @@
 import streamlit as st
-import asyncio
-import json
 import sys
 import os
 from datetime import datetime
@@ -10,6 +8,8 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.team import DAForgeTeam
+from agents.client_pool import run_on_shared_loop
+from agents.json_codec import format_json
 
 # Page configuration
 st.set_page_config(
@@ -228,10 +228,12 @@ if 'progress_messages' not in st.session_state:
 if 'is_processing' not in st.session_state:
     st.session_state.is_processing = False
 
-def update_progress(stage: str, message: str):
+def update_progress(stage: str, message: str, messages=None):
     """Update progress in session state"""
     timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state.progress_messages.append({
+    if messages is None:
+        messages = st.session_state.progress_messages
+    messages.append({
         "stage": stage,
         "message": message,
         "timestamp": timestamp
@@ -240,10 +242,13 @@ def update_progress(stage: str, message: str):
 def initialize_team(llm_provider: str) -> DAForgeTeam:
     """Initialize the DA-Forge team"""
     team = DAForgeTeam(llm_provider=llm_provider)
-    team.set_progress_callback(update_progress)
+    # The team runs on the shared I/O loop thread, which has no Streamlit
+    # script context, so progress goes straight into this session's list
+    messages = st.session_state.progress_messages
+    team.set_progress_callback(lambda stage, message: update_progress(stage, message, messages))
     return team
 
-async def process_workflow_request(user_input: str, llm_provider: str) -> Dict[str, Any]:
+def process_workflow_request(user_input: str, llm_provider: str) -> Dict[str, Any]:
     """Process the workflow generation request with real-time updates"""
     st.session_state.is_processing = True
     st.session_state.progress_messages = []
@@ -256,20 +261,18 @@ async def process_workflow_request(user_input: str, llm_provider: str) -> Dict[s
         team = initialize_team(llm_provider)
         st.session_state.team = team
         
-        # Execute workflow generation
-        result = await team.execute_workflow_generation(user_input)
-        
-        st.session_state.is_processing = False
-        return result
+        # Execute on the long-lived loop so pooled LLM connections stay warm between clicks
+        return run_on_shared_loop(team.execute_workflow_generation(user_input))
         
     except Exception as e:
-        st.session_state.is_processing = False
         update_progress("error", f"❌ Error: {str(e)}")
         return {
             "success": False,
             "error": str(e),
             "stage": "execution"
         }
+    finally:
+        st.session_state.is_processing = False
 
 def render_header():
     """Render the premium header"""
@@ -427,7 +430,7 @@ def render_results(result: Dict[str, Any], output_mode: str):
         st.markdown("## 📥 Download Your Workflow")
         
         workflow_json = result.get('workflow_json', {})
-        json_str = json.dumps(workflow_json, indent=2)
+        json_str = format_json(workflow_json)
         
         col1, col2 = st.columns([2, 1])
         
@@ -522,7 +525,7 @@ def render_results(result: Dict[str, Any], output_mode: str):
             st.markdown("### 📄 Partial Workflow JSON (Generated but not fully completed)")
             
             workflow_json = result['workflow_json']
-            json_str = json.dumps(workflow_json, indent=2)
+            json_str = format_json(workflow_json)
             
             # Still allow download of partial results
             st.download_button(
@@ -642,8 +645,7 @@ def main():
                     st.progress(10)
                     st.info("🔄 Initializing workflow generation...")
                 
-                # Run async function
-                result = asyncio.run(process_workflow_request(user_input, llm_provider))
+                result = process_workflow_request(user_input, llm_provider)
                 st.session_state.execution_result = result
                 
                 # Clear placeholders and rerun to show final results
@@ -671,7 +673,7 @@ def main():
     if st.session_state.team and st.checkbox("🔍 Show Debug Information", help="View detailed system information"):
         with st.expander("🛠️ System Debug Information"):
             try:
-                memory_summary = asyncio.run(st.session_state.team.get_memory_summary())
+                memory_summary = run_on_shared_loop(st.session_state.team.get_memory_summary())
                 
                 col1, col2 = st.columns(2)
                 with col1: